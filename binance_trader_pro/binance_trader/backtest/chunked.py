@@ -0,0 +1,72 @@
+from __future__ import annotations
+from typing import Callable, Iterable, Optional
+import numpy as np
+import pandas as pd
+from .engine import positions_from_signal, _signal_array
+from .metrics import MetricsAccumulator
+from ..strategy.base import IncrementalStrategy, Strategy
+
+def default_warmup(strategy: Strategy) -> int:
+    """History rows a chunk needs from its predecessor: the longest integer (window) parameter."""
+    return max([int(v) for v in strategy.params.values() if isinstance(v, (int, np.integer))] + [1])
+
+class ChunkedBacktest:
+    """Out-of-core version of backtest_symmetric: feed kline frames in order with update().
+    Position, last close and a MetricsAccumulator (equity, peak, PnL moments) carry across chunks,
+    so only one chunk is ever held in memory. An IncrementalStrategy carries its own rolling state (update_many), which
+    reproduces generate_signals exactly; other strategies get generate_signals over the last `warmup`
+    rows of the previous chunk plus the chunk. Per-bar PnL, equity, drawdown and trade count then match
+    the in-memory engine; Sharpe matches up to summation rounding (the moments are merged per chunk).
+    """
+    def __init__(self, strategy: Strategy, fee: float = 0.0004, slippage_bps: float = 1.0, warmup: Optional[int] = None,
+                 interval: str = '1m'):
+        self.strategy = strategy
+        self.fee = fee
+        self.slip = slippage_bps * 1e-4
+        self.warmup = int(warmup) if warmup is not None else default_warmup(strategy)
+        self.incremental = isinstance(strategy, IncrementalStrategy)
+        if self.incremental:
+            strategy.reset()
+        self._tail: Optional[pd.DataFrame] = None
+        self._pos = 0
+        self._close = np.nan
+        self.metrics = MetricsAccumulator(interval)
+
+    def update(self, df: pd.DataFrame):
+        """Process the next chunk; returns its (equity, pnl) arrays."""
+        if self.incremental:
+            sig = self.strategy.update_many(df)
+        else:
+            n_tail = 0 if self._tail is None else len(self._tail)
+            frame = df if not n_tail else pd.concat([self._tail, df], ignore_index=True)
+            sig = _signal_array(self.strategy.generate_signals(frame), len(frame))[n_tail:]
+            self._tail = frame.iloc[max(0, len(frame) - self.warmup):]
+        close = df['close'].to_numpy(dtype=np.float64)
+
+        ret = np.empty(len(close))
+        np.divide(close, np.concatenate([[self._close], close[:-1]]), out=ret)
+        ret -= 1.0
+        ret[~np.isfinite(ret)] = 0.0
+        pos = positions_from_signal(np.concatenate([[self._pos], sig]))
+        prev, pos = pos[:-1], pos[1:]
+        traded = sig != 0
+        pnl = pos * ret - (traded * (self.fee + self.slip) + (traded & (prev != 0)) * self.fee)
+
+        eq = self.metrics.update_many(pnl, int(traded.sum()))
+        if len(eq):
+            self._pos, self._close = int(pos[-1]), float(close[-1])
+        return eq, pnl
+
+    def stats(self) -> dict:
+        return self.metrics.stats()
+
+def backtest_chunked(chunks: Iterable[pd.DataFrame], strategy: Strategy, fee: float = 0.0004, slippage_bps: float = 1.0,
+                     warmup: Optional[int] = None, on_chunk: Optional[Callable[[pd.DataFrame, np.ndarray], None]] = None,
+                     interval: str = '1m') -> dict:
+    """Run ChunkedBacktest over an iterable of kline frames; on_chunk(df, equity) receives each chunk's curve."""
+    bt = ChunkedBacktest(strategy, fee=fee, slippage_bps=slippage_bps, warmup=warmup, interval=interval)
+    for df in chunks:
+        eq, _ = bt.update(df)
+        if on_chunk is not None:
+            on_chunk(df, eq)
+    return bt.stats()
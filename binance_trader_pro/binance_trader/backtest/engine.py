@@ -1,35 +1,55 @@
 from __future__ import annotations
 import pandas as pd
 import numpy as np
+from .metrics import MetricsAccumulator
 
-def backtest_symmetric(df: pd.DataFrame, signal: pd.Series, fee: float = 0.0004, slippage_bps: float = 1.0):
-    """Simple long/short backtest on close-to-close with taker fee and slippage.
-    signal: +1 open long, -1 open short, 0 no change. Position flips on signal!=0.
+def positions_from_signal(sig: np.ndarray) -> np.ndarray:
+    """Forward-fill position (+1/-1/0) from a signal array along the last axis.
+    Works for 1D (bars,) and stacked (..., bars) signal arrays.
+    """
+    sig = np.asarray(sig)
+    n = sig.shape[-1]
+    idx = np.where(sig != 0, np.arange(n), 0)
+    np.maximum.accumulate(idx, axis=-1, out=idx)
+    pos = np.take_along_axis(np.sign(sig).astype(np.int8), idx, axis=-1)
+    # bars before the first signal (idx==0 and sig[0]==0) stay flat
+    return pos
+
+def pnl_from_signal(close: np.ndarray, sig: np.ndarray, fee: float = 0.0004, slippage_bps: float = 1.0) -> np.ndarray:
+    """Per-bar PnL (one entry per bar) for close-to-close returns.
+    On a non-zero signal: pay fee to close the old position (if any), fee + slippage to open the new one.
     """
-    df = df.copy()
-    df['ret'] = df['close'].pct_change().fillna(0.0)
-    # slippage in fraction
+    close = np.asarray(close, dtype=np.float64)
+    ret = np.zeros(close.shape[-1], dtype=np.float64)
+    if len(ret) > 1:
+        np.divide(close[1:], close[:-1], out=ret[1:])
+        ret[1:] -= 1.0
+    ret[~np.isfinite(ret)] = 0.0
     slip = slippage_bps * 1e-4
+    pos = positions_from_signal(sig)
+    prev = np.zeros_like(pos)
+    prev[..., 1:] = pos[..., :-1]
+    traded = sig != 0
+    cost = traded * (fee + slip) + (traded & (prev != 0)) * fee
+    return pos * ret - cost
 
-    pos = 0
-    pnl = []
-    for i in range(len(df)):
-        sig = signal.iat[i] if i < len(signal) else 0
-        if sig != 0:
-            # close old (fee) and open new (fee + slippage cost)
-            if pos != 0:
-                pnl.append(-fee)
-            pos = 1 if sig > 0 else -1
-            pnl.append(-fee - slip)
-        # daily pnl
-        pnl.append(pos * df['ret'].iat[i])
-    pnl = pd.Series(pnl[:len(df)], index=df.index).fillna(0.0)
-    eq = (1 + pnl).cumprod()
-    stats = {
-        'CAGR%': (eq.iat[-1] ** (365*1440/1 / max(1, len(eq))) - 1) * 100 if len(eq) > 1 else 0,  # rough
-        'Return%': (eq.iat[-1] - 1) * 100,
-        'Sharpe': pnl.mean() / (pnl.std() + 1e-12) * np.sqrt(365*24*60),  # minute-level rough annualization
-        'MaxDD%': (1 - eq / eq.cummax()).max() * 100,
-        'Trades': int((signal != 0).sum())
-    }
-    return eq, pnl, stats
+def _signal_array(signal, n: int) -> np.ndarray:
+    sig = np.nan_to_num(np.asarray(signal, dtype=np.float64)[:n])
+    if len(sig) < n:
+        sig = np.concatenate([sig, np.zeros(n - len(sig))])
+    return sig
+
+def backtest_symmetric(df: pd.DataFrame, signal: pd.Series, fee: float = 0.0004, slippage_bps: float = 1.0,
+                       interval: str = '1m'):
+    """Simple long/short backtest on close-to-close with taker fee and slippage.
+    signal: +1 open long, -1 open short, 0 no change. Position flips on signal!=0.
+    Vectorized: PnL has exactly one entry per bar (fees are charged on the signal bar).
+    Stats come from one MetricsAccumulator pass, annualized for `interval`.
+    """
+    sig = _signal_array(signal, len(df))
+    pnl_arr = pnl_from_signal(df['close'].to_numpy(dtype=np.float64), sig, fee=fee, slippage_bps=slippage_bps)
+    acc = MetricsAccumulator(interval)
+    eq_arr = acc.update_many(pnl_arr, int((sig != 0).sum()))
+    pnl = pd.Series(pnl_arr, index=df.index)
+    eq = pd.Series(eq_arr, index=df.index)
+    return eq, pnl, acc.stats()
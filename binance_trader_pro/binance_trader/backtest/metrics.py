@@ -0,0 +1,92 @@
+from __future__ import annotations
+import math
+import numpy as np
+from ..core.utils import interval_ms
+
+YEAR_MS = 365 * 24 * 60 * 60 * 1000
+
+def periods_per_year(interval: str) -> float:
+    """Bars per (365-day) year for a kline interval, e.g. 525600 for '1m', 8760 for '1h'."""
+    return YEAR_MS / interval_ms(interval)
+
+class MetricsAccumulator:
+    """One-pass backtest / live metrics over per-bar returns (fraction of equity).
+    Mean and variance use Welford's update per bar (update) and Chan's pairwise merge per block
+    (update_many); equity, running peak and max drawdown are carried as scalars, so snapshot()
+    is O(1) at any point. Drawdown is measured from equity0 on. Annualization follows the interval.
+    """
+    def __init__(self, interval: str = '1m', equity0: float = 1.0):
+        self.interval = interval
+        self.periods = periods_per_year(interval)
+        self.equity0 = float(equity0)
+        self.equity = self.equity0
+        self.peak = self.equity0
+        self.max_dd = 0.0
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.trades = 0
+
+    def update(self, ret: float, traded: bool = False):
+        """Consume one bar's return (after costs). O(1)."""
+        ret = float(ret)
+        self.n += 1
+        d = ret - self.mean
+        self.mean += d / self.n
+        self.m2 += d * (ret - self.mean)
+        self.equity *= 1 + ret
+        if self.equity > self.peak:
+            self.peak = self.equity
+        else:
+            dd = 1 - self.equity / self.peak
+            if dd > self.max_dd:
+                self.max_dd = dd
+        self.trades += bool(traded)
+
+    def update_many(self, ret: np.ndarray, trades: int = 0) -> np.ndarray:
+        """Consume a block of per-bar returns in one vectorized step; returns the block's equity curve."""
+        ret = np.asarray(ret, dtype=np.float64)
+        self.trades += int(trades)
+        if not len(ret):
+            return np.empty(0)
+        eq = np.cumprod(np.concatenate([[self.equity], 1 + ret]))[1:]
+        peak = np.maximum.accumulate(eq)
+        np.maximum(peak, self.peak, out=peak)
+        dd = float(1 - (eq / peak).min())
+        self.max_dd = max(self.max_dd, dd)
+        self.equity, self.peak = float(eq[-1]), float(peak[-1])
+        mean_b = float(ret.mean())
+        self._merge(len(ret), mean_b, float(np.square(ret - mean_b).sum()))
+        return eq
+
+    def _merge(self, n_b: int, mean_b: float, m2_b: float):
+        n = self.n + n_b
+        delta = mean_b - self.mean
+        self.mean += delta * n_b / n
+        self.m2 += m2_b + delta * delta * self.n * n_b / n
+        self.n = n
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else 0.0
+
+    @property
+    def drawdown(self) -> float:
+        return 1 - self.equity / self.peak if self.peak > 0 else 0.0
+
+    def stats(self) -> dict:
+        """The backtest summary: CAGR%, Return%, Sharpe, MaxDD%, Trades (also the sweep table columns)."""
+        growth = self.equity / self.equity0
+        return {
+            'CAGR%': ((growth ** (self.periods / self.n) - 1) * 100 if growth > 0 else -100.0) if self.n > 1 else 0.0,
+            'Return%': (growth - 1) * 100,
+            'Sharpe': self.mean / (self.std + 1e-12) * math.sqrt(self.periods),
+            'MaxDD%': self.max_dd * 100,
+            'Trades': self.trades,
+        }
+
+    def snapshot(self) -> dict:
+        """stats() plus the current equity / drawdown and bar count."""
+        out = self.stats()
+        out.update({'Equity': self.equity, 'DD%': self.drawdown * 100, 'Bars': self.n})
+        return out
@@ -0,0 +1,118 @@
+from __future__ import annotations
+from typing import Iterable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from .engine import positions_from_signal
+from .metrics import MetricsAccumulator
+from ..core.utils import interval_ms
+from ..data.store import KlineStore
+
+ARRAYS_PER_CELL = 12  # float64 temporaries per (bar, symbol) cell while a chunk is processed
+
+def _grid_ceil(t: int, anchor: int, step: int) -> int:
+    """First time >= t on the grid anchor + k * step."""
+    return t + (anchor - t) % step
+
+def _rolling_mean_cols(x: np.ndarray, n: int) -> np.ndarray:
+    """Column-wise rolling(n).mean() over axis 0; NaN where the window is short or holds a NaN.
+    pandas' rolling mean, so the SMAs are bit-equal to SmaCross.generate_signals'."""
+    if n <= 0 or len(x) < n:
+        return np.full(x.shape, np.nan)
+    return pd.DataFrame(x, copy=False).rolling(n, min_periods=n).mean().to_numpy()
+
+class PortfolioBacktest:
+    """SMA-cross portfolio backtest on an aligned (bars x symbols) close matrix.
+    Symbols are aligned on the interval grid by open_time (a missing bar carries the last close, so it
+    earns no return); signals, positions and per-symbol PnL are computed column-wise in one vectorized
+    pass per chunk of bars. Chunks carry the SMA tail, position and last close across the boundary, and
+    the chunk length is derived from `memory_mb` so peak memory is independent of the date range.
+    Sizing mirrors the live runner: each open position is `risk_per_trade` of equity in notional,
+    scaled down so gross exposure stays within max_leverage * max_position_notional_pct.
+    """
+    def __init__(self, fast: int = 20, slow: int = 60, fee: float = 0.0004, slippage_bps: float = 1.0,
+                 risk_per_trade: float = 0.01, max_position_notional_pct: float = 0.9, max_leverage: int = 1,
+                 memory_mb: float = 512):
+        self.fast, self.slow = int(fast), int(slow)
+        self.fee = fee
+        self.slip = slippage_bps * 1e-4
+        self.risk_per_trade = risk_per_trade
+        self.gross_cap = max_position_notional_pct * max(1, int(max_leverage))
+        self.memory_mb = memory_mb
+
+    def weight(self, n_symbols: int) -> float:
+        return min(self.risk_per_trade, self.gross_cap / max(1, n_symbols))
+
+    def chunk_bars(self, n_symbols: int) -> int:
+        return max(self.slow + 1, int(self.memory_mb * 1024 * 1024 // (max(1, n_symbols) * 8 * ARRAYS_PER_CELL)))
+
+    def _load(self, store: KlineStore, symbols: List[str], interval: str, t0: int, t1: int, step: int) -> np.ndarray:
+        """(bars, symbols) close matrix for open_time in [t0, t1) on the interval grid; NaN where absent.
+        t0 and t1 are grid points, so row k is open_time t0 + k * step."""
+        mat = np.full(((t1 - t0) // step, len(symbols)), np.nan)
+        for j, s in enumerate(symbols):
+            cols = store.slice(s, interval, t0, t1)
+            mat[(cols['open_time'] - t0) // step, j] = cols['close']
+        return mat
+
+    def run(self, store: KlineStore, symbols: Iterable[str], interval: str,
+            start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> Tuple[pd.Series, pd.Series, dict, pd.DataFrame]:
+        symbols = [s.upper() for s in symbols]
+        step = interval_ms(interval)
+        spans = [sp for sp in (store.span(s, interval) for s in symbols) if sp]
+        if not spans:
+            raise ValueError("No stored klines for the requested symbols")
+        # grid of open times, phased on the stored bars; both bounds on it: open_time in [start_ms, end_ms)
+        anchor = min(sp[0] for sp in spans)
+        t_start = anchor if start_ms is None else _grid_ceil(start_ms, anchor, step)
+        t_end = max(sp[1] for sp in spans) + step if end_ms is None else _grid_ceil(end_ms, anchor, step)
+        if t_end <= t_start:
+            raise ValueError("Empty date range")
+        n = len(symbols)
+        w = self.weight(n)
+        chunk = self.chunk_bars(n)
+
+        tail = np.full((self.slow, n), np.nan)   # last `slow` closes (ffilled) for the SMA windows
+        pos = np.zeros(n, dtype=np.int8)         # carried position per symbol
+        sym_pnl = np.zeros(n)
+        sym_trades = np.zeros(n, dtype=np.int64)
+        acc = MetricsAccumulator(interval)
+        eqs: List[np.ndarray] = []
+        rets: List[np.ndarray] = []
+        times: List[np.ndarray] = []
+
+        for c0 in range(t_start, t_end, chunk * step):
+            c1 = min(t_end, c0 + chunk * step)
+            raw = self._load(store, symbols, interval, c0, c1, step)
+            ext = np.vstack([tail, raw])
+            # carry the last close over missing bars: no return on them, and the carried close enters the
+            # SMA windows as that bar's value (a flat bar)
+            ext = pd.DataFrame(ext).ffill().to_numpy()
+            close = ext[self.slow:]
+            s_fast = _rolling_mean_cols(ext, self.fast)
+            s_slow = _rolling_mean_cols(ext, self.slow)
+            state = (s_fast > s_slow).astype(np.int8) - (s_fast < s_slow).astype(np.int8)
+            sig = np.clip(np.diff(state[self.slow - 1:], axis=0), -1, 1)            # (bars, symbols)
+            new_pos = positions_from_signal(np.vstack([pos[None, :], sig]).T).T[1:]
+            prev_pos = np.vstack([pos[None, :], new_pos[:-1]])
+            prev_close = ext[self.slow - 1:-1]
+            ret = np.nan_to_num(close / prev_close - 1.0, nan=0.0, posinf=0.0, neginf=0.0)
+            traded = sig != 0
+            cost = traded * (self.fee + self.slip) + (traded & (prev_pos != 0)) * self.fee
+            pnl = w * (new_pos * ret - cost)                                          # equity-fraction PnL
+            rets.append(pnl.sum(axis=1))
+            eqs.append(acc.update_many(rets[-1], int(traded.sum())))
+            times.append(c0 + step * np.arange(len(raw), dtype=np.int64))
+            sym_pnl += pnl.sum(axis=0)
+            sym_trades += traded.sum(axis=0)
+            pos = new_pos[-1] if len(new_pos) else pos
+            tail = ext[-self.slow:]
+
+        idx = pd.Index(np.concatenate(times), name='open_time')
+        port = np.concatenate(rets)
+        eq_arr = np.concatenate(eqs)
+        stats = acc.stats()
+        stats['Symbols'] = n
+        stats['Weight'] = w
+        per_symbol = pd.DataFrame({'symbol': symbols, 'pnl_contrib': sym_pnl, 'trades': sym_trades,
+                                   'final_pos': pos}).sort_values('pnl_contrib', ascending=False, kind='stable')
+        return pd.Series(eq_arr, index=idx), pd.Series(port, index=idx), stats, per_symbol.reset_index(drop=True)
@@ -0,0 +1,211 @@
+from __future__ import annotations
+import asyncio, itertools, time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+import numpy as np
+from ..core.logger import get_logger
+from ..data.store import KlineStore
+from ..exchange.symbol_rules import SymbolRules
+from ..exchange.ws_decode import KlineRecord
+from ..runner.live_ws_runner import MultiSymbolWSRunner
+
+log = get_logger(__name__)
+
+@dataclass
+class SimPosition:
+    qty: float = 0.0          # signed, + long / - short
+    entry: float = 0.0        # average entry price
+
+class SimulatedExchange:
+    """In-process stand-in for AsyncBinanceUMClient used by replays.
+    Market orders fill immediately at the last replayed close +/- slippage and pay the taker fee;
+    positions are netted per symbol and realized PnL is booked to the wallet. Each fill is followed by
+    an ACCOUNT_UPDATE user-data event to `on_user`, as the exchange would send.
+    """
+    def __init__(self, equity0: float = 10_000.0, fee: float = 0.0004, slippage_bps: float = 1.0):
+        self.wallet = float(equity0)
+        self.fee = fee
+        self.slip = slippage_bps * 1e-4
+        self.last_px: Dict[str, float] = {}
+        self.positions: Dict[str, SimPosition] = {}
+        self.fills: List[Dict[str, Any]] = []
+        self._ids = itertools.count(1)
+        self.key = self.secret = ''
+        self.base = 'sim://'
+        self.timeout = 0
+        self.on_user = None
+        self._event_time = itertools.count(1)
+
+    def mark(self, symbol: str, price: float):
+        self.last_px[symbol] = price
+
+    def unrealized(self) -> float:
+        return sum(p.qty * (self.last_px.get(s, p.entry) - p.entry) for s, p in self.positions.items())
+
+    def _fill(self, symbol: str, side: str, qty: float) -> Dict[str, Any]:
+        sgn = 1.0 if side == 'BUY' else -1.0
+        px = self.last_px[symbol] * (1 + sgn * self.slip)
+        pos = self.positions.setdefault(symbol, SimPosition())
+        d = sgn * qty
+        if pos.qty and (pos.qty > 0) != (d > 0):
+            closed = min(abs(d), abs(pos.qty))
+            self.wallet += closed * (px - pos.entry) * (1 if pos.qty > 0 else -1)
+        new_qty = pos.qty + d
+        if new_qty == 0:
+            pos.entry = 0.0
+        elif pos.qty == 0 or (pos.qty > 0) != (new_qty > 0):
+            pos.entry = px
+        elif (pos.qty > 0) == (d > 0):
+            pos.entry = (pos.entry * abs(pos.qty) + px * abs(d)) / abs(new_qty)
+        pos.qty = new_qty
+        commission = abs(d) * px * self.fee
+        self.wallet -= commission
+        fill = {'orderId': next(self._ids), 'symbol': symbol, 'side': side, 'type': 'MARKET', 'status': 'FILLED',
+                'executedQty': str(qty), 'avgPrice': str(px), 'commission': commission}
+        self.fills.append(fill)
+        return fill
+
+    def account_update(self, symbol: str) -> Dict[str, Any]:
+        """ACCOUNT_UPDATE event (user-data stream format) for a fill in `symbol`."""
+        p = self.positions[symbol]
+        up = p.qty * (self.last_px.get(symbol, p.entry) - p.entry)
+        return {'e': 'ACCOUNT_UPDATE', 'E': next(self._event_time),
+                'a': {'m': 'ORDER', 'B': [{'a': 'USDT', 'wb': str(self.wallet), 'cw': str(self.wallet)}],
+                      'P': [{'s': symbol, 'pa': str(p.qty), 'ep': str(p.entry), 'up': str(up), 'ps': 'BOTH'}]}}
+
+    # ---- AsyncBinanceUMClient surface used by the runner ----
+    async def account(self):
+        up = self.unrealized()
+        return {'totalWalletBalance': str(self.wallet), 'totalUnrealizedProfit': str(up),
+                'totalMarginBalance': str(self.wallet + up),
+                'assets': [{'asset': 'USDT', 'walletBalance': str(self.wallet), 'unrealizedProfit': str(up),
+                            'marginBalance': str(self.wallet + up)}],
+                'positions': [{'symbol': s, 'positionAmt': str(p.qty), 'entryPrice': str(p.entry),
+                               'unrealizedProfit': str(p.qty * (self.last_px.get(s, p.entry) - p.entry))}
+                              for s, p in self.positions.items()]}
+
+    async def new_order(self, symbol: str, side: str, type_: str, qty: float, price: Optional[float] = None,
+                        reduceOnly: Optional[bool] = None, timeInForce: Optional[str] = None, client_id: Optional[str] = None):
+        if type_ != 'MARKET':
+            raise RuntimeError(f"SimulatedExchange supports MARKET orders only, got {type_}")
+        fill = self._fill(symbol, side, float(qty))
+        if self.on_user is not None:
+            await self.on_user(self.account_update(symbol))
+        return fill
+
+    async def batch_orders(self, orders: List[Dict[str, Any]]):
+        out = []
+        for o in orders:
+            try:
+                out.append(await self.new_order(o['symbol'], o['side'], o['type'], float(o['quantity'])))
+            except Exception as e:
+                out.append({'code': -1, 'msg': str(e)})
+        return out
+
+    async def position_info(self, symbol: Optional[str] = None):
+        return [{'symbol': s, 'positionAmt': str(p.qty), 'entryPrice': str(p.entry)}
+                for s, p in self.positions.items() if symbol in (None, s)]
+
+    async def leverage(self, symbol: str, leverage: int):
+        return {'symbol': symbol, 'leverage': leverage}
+
+    async def margin_type(self, symbol: str, marginType: str):
+        return {'code': 200, 'msg': 'success'}
+
+    async def close(self):
+        pass
+
+@dataclass
+class ReplayResult:
+    events: int
+    bars: int
+    seconds: float
+    fills: int
+    equity: float
+    positions: Dict[str, float] = field(default_factory=dict)
+    metrics: Dict[str, dict] = field(default_factory=dict)   # runner's per-symbol MetricsAccumulator snapshots
+    dispatch: Dict[str, Any] = field(default_factory=dict)   # dispatcher counters (processed / conflated)
+
+    @property
+    def events_per_sec(self) -> float:
+        return self.events / self.seconds if self.seconds > 0 else float('inf')
+
+class ReplayEngine:
+    """Replays stored klines through MultiSymbolWSRunner as synthetic WS kline events, as fast as possible.
+    The runner runs its real live code path (dispatcher -> _on_market -> strategy -> order task) against a
+    SimulatedExchange. Each bar's records are submitted to the runner's SymbolDispatcher as the WS readers
+    would, and drained (with the order tasks they spawn) before the next bar, so fills are deterministic.
+    updates_per_bar > 1 emits that many in-progress (x=False) updates before each closing one; they reach
+    the runner only with closed_only=False (live, its decoder drops them before parsing), and the
+    dispatcher conflates those it has not processed yet. `events` counts the records submitted.
+    """
+    def __init__(self, settings: dict, store: KlineStore, symbols: Iterable[str], interval: str,
+                 strategy_name: str, strategy_params: Optional[Dict[str, Any]] = None, lookback: int = 500,
+                 fixed_qty: Optional[float] = None, equity0: float = 10_000.0, updates_per_bar: int = 1,
+                 closed_only: bool = True, eval_pool: Optional[str] = None, eval_pool_workers: Optional[int] = None,
+                 barrier: Optional[bool] = None, rules: Optional[SymbolRules] = None,
+                 order_batch_window_ms: Optional[float] = None, instrument: Optional[bool] = None):
+        self.store = store
+        self.symbols = [s.upper() for s in symbols]
+        self.interval = interval
+        self.updates_per_bar = max(1, int(updates_per_bar))
+        self.exchange = SimulatedExchange(equity0, fee=settings['taker_fee_rate'], slippage_bps=settings['slippage_bps'])
+        self.runner = MultiSymbolWSRunner(settings, self.exchange, self.symbols, interval, strategy_name,
+                                          strategy_params=strategy_params, lookback=lookback,
+                                          fixed_qty=fixed_qty, aclient=self.exchange, closed_only=closed_only,
+                                          eval_pool=eval_pool, eval_pool_workers=eval_pool_workers, barrier=barrier,
+                                          order_batch_window_ms=order_batch_window_ms, instrument=instrument)
+        self.exchange.on_user = self.runner._on_user
+        self.runner.set_rules(rules)  # optional exchange filters: orders rounded / validated as live
+
+    def _timeline(self, start_ms: Optional[int], end_ms: Optional[int]):
+        """All symbols' bars merged in close_time order: (symbol index, row) arrays."""
+        cols = [self.store.slice(s, self.interval, start_ms, end_ms) for s in self.symbols]
+        sym = np.concatenate([np.full(len(c['open_time']), i, dtype=np.int32) for i, c in enumerate(cols)])
+        data = np.concatenate([np.column_stack([c[k] for k in ('open_time', 'open', 'high', 'low', 'close', 'volume', 'close_time')])
+                               for c in cols]) if len(sym) else np.empty((0, 7))
+        order = np.lexsort((sym, data[:, 6])) if len(sym) else np.empty(0, dtype=np.int64)
+        return sym[order], data[order]
+
+    async def run(self, start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> ReplayResult:
+        sym_idx, rows = self._timeline(start_ms, end_ms)
+        runner, ex = self.runner, self.exchange
+        dispatch = runner.dispatch
+        submit, drain = dispatch.submit, dispatch.drain
+        symbols = self.symbols
+        # in-progress updates the live decoder would drop never reach the runner, so are not events
+        n_open = 0 if runner.closed_only else self.updates_per_bar - 1
+        ins = runner.instr  # instrumented: each closing kline counts as received when it is emitted
+        events = 0
+        dispatch.start()
+        t0 = time.perf_counter()
+        try:
+            for i, (ot, o, h, l, c, v, ct) in zip(sym_idx.tolist(), rows.tolist()):
+                s = symbols[i]
+                ex.mark(s, c)
+                ot, ct = int(ot), int(ct)
+                for _ in range(n_open):
+                    submit(KlineRecord(s, ot, ot, o, h, l, c, v, ct, False))
+                if ins is not None:
+                    ins.mark_close(s, time.perf_counter())
+                submit(KlineRecord(s, ct, ot, o, h, l, c, v, ct, True))
+                events += n_open + 1
+                await drain()
+                if runner._tasks:
+                    await asyncio.gather(*list(runner._tasks))
+            runner.flush_batches()
+            while runner._tasks:
+                await asyncio.gather(*list(runner._tasks))
+            elapsed = time.perf_counter() - t0
+        finally:
+            if runner.order_batcher is not None:
+                await runner.order_batcher.close()
+            await dispatch.stop()
+            runner.shutdown()
+        res = ReplayResult(events=events, bars=len(rows), seconds=elapsed, fills=len(ex.fills),
+                           equity=ex.wallet + ex.unrealized(),
+                           positions={s: p.qty for s, p in ex.positions.items()},
+                           metrics=runner.metrics_snapshot(), dispatch=runner.dispatch_stats())
+        log.info(f"Replayed {res.bars} bars / {res.events} events in {elapsed:.2f}s "
+                 f"({res.events_per_sec:,.0f} events/s), fills={res.fills}, equity={res.equity:.2f}")
+        return res
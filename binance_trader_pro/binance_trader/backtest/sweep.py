@@ -0,0 +1,120 @@
+from __future__ import annotations
+import math, os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, Any, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from .engine import pnl_from_signal
+from .metrics import MetricsAccumulator
+from ..strategy.sma_cross import PrefixSum, cross_signals
+
+def parse_range(spec: str) -> List[int]:
+    """'5..50' -> 5..50 inclusive, '5..50:5' -> step 5, '5,10,20' -> explicit list."""
+    spec = str(spec).strip()
+    if '..' in spec:
+        lo, _, rest = spec.partition('..')
+        hi, _, step = rest.partition(':')
+        return list(range(int(lo), int(hi) + 1, int(step or 1)))
+    return [int(x) for x in spec.split(',') if x.strip()]
+
+def param_grid(fasts: Iterable[int], slows: Iterable[int]) -> List[Tuple[int, int]]:
+    slows = list(slows)
+    return [(f, s) for f in fasts for s in slows if f < s]
+
+class SharedArray:
+    """float64 array copied once into POSIX shared memory so pool workers attach instead of unpickling it."""
+    def __init__(self, arr: np.ndarray):
+        arr = np.ascontiguousarray(arr, dtype=np.float64)
+        self.n = len(arr)
+        self.shm = shared_memory.SharedMemory(create=True, size=max(1, arr.nbytes))
+        np.ndarray(self.n, dtype=np.float64, buffer=self.shm.buf)[:] = arr
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# ---- worker side ----
+_W: Dict[str, Any] = {}
+
+def _worker_init(shm_name: str, n: int, fee: float, slippage_bps: float, interval: str = '1m'):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _W['shm'] = shm  # keep mapping alive for the worker's lifetime
+    _W['close'] = np.ndarray(n, dtype=np.float64, buffer=shm.buf)
+    _W['fee'] = fee
+    _W['slippage_bps'] = slippage_bps
+    _W['interval'] = interval
+
+_BLOCK_BYTES = 256 * 1024 * 1024  # rough cap on per-block temporaries (signals, pnl, equity)
+
+def _eval_combos(combos: Sequence[Tuple[int, int]]) -> List[Dict[str, Any]]:
+    """Batched evaluation: one prefix sum per series, SMA matrices per block of slow windows,
+    and stacked (slows, bars) arrays through the vectorized engine - no per-combo pandas objects.
+    Each row's stats come from MetricsAccumulator, as in backtest_symmetric, so the ranking matches `backtest`.
+    """
+    close = _W['close']
+    wanted = set(combos)
+    fasts = sorted({f for f, _ in combos})
+    slows = sorted({s for _, s in combos})
+    block = max(1, _BLOCK_BYTES // max(1, len(close) * 8 * 6))
+    prefix = PrefixSum(close)
+    s_fast = dict(zip(fasts, prefix.sma(fasts)))
+    rows = []
+    for i in range(0, len(slows), block):
+        blk = slows[i:i + block]
+        s_slow = prefix.sma(blk)
+        for fast in fasts:
+            keep = [j for j, slow in enumerate(blk) if (fast, slow) in wanted]
+            if not keep:
+                continue
+            sig = cross_signals(s_fast[fast][None, :], s_slow[keep], prefix.tie_tol)
+            pnl = pnl_from_signal(close, sig, fee=_W['fee'], slippage_bps=_W['slippage_bps'])
+            trades = (sig != 0).sum(axis=-1)
+            for r, j in enumerate(keep):
+                acc = MetricsAccumulator(_W['interval'])
+                acc.update_many(pnl[r], int(trades[r]))
+                rows.append({'fast': fast, 'slow': blk[j], **acc.stats()})
+    return rows
+
+# metrics where lower is better (MaxDD% is a positive drawdown percentage)
+ASCENDING_METRICS = frozenset({'MaxDD%'})
+
+def _chunks(items: Sequence, size: int) -> List[Sequence]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+def run_sweep(close: np.ndarray, combos: Sequence[Tuple[int, int]], fee: float = 0.0004, slippage_bps: float = 1.0,
+              workers: Optional[int] = None, chunksize: Optional[int] = None, rank_by: str = 'Sharpe',
+              interval: str = '1m') -> pd.DataFrame:
+    """Evaluate every (fast, slow) pair on one close series; returns stats ranked by `rank_by`, best first
+    (descending, ascending for drawdown metrics). workers=1 runs serially in-process; otherwise combos
+    are chunked over a process pool.
+    """
+    workers = workers or os.cpu_count() or 1
+    combos = list(combos)
+    with SharedArray(close) as shared:
+        init_args = (shared.name, shared.n, fee, slippage_bps, interval)
+        if workers == 1:
+            _worker_init(*init_args)
+            try:
+                rows = _eval_combos(combos)
+            finally:
+                _W.pop('shm').close()
+        else:
+            size = chunksize or max(1, math.ceil(len(combos) / (workers * 4)))
+            with ProcessPoolExecutor(max_workers=workers, initializer=_worker_init, initargs=init_args) as pool:
+                rows = [r for part in pool.map(_eval_combos, _chunks(combos, size)) for r in part]
+    out = pd.DataFrame(rows, columns=['fast', 'slow', 'CAGR%', 'Return%', 'Sharpe', 'MaxDD%', 'Trades'])
+    if len(out):
+        out['Trades'] = out['Trades'].astype(int)
+        out = out.sort_values(rank_by, ascending=rank_by in ASCENDING_METRICS, kind='stable').reset_index(drop=True)
+    return out
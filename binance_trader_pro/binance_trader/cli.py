@@ -4,8 +4,10 @@ import pandas as pd
 from dotenv import load_dotenv
 import yaml
 from .core.logger import get_logger
+from .core.utils import interval_ms, ms
 from .exchange.binance_http import BinanceUMClient, BinanceConfig
 from .data.fetch import fetch_klines
+from .data.store import KlineStore
 from .strategy.sma_cross import SmaCross
 from .backtest.engine import backtest_symmetric
 
@@ -27,63 +29,178 @@ def make_client(settings) -> BinanceUMClient:
     )
     return BinanceUMClient(cfg)
 
+def make_store(settings) -> KlineStore:
+    return KlineStore(settings.get('data_dir', 'data/store'))
+
+def _to_ms(ts) -> int | None:
+    return int(pd.Timestamp(ts, tz='UTC').timestamp() * 1000) if ts else None
+
+def load_klines(args, settings) -> pd.DataFrame:
+    """--data CSV if given, otherwise a zero-copy slice of the local kline store."""
+    if args.data:
+        return pd.read_csv(args.data)
+    df = make_store(settings).frame(args.symbol, args.interval, _to_ms(args.start), _to_ms(args.end))
+    if not len(df):
+        raise SystemExit(f"No stored klines for {args.symbol} {args.interval}; run `binance-trader fetch` first.")
+    return df
+
 def cmd_fetch(args, settings):
     log = get_logger('fetch')
     client = make_client(settings)
-    start_ms = int(pd.Timestamp(args.start, tz='UTC').timestamp() * 1000)
-    end_ms = int(pd.Timestamp(args.end, tz='UTC').timestamp() * 1000)
-    df = fetch_klines(client, args.symbol, args.interval, start_ms, end_ms)
-    os.makedirs(os.path.dirname(args.out), exist_ok=True)
-    df.to_csv(args.out, index=False)
-    log.info(f"Saved {len(df)} rows to {args.out}")
+    start_ms, end_ms = _to_ms(args.start), _to_ms(args.end)
+    store = make_store(settings)
+    symbols = [s.strip().upper() for s in args.symbol.split(',') if s.strip()]
+    added = store.sync_many(client, symbols, args.interval, start_ms, end_ms, max_workers=int(args.workers))
+    for s in symbols:
+        log.info(f"Store {store.root}: {s} +{added[s]} rows, {store.rows(s, args.interval)} total")
+    if args.out:
+        if len(symbols) > 1:
+            raise SystemExit("--out exports a single symbol")
+        df = store.frame(symbols[0], args.interval, start_ms, end_ms)
+        os.makedirs(os.path.dirname(args.out) or '.', exist_ok=True)
+        df.to_csv(args.out, index=False)
+        log.info(f"Saved {len(df)} rows to {args.out}")
 
 def cmd_backtest(args, settings):
     log = get_logger('backtest')
-    df = pd.read_csv(args.data)
     strategy = SmaCross({'fast': int(args.fast), 'slow': int(args.slow)})
+    if args.chunk_rows:
+        return _backtest_chunked(args, settings, strategy, log)
+    df = load_klines(args, settings)
     sig = strategy.generate_signals(df)
-    eq, pnl, stats = backtest_symmetric(df, sig, fee=settings['taker_fee_rate'], slippage_bps=settings['slippage_bps'])
+    eq, pnl, stats = backtest_symmetric(df, sig, fee=settings['taker_fee_rate'], slippage_bps=settings['slippage_bps'],
+                                        interval=args.interval)
     print("Stats:", stats)
     out = args.report or f"backtest_{args.symbol}_{args.interval}.csv"
     pd.DataFrame({'timestamp': df['open_time'], 'close': df['close'], 'equity': eq}).to_csv(out, index=False)
     log.info(f"Equity curve saved to {out}")
 
+def _backtest_chunked(args, settings, strategy, log):
+    """--chunk-rows: stream klines from the CSV / store and append the equity curve chunk by chunk."""
+    from .backtest.chunked import backtest_chunked
+    rows = int(args.chunk_rows)
+    if args.data:
+        chunks = pd.read_csv(args.data, chunksize=rows)
+    else:
+        chunks = make_store(settings).iter_frames(args.symbol, args.interval, _to_ms(args.start), _to_ms(args.end), rows=rows)
+    out = args.report or f"backtest_{args.symbol}_{args.interval}.csv"
+    first = [True]
+
+    def write(df, eq):
+        pd.DataFrame({'timestamp': df['open_time'].to_numpy(), 'close': df['close'].to_numpy(), 'equity': eq}) \
+            .to_csv(out, index=False, header=first[0], mode='w' if first[0] else 'a')
+        first[0] = False
+
+    stats = backtest_chunked(chunks, strategy, fee=settings['taker_fee_rate'], slippage_bps=settings['slippage_bps'],
+                             on_chunk=write, interval=args.interval)
+    print("Stats:", stats)
+    log.info(f"Equity curve saved to {out}")
+
+def cmd_sweep(args, settings):
+    from .backtest.sweep import parse_range, param_grid, run_sweep
+    log = get_logger('sweep')
+    if args.data:
+        close = pd.read_csv(args.data, usecols=['close'])['close'].to_numpy(dtype='float64')
+    else:
+        close = make_store(settings).slice(args.symbol, args.interval, _to_ms(args.start), _to_ms(args.end))['close']
+        if not len(close):
+            raise SystemExit(f"No stored klines for {args.symbol} {args.interval}; run `binance-trader fetch` first.")
+    combos = param_grid(parse_range(args.fast), parse_range(args.slow))
+    t0 = time.perf_counter()
+    res = run_sweep(close, combos, fee=settings['taker_fee_rate'], slippage_bps=settings['slippage_bps'],
+                    workers=(int(args.workers) if args.workers else None), rank_by=args.rank_by,
+                    interval=args.interval)
+    log.info(f"Evaluated {len(combos)} combos on {len(close)} bars in {time.perf_counter() - t0:.2f}s")
+    print(res.head(int(args.top)).to_string(index=False))
+    out = args.out or f"sweep_{args.symbol}_{args.interval}.csv"
+    res.to_csv(out, index=False)
+    log.info(f"Sweep results saved to {out}")
+
+def cmd_portfolio(args, settings):
+    from .backtest.portfolio import PortfolioBacktest
+    log = get_logger('portfolio')
+    symbols = [s.strip().upper() for s in args.symbols.split(",")]
+    bt = PortfolioBacktest(int(args.fast), int(args.slow), fee=settings['taker_fee_rate'],
+                           slippage_bps=settings['slippage_bps'], risk_per_trade=settings['risk_per_trade'],
+                           max_position_notional_pct=settings['max_position_notional_pct'],
+                           max_leverage=settings['max_leverage'], memory_mb=float(args.memory_mb))
+    t0 = time.perf_counter()
+    eq, ret, stats, per_symbol = bt.run(make_store(settings), symbols, args.interval, _to_ms(args.start), _to_ms(args.end))
+    log.info(f"Backtested {len(symbols)} symbols x {len(eq)} bars in {time.perf_counter() - t0:.2f}s")
+    print("Stats:", stats)
+    print(per_symbol.to_string(index=False))
+    out = args.report or f"portfolio_{args.interval}.csv"
+    pd.DataFrame({'timestamp': eq.index, 'equity': eq.to_numpy()}).to_csv(out, index=False)
+    log.info(f"Portfolio equity curve saved to {out}")
+
 def cmd_live(args, settings):
     log = get_logger('live')
     client = make_client(settings)
     symbol, interval = args.symbol, args.interval
     # Ensure leverage/margin (best-effort)
     from .execution.execution_engine import ExecutionEngine
-    exe = ExecutionEngine(client, symbol)
+    from .portfolio.account import AccountCache
+    from .exchange.symbol_rules import OrderRuleError, load_symbol_rules, rules_path
+    rules_ttl = settings.get('symbol_rules_ttl_s', 86400)
+    rules = load_symbol_rules(client, rules_path(settings), rules_ttl)
+    exe = ExecutionEngine(client, symbol, rules=rules)
     exe.ensure_margin_type('ISOLATED')
     exe.ensure_leverage(settings['max_leverage'])
 
-    # Polling loop (simple): fetch last N klines repeatedly and trade on signal change
+    # Polling loop (simple): prime the incremental strategy once, then fetch only new klines
+    # and feed each closed bar through strategy.update() (O(1) per bar)
     strategy = SmaCross({'fast': int(args.fast), 'slow': int(args.slow)})
     last_signal = 0
     qty = float(args.qty) if args.qty else None
+    # sizing reads a cached wallet balance, refreshed from REST between polls rather than per signal
+    account = AccountCache(settings.get('quote_asset', 'USDT'))
+    reconcile_s = settings.get('account_reconcile_s', 60)
+    step = interval_ms(interval)
+    now_ms = ms()
+    start = now_ms - step * 500  # ~500 bar lookback for MAs
+    df = fetch_klines(client, symbol, interval, start, now_ms)
+    closed = df[df['close_time'] < now_ms]
+    strategy.feed(closed)
+    # nothing closed in the lookback (new listing, outage): poll from its start, never from the epoch
+    last_open = int(closed['open_time'].iat[-1]) if len(closed) else start - 1
     while True:
-        now = pd.Timestamp.utcnow()
-        end_ms = int(now.timestamp() * 1000)
-        start_ms = end_ms - 1000 * 60 * 500  # ~500m lookback for MAs
-        df = fetch_klines(client, symbol, interval, start_ms, end_ms)
-        sig_series = strategy.generate_signals(df)
-        sig = int(sig_series.iat[-1]) if len(sig_series) else 0
-        px = float(df['close'].iat[-1])
+        time.sleep(5)
+        if qty is None and account.age() > reconcile_s:
+            try:
+                account.reconcile_sync(client)
+            except Exception as e:
+                log.warning(f"account refresh failed: {e}")
+        if rules.age() > rules_ttl:
+            try:
+                exe.rules = rules = load_symbol_rules(client, rules_path(settings), rules_ttl, refresh=True)
+            except Exception as e:
+                log.warning(f"symbol rules refresh failed: {e}")
+        now_ms = ms()
+        df = fetch_klines(client, symbol, interval, last_open + 1, now_ms)
+        new = df[(df['open_time'] > last_open) & (df['close_time'] < now_ms)]
+        if not len(new):
+            continue
+        sig = strategy.feed(new)
+        last_open = int(new['open_time'].iat[-1])
+        px = float(new['close'].iat[-1])
         if sig != 0 and sig != last_signal:
-            if qty is None:
+            order_qty = qty
+            if order_qty is None:
+                if not account.ready:
+                    account.reconcile_sync(client)
                 # simple fixed notional sizing: 1% of equity / price
-                acct = client.account()
-                equity = float(acct.get('totalWalletBalance', 0) or 0)
-                qty = max(0.0, (equity * settings['risk_per_trade']) / px)
-            if sig > 0:
-                log.info(f"Signal BUY -> market buy qty={qty}")
-                exe.market_buy(qty)
+                order_qty = max(0.0, (account.balance * settings['risk_per_trade']) / px)
+            try:
+                if sig > 0:
+                    log.info(f"Signal BUY -> market buy qty={order_qty}")
+                    exe.market_buy(order_qty, ref_price=px)
+                else:
+                    log.info(f"Signal SELL -> market sell qty={order_qty}")
+                    exe.market_sell(order_qty, ref_price=px)
+            except OrderRuleError as e:
+                log.warning(str(e))  # not sent: keep last_signal, as for any failed order
             else:
-                log.info(f"Signal SELL -> market sell qty={qty}")
-                exe.market_sell(qty)
-            last_signal = sig
-        time.sleep(5)
+                last_signal = sig
 
 
 def cmd_convert_freqtrade(args, settings):
@@ -97,33 +214,92 @@ def cmd_live_ws(args, settings):
     symbols = [s.strip().upper() for s in args.symbols.split(",")]
     runner = MultiSymbolWSRunner(settings, client, symbols, args.interval, args.strategy,
                                  strategy_params={'fast': int(args.fast), 'slow': int(args.slow)},
-                                 lookback=int(args.lookback), fixed_qty=(float(args.qty) if args.qty else None))
+                                 lookback=int(args.lookback), fixed_qty=(float(args.qty) if args.qty else None),
+                                 eval_pool=args.eval_pool, eval_pool_workers=(int(args.pool_workers) if args.pool_workers else None),
+                                 barrier=(True if args.barrier else None), order_transport=args.order_transport,
+                                 order_batch_window_ms=(float(args.order_batch_ms) if args.order_batch_ms else None),
+                                 instrument=(True if args.instrument or args.metrics_port else None),
+                                 metrics_port=(int(args.metrics_port) if args.metrics_port else None))
     asyncio.run(runner.run())
 
 
+def cmd_replay(args, settings):
+    import asyncio
+    from .backtest.replay import ReplayEngine
+    symbols = [s.strip().upper() for s in args.symbols.split(",")]
+    engine = ReplayEngine(settings, make_store(settings), symbols, args.interval, args.strategy,
+                          strategy_params={'fast': int(args.fast), 'slow': int(args.slow)},
+                          lookback=int(args.lookback), fixed_qty=(float(args.qty) if args.qty else None),
+                          equity0=float(args.equity0), updates_per_bar=int(args.updates_per_bar),
+                          closed_only=not args.open_updates, eval_pool=args.eval_pool,
+                          eval_pool_workers=(int(args.pool_workers) if args.pool_workers else None),
+                          barrier=(True if args.barrier else None),
+                          order_batch_window_ms=(float(args.order_batch_ms) if args.order_batch_ms else None),
+                          instrument=(True if args.instrument else None))
+    res = asyncio.run(engine.run(_to_ms(args.start), _to_ms(args.end)))
+    print(f"events={res.events} bars={res.bars} elapsed={res.seconds:.3f}s events/s={res.events_per_sec:,.0f} "
+          f"fills={res.fills} equity={res.equity:.2f} positions={res.positions}")
+    lat = engine.runner.close_latency.snapshot()
+    if lat['count']:  # pool / barrier mode
+        print(f"close->decision p50={lat['p50_ms']:.3f}ms p99={lat['p99_ms']:.3f}ms batches={lat['count']}")
+    if engine.runner.instr is not None:
+        print(engine.runner.instr.summary())
+
+
 def main(argv=None):
     settings = load_settings()
     p = argparse.ArgumentParser(prog="binance-trader")
     sub = p.add_subparsers(dest='cmd', required=True)
 
     pf = sub.add_parser('fetch', help='Fetch historical klines')
-    pf.add_argument('--symbol', required=True)
+    pf.add_argument('--symbol', required=True, help='Symbol or comma separated list (downloaded concurrently)')
     pf.add_argument('--interval', required=True)
     pf.add_argument('--start', required=True, help='UTC datetime like 2024-01-01')
     pf.add_argument('--end', required=True, help='UTC datetime like 2024-02-01')
-    pf.add_argument('--out', required=True)
+    pf.add_argument('--workers', default=8, help='Concurrent page downloads')
+    pf.add_argument('--out', default=None, help='Also export the range as CSV (klines are always synced into the local store)')
     pf.set_defaults(func=cmd_fetch)
 
     pb = sub.add_parser('backtest', help='Run backtest')
     pb.add_argument('--symbol', required=True)
     pb.add_argument('--interval', required=True)
-    pb.add_argument('--data', required=True)
+    pb.add_argument('--data', default=None, help='Kline CSV (default: read from the local store)')
+    pb.add_argument('--start', default=None, help='Store range start (UTC), e.g. 2024-01-01')
+    pb.add_argument('--end', default=None, help='Store range end (UTC, exclusive)')
     pb.add_argument('--strategy', default='sma_cross')
     pb.add_argument('--fast', default=20)
     pb.add_argument('--slow', default=60)
     pb.add_argument('--report', default=None)
+    pb.add_argument('--chunk-rows', default=None, help='Stream the data in chunks of this many bars (bounded memory)')
     pb.set_defaults(func=cmd_backtest)
 
+    ps = sub.add_parser('sweep', help='Grid-search strategy parameters over a process pool')
+    ps.add_argument('--symbol', required=True)
+    ps.add_argument('--interval', required=True)
+    ps.add_argument('--data', default=None, help='Kline CSV (default: read from the local store)')
+    ps.add_argument('--start', default=None, help='Store range start (UTC), e.g. 2024-01-01')
+    ps.add_argument('--end', default=None, help='Store range end (UTC, exclusive)')
+    ps.add_argument('--strategy', default='sma_cross', choices=['sma_cross'],
+                    help='The batched sweep evaluates SMA crossovers only')
+    ps.add_argument('--fast', default='5..50', help='Range lo..hi[:step] or comma list')
+    ps.add_argument('--slow', default='20..200', help='Range lo..hi[:step] or comma list')
+    ps.add_argument('--workers', default=None, help='Process count (default: all cores, 1 = serial)')
+    ps.add_argument('--rank-by', default='Sharpe', choices=['Sharpe', 'Return%', 'CAGR%', 'MaxDD%', 'Trades'])
+    ps.add_argument('--top', default=20)
+    ps.add_argument('--out', default=None)
+    ps.set_defaults(func=cmd_sweep)
+
+    pp = sub.add_parser('portfolio', help='Multi-symbol portfolio backtest from the local store')
+    pp.add_argument('--symbols', required=True, help='Comma separated, e.g., BTCUSDT,ETHUSDT')
+    pp.add_argument('--interval', required=True)
+    pp.add_argument('--start', default=None, help='UTC datetime like 2024-01-01')
+    pp.add_argument('--end', default=None, help='UTC datetime (exclusive)')
+    pp.add_argument('--fast', default=20)
+    pp.add_argument('--slow', default=60)
+    pp.add_argument('--memory-mb', default=512, help='Working-set budget for the (bars x symbols) chunks')
+    pp.add_argument('--report', default=None)
+    pp.set_defaults(func=cmd_portfolio)
+
     pl = sub.add_parser('live', help='Run live trading (polling)')
     pl.add_argument('--symbol', required=True)
     pl.add_argument('--interval', required=True)
@@ -149,8 +325,37 @@ def main(argv=None):
     pw.add_argument('--slow', default=60)
     pw.add_argument('--lookback', default=500)
     pw.add_argument('--qty', default=None)
+    pw.add_argument('--eval-pool', default=None, choices=['process', 'thread'], help='Evaluate each bar-close batch on a pool')
+    pw.add_argument('--pool-workers', default=None)
+    pw.add_argument('--barrier', action='store_true', help='Evaluate all symbols of a bar close as one matrix op')
+    pw.add_argument('--order-transport', choices=['rest', 'ws'], default=None,
+                    help='Send orders over REST or the WebSocket trading API (default: settings order_transport)')
+    pw.add_argument('--order-batch-ms', default=None, help='Coalesce REST orders within this window into batchOrders (0 = same tick)')
+    pw.add_argument('--instrument', action='store_true', help='Time hot-path stages; summary logged every metrics_log_s')
+    pw.add_argument('--metrics-port', default=None, help='Serve the stage histograms at http://127.0.0.1:PORT/metrics (implies --instrument)')
     pw.set_defaults(func=cmd_live_ws)
 
+    # replay (live runner code path over stored klines)
+    pr = sub.add_parser('replay', help='Replay stored klines through the live WS runner with a simulated exchange')
+    pr.add_argument('--symbols', required=True, help='Comma separated, e.g., BTCUSDT,ETHUSDT')
+    pr.add_argument('--interval', required=True)
+    pr.add_argument('--start', default=None)
+    pr.add_argument('--end', default=None)
+    pr.add_argument('--strategy', default='sma_cross')
+    pr.add_argument('--fast', default=20)
+    pr.add_argument('--slow', default=60)
+    pr.add_argument('--lookback', default=500)
+    pr.add_argument('--qty', default=None)
+    pr.add_argument('--equity0', default=10000.0)
+    pr.add_argument('--updates-per-bar', default=1, help='WS kline updates emitted per bar (last one closes it)')
+    pr.add_argument('--open-updates', action='store_true', help='Pass in-progress updates to the runner (closed_only=False)')
+    pr.add_argument('--eval-pool', default=None, choices=['process', 'thread'], help='Evaluate each bar-close batch on a pool')
+    pr.add_argument('--pool-workers', default=None)
+    pr.add_argument('--barrier', action='store_true', help='Evaluate all symbols of a bar close as one matrix op')
+    pr.add_argument('--order-batch-ms', default=None, help='Coalesce orders within this window into batchOrders (0 = same tick)')
+    pr.add_argument('--instrument', action='store_true', help='Time hot-path stages and print their percentiles')
+    pr.set_defaults(func=cmd_replay)
+
     args = p.parse_args(argv)
     args.func(args, settings)
 
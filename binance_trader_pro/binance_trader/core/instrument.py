@@ -0,0 +1,213 @@
+from __future__ import annotations
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from .logger import get_logger
+
+log = get_logger(__name__)
+
+_UNIT = 1e-6          # histogram resolution: 1 us
+_MAX_BITS = 40        # values up to 2**40 us (~12.7 days); larger ones land in the last bucket
+
+class Histogram:
+    """HDR-style latency histogram: fixed log-linear buckets over integer microseconds.
+    Values below 2**sub_bits us are exact; above, each power-of-two range is split into
+    2**(sub_bits-1) linear buckets, so every value is kept to within 2**-(sub_bits-1) relative
+    error (< 1.6% for the default 7). record() is a few integer operations and a list increment;
+    memory is fixed (~2.7k counters) whatever the sample count, and percentiles cover every sample.
+    Negative values (clock skew on exchange timestamps) are counted as 0.
+    """
+    __slots__ = ('sub_bits', 'count', 'total', 'max', '_half', '_size', '_counts')
+
+    def __init__(self, sub_bits: int = 7):
+        self.sub_bits = int(sub_bits)
+        self._half = 1 << (self.sub_bits - 1)
+        self._size = (1 << self.sub_bits) + (_MAX_BITS - self.sub_bits + 1) * self._half
+        self._counts: List[int] = [0] * self._size
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def _index(self, v: int) -> int:
+        shift = v.bit_length() - self.sub_bits
+        if shift <= 0:
+            return v
+        # = 2**sub_bits + (shift - 1) * half + (top sub_bits bits of v) - half
+        return min(self._size - 1, shift * self._half + (v >> shift))
+
+    def _upper(self, i: int) -> int:
+        """Largest value (us) of bucket i."""
+        full = 1 << self.sub_bits
+        if i < full:
+            return i
+        shift, m = divmod(i - full, self._half)
+        shift += 1
+        return ((m + self._half + 1) << shift) - 1
+
+    def record(self, seconds: float):
+        if seconds < 0.0:
+            seconds = 0.0
+        v = int(seconds * 1e6)
+        shift = v.bit_length() - self.sub_bits
+        if shift > 0:  # _index(), inlined
+            v = min(self._size - 1, shift * self._half + (v >> shift))
+        self._counts[v] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q: float) -> float:
+        """Seconds at or below which q percent of the samples fall (bucket upper bound, capped at max)."""
+        if not self.count:
+            return 0.0
+        rank = max(1, int(round(q / 100.0 * self.count)))
+        seen = 0
+        for i, c in enumerate(self._counts):
+            if c:
+                seen += c
+                if seen >= rank:
+                    return min(self._upper(i) * _UNIT, self.max)
+        return self.max
+
+    def buckets(self) -> List[Tuple[float, int]]:
+        """Cumulative (upper bound in seconds, samples below it) at each power of two microseconds up to
+        2**_MAX_BITS; bucket edges fall on powers of two, so the counts are exact."""
+        out, seen, i = [], 0, 0
+        for k in range(_MAX_BITS + 1):
+            end = self._index(1 << k)
+            seen += sum(self._counts[i:end])
+            i = end
+            out.append(((1 << k) * _UNIT, seen))
+        return out
+
+    def reset(self):
+        self._counts = [0] * self._size
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            'count': self.count,
+            'mean_ms': (self.total / self.count * 1e3) if self.count else 0.0,
+            'p50_ms': self.percentile(50) * 1e3,
+            'p90_ms': self.percentile(90) * 1e3,
+            'p99_ms': self.percentile(99) * 1e3,
+            'p999_ms': self.percentile(99.9) * 1e3,
+            'max_ms': self.max * 1e3,
+        }
+
+# stages of the live runner's hot path, in pipeline order
+STAGES = (
+    'ws_lag',          # exchange event time E -> message received locally (wall clocks, ms resolution)
+    'ws_decode',       # raw message -> KlineRecord
+    'queue',           # closing kline received -> _on_market() entered (shard queue + dispatcher)
+    'buffer_update',   # ring buffer upsert in _on_market()
+    'signal',          # generate_signals / update / last_signals (per symbol or per batch)
+    'sizing',          # equity read + quantity
+    'order_rtt',       # order sent -> exchange acknowledgement
+    'close_to_ack',    # closing kline received -> order acknowledged
+)
+
+class Instrumentation:
+    """Named histograms for the runner's hot path (see STAGES), timed with time.perf_counter().
+    Components hold an Optional[Instrumentation] and skip all timing when it is None, so a runner
+    without instrumentation pays one attribute test per stage.
+    Receive times of closing klines are kept per symbol (mark_close), so an order placed for a
+    bar can be timed from the moment its closing kline arrived, whichever evaluation path ran.
+    Everything runs on the event loop thread; no locking.
+    """
+    def __init__(self, sub_bits: int = 7):
+        self.sub_bits = sub_bits
+        self.hist: Dict[str, Histogram] = {name: Histogram(sub_bits) for name in STAGES}
+        self._closes: Dict[str, float] = {}  # symbol -> perf_counter() at receipt of its last closing kline
+        self.started = time.time()
+
+    def get(self, name: str) -> Histogram:
+        h = self.hist.get(name)
+        if h is None:
+            h = self.hist[name] = Histogram(self.sub_bits)
+        return h
+
+    def record(self, name: str, seconds: float):
+        self.get(name).record(seconds)
+
+    def wrap_decode(self, decode: Callable[[Any], Any]) -> Callable[[Any], Any]:
+        """decode(msg) timed, with E -> receive lag and the receipt time of closing klines."""
+        h_dec, h_lag = self.hist['ws_decode'], self.hist['ws_lag']
+        closes = self._closes
+        clock, wall = time.perf_counter, time.time
+
+        def timed(msg):
+            t0 = clock()
+            now_ms = wall() * 1000.0
+            rec = decode(msg)
+            t1 = clock()
+            h_dec.record(t1 - t0)
+            if rec is not None:
+                if rec.event_time:
+                    h_lag.record((now_ms - rec.event_time) / 1000.0)
+                if rec.closed:
+                    closes[rec.symbol] = t0
+            return rec
+        return timed
+
+    def mark_close(self, symbol: str, t: float):
+        self._closes[symbol] = t
+
+    def close_received(self, symbol: str) -> Optional[float]:
+        """perf_counter() at receipt of the symbol's last closing kline (None if none came from a socket)."""
+        return self._closes.get(symbol)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        return {name: h.snapshot() for name, h in self.hist.items() if h.count}
+
+    def summary(self) -> str:
+        """One line per recorded stage: count, p50 / p99 / max in ms."""
+        return "\n".join(f"{name:<14} n={s['count']:<8} p50={s['p50_ms']:.3f}ms p99={s['p99_ms']:.3f}ms "
+                         f"max={s['max_ms']:.3f}ms" for name, s in self.snapshot().items())
+
+    def prometheus(self, prefix: str = 'binance_trader', gauges: Optional[Dict[str, float]] = None) -> str:
+        """Prometheus text exposition: one histogram (cumulative _bucket, _sum, _count) per stage, plus gauges."""
+        name = f"{prefix}_stage_latency_seconds"
+        lines = [f"# HELP {name} Live runner hot-path stage latency.", f"# TYPE {name} histogram"]
+        for stage, h in self.hist.items():
+            for le, n in h.buckets():
+                lines.append(f'{name}_bucket{{stage="{stage}",le="{le}"}} {n}')
+            lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {h.count}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {h.total:.9f}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {h.count}')
+        for key, value in (gauges or {}).items():
+            lines.append(f"# TYPE {prefix}_{key} gauge")
+            lines.append(f"{prefix}_{key} {float(value):.9g}")
+        return "\n".join(lines) + "\n"
+
+class MetricsServer:
+    """Local HTTP endpoint serving GET /metrics in Prometheus text format (aiohttp, on the event loop)."""
+    def __init__(self, render: Callable[[], str], host: str = '127.0.0.1', port: int = 9108):
+        self.render = render
+        self.host = host
+        self.port = port
+        self._runner = None
+
+    async def start(self) -> Tuple[str, int]:
+        from aiohttp import web
+
+        async def metrics(request):
+            return web.Response(text=self.render(), content_type='text/plain', charset='utf-8',
+                                headers={'X-Content-Type-Options': 'nosniff'})
+
+        app = web.Application()
+        app.router.add_get('/metrics', metrics)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]  # resolves port 0
+        log.info(f"Metrics at http://{self.host}:{self.port}/metrics")
+        return self.host, self.port
+
+    async def close(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
@@ -0,0 +1,57 @@
+from __future__ import annotations
+import threading
+from collections import deque
+from typing import Dict
+
+class LatencyStats:
+    """Latency counter: totals over all samples, percentiles over a bounded window of recent ones (seconds in, ms out)."""
+    def __init__(self, window: int = 2048):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._recent: deque = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self._recent.append(seconds)
+
+    def percentile(self, q: float) -> float:
+        data = sorted(self._recent)
+        if not data:
+            return 0.0
+        return data[min(len(data) - 1, int(q / 100.0 * len(data)))]
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            'count': self.count,
+            'mean_ms': (self.total / self.count * 1e3) if self.count else 0.0,
+            'p50_ms': self.percentile(50) * 1e3,
+            'p99_ms': self.percentile(99) * 1e3,
+            'max_ms': self.max * 1e3,
+        }
+
+class LatencyRegistry:
+    """Named LatencyStats (e.g. one per endpoint), safe to record from several threads."""
+    def __init__(self, window: int = 2048):
+        self.window = window
+        self._stats: Dict[str, LatencyStats] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> LatencyStats:
+        st = self._stats.get(name)
+        if st is None:
+            with self._lock:
+                st = self._stats.setdefault(name, LatencyStats(self.window))
+        return st
+
+    def record(self, name: str, seconds: float):
+        st = self.get(name)
+        with self._lock:
+            st.record(seconds)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {k: v.snapshot() for k, v in sorted(self._stats.items())}
@@ -0,0 +1,86 @@
+from __future__ import annotations
+from typing import Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from .types import KLINE_COLUMNS
+
+class BarRingBuffer:
+    """Fixed-capacity, preallocated float64 bar buffer (rows = bars, columns = KLINE_COLUMNS).
+    Every row is written twice (slot i and i + capacity), so the most recent bars are always one
+    contiguous slice: view() is ordered oldest -> newest and zero-copy, append is O(1), and the
+    open bar is updated in place. Times are stored as float64 (exact for ms epoch timestamps).
+    `buf` may be supplied (shape (2*capacity, ncols)), e.g. backed by shared memory.
+    """
+    def __init__(self, capacity: int, columns: Sequence[str] = KLINE_COLUMNS, buf: Optional[np.ndarray] = None):
+        self.capacity = int(capacity)
+        self.columns = tuple(columns)
+        self._col = {c: i for i, c in enumerate(self.columns)}
+        if buf is None:
+            buf = np.full((2 * self.capacity, len(self.columns)), np.nan)
+        elif buf.shape != (2 * self.capacity, len(self.columns)):
+            raise ValueError(f"buffer shape {buf.shape} != {(2 * self.capacity, len(self.columns))}")
+        self._buf = buf
+        self._head = 0  # next write slot in [0, capacity)
+        self._len = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    @property
+    def cursor(self) -> Tuple[int, int]:
+        """(head, length): with the buffer contents this fully determines view()."""
+        return self._head, self._len
+
+    def seek(self, head: int, length: int):
+        """Adopt a cursor from another BarRingBuffer over the same (e.g. shared) memory."""
+        self._head, self._len = int(head), int(length)
+
+    def append(self, row: Sequence[float]):
+        h = self._head
+        self._buf[h] = row
+        self._buf[h + self.capacity] = row
+        self._head = (h + 1) % self.capacity
+        if self._len < self.capacity:
+            self._len += 1
+
+    def update_last(self, row: Sequence[float]):
+        h = (self._head - 1) % self.capacity
+        self._buf[h] = row
+        self._buf[h + self.capacity] = row
+
+    def upsert(self, row: Sequence[float]) -> bool:
+        """Update the open bar in place if row[0] (open_time) matches it, else append. Returns True on append.
+        Rows older than the last bar are ignored.
+        """
+        if self._len:
+            last = self._buf[(self._head - 1) % self.capacity, 0]
+            if row[0] == last:
+                self.update_last(row)
+                return False
+            if row[0] < last:
+                return False
+        self.append(row)
+        return True
+
+    def extend(self, rows: np.ndarray):
+        rows = np.asarray(rows, dtype=np.float64)[-self.capacity:]
+        for r in rows:
+            self.append(r)
+
+    def view(self) -> np.ndarray:
+        """Ordered (len, ncols) zero-copy view, oldest first."""
+        start = self._head - self._len
+        if start < 0:
+            start += self.capacity
+            return self._buf[start:start + self._len]
+        return self._buf[start:self._head]
+
+    def column(self, name: str) -> np.ndarray:
+        return self.view()[:, self._col[name]]
+
+    def last(self, name: str) -> float:
+        return float(self._buf[(self._head - 1) % self.capacity, self._col[name]])
+
+    def frame(self) -> pd.DataFrame:
+        """DataFrame over view() without copying (single float64 block)."""
+        return pd.DataFrame(self.view(), columns=list(self.columns), copy=False)
@@ -2,6 +2,8 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Optional
 
+KLINE_COLUMNS = ('open_time', 'open', 'high', 'low', 'close', 'volume', 'close_time')
+
 @dataclass
 class Bar:
     open_time: int
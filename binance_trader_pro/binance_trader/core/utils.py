@@ -9,3 +9,12 @@ def sign_query(query: Dict[str, str], secret: str) -> str:
 
 def ms() -> int:
     return int(time.time() * 1000)
+
+_INTERVAL_UNIT_MS = {'s': 1000, 'm': 60_000, 'h': 3_600_000, 'd': 86_400_000, 'w': 604_800_000, 'M': 2_592_000_000}
+
+def interval_ms(interval: str) -> int:
+    """Binance kline interval ('1m', '4h', '1d', '1M', ...) in milliseconds (1M counted as 30d)."""
+    try:
+        return int(interval[:-1]) * _INTERVAL_UNIT_MS[interval[-1]]
+    except (KeyError, ValueError):
+        raise ValueError(f"Unknown interval: {interval}")
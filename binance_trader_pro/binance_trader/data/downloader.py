@@ -0,0 +1,114 @@
+from __future__ import annotations
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from ..core.logger import get_logger
+from ..core.utils import interval_ms
+from ..exchange.rate_limit import DEFAULT_GOVERNOR, DEFAULT_WEIGHT_LIMIT, RateGovernor
+
+KLINES_PATH = "/fapi/v1/klines"
+PAGE_LIMIT = 1500
+
+log = get_logger(__name__)
+
+class KlineDownloader:
+    """Concurrent historical kline downloader.
+    Splits each [start_ms, end_ms] range into page-aligned chunks (PAGE_LIMIT bars each), fetches
+    all (symbol, page) chunks over a thread pool sharing one pooled keep-alive session, and stitches
+    pages back in open_time order with duplicates removed.
+    A page is tried up to `max_attempts` times: 418/429 wait for the governor (Retry-After), 5xx,
+    connection errors and timeouts back off exponentially from `backoff_s`; then RuntimeError.
+    """
+    def __init__(self, base_url: str, max_workers: int = 8, weight_limit: int = DEFAULT_WEIGHT_LIMIT,
+                 timeout: int = 15, session: Optional[requests.Session] = None, governor: Optional[RateGovernor] = None,
+                 max_attempts: int = 5, backoff_s: float = 1.0):
+        self.base = base_url.rstrip('/')
+        self.max_workers = max(1, int(max_workers))
+        self.timeout = timeout
+        self.max_attempts = max(1, int(max_attempts))
+        self.backoff_s = backoff_s
+        # page requests are BULK priority: order traffic on the shared governor goes first
+        self.governor = governor or (DEFAULT_GOVERNOR if weight_limit == DEFAULT_WEIGHT_LIMIT else RateGovernor(weight_limit))
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+        self.session = session
+
+    @classmethod
+    def from_client(cls, client, **kw) -> "KlineDownloader":
+        """Downloader sharing the client's pooled session (and its open connections)."""
+        kw.setdefault('session', getattr(client, 'session', None))
+        kw.setdefault('governor', getattr(client, 'governor', None))
+        return cls(client.base, timeout=client.timeout, **kw)
+
+    def pages(self, interval: str, start_ms: int, end_ms: int) -> List[Tuple[int, int]]:
+        """Inclusive [start, end] page windows of at most PAGE_LIMIT bars, aligned to the interval grid."""
+        step = interval_ms(interval)
+        span = step * PAGE_LIMIT
+        cur = start_ms - start_ms % step if start_ms % step else start_ms
+        out = []
+        while cur <= end_ms:
+            out.append((max(cur, start_ms), min(cur + span - 1, end_ms)))
+            cur += span
+        return out
+
+    def _get_page(self, symbol: str, interval: str, lo: int, hi: int) -> list:
+        params = {"symbol": symbol, "interval": interval, "limit": PAGE_LIMIT, "startTime": lo, "endTime": hi}
+        for attempt in range(1, self.max_attempts + 1):
+            self.governor.acquire('GET', KLINES_PATH, params)
+            try:
+                r = self.session.get(self.base + KLINES_PATH, params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = f"{type(e).__name__}: {e}"
+            else:
+                self.governor.observe(r.headers, r.status_code)
+                if r.status_code < 400:
+                    return r.json()
+                error = f"HTTP {r.status_code}: {r.text}"
+                if r.status_code not in (418, 429) and r.status_code < 500:
+                    raise RuntimeError(error)
+                if r.status_code in (418, 429):
+                    # the governor holds every call until Retry-After has passed: no extra sleep here
+                    log.warning(f"[{symbol}] {error} on klines (attempt {attempt}/{self.max_attempts})")
+                    continue
+            if attempt < self.max_attempts:
+                wait = self.backoff_s * 2 ** (attempt - 1)
+                log.warning(f"[{symbol}] klines {error} (attempt {attempt}/{self.max_attempts}), retrying in {wait:.1f}s")
+                time.sleep(wait)
+        raise RuntimeError(f"[{symbol}] klines {lo}..{hi} failed after {self.max_attempts} attempts: {error}")
+
+    def fetch_ranges(self, interval: str, jobs: Sequence[Tuple[str, int, int]]) -> List[pd.DataFrame]:
+        """jobs: (symbol, start_ms, end_ms) with inclusive end. Returns one kline frame per job, in job order."""
+        tasks = [(j, symbol, lo, hi) for j, (symbol, start, end) in enumerate(jobs)
+                 for lo, hi in self.pages(interval, start, end)]
+        if len(tasks) <= 1 or self.max_workers == 1:
+            results = [self._get_page(symbol, interval, lo, hi) for _, symbol, lo, hi in tasks]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(tasks))) as pool:
+                results = list(pool.map(lambda t: self._get_page(t[1], interval, t[2], t[3]), tasks))
+        rows: List[list] = [[] for _ in jobs]
+        for (j, *_), res in zip(tasks, results):
+            rows[j].extend(res)
+        return [klines_frame(r) for r in rows]
+
+    def fetch(self, symbol: str, interval: str, start_ms: int, end_ms: int) -> pd.DataFrame:
+        return self.fetch_ranges(interval, [(symbol, start_ms, end_ms)])[0]
+
+    def fetch_many(self, symbols: Iterable[str], interval: str, start_ms: int, end_ms: int) -> Dict[str, pd.DataFrame]:
+        symbols = list(symbols)
+        return dict(zip(symbols, self.fetch_ranges(interval, [(s, start_ms, end_ms) for s in symbols])))
+
+KLINE_RAW_COLUMNS = ['open_time','open','high','low','close','volume','close_time','qav','trades','taker_base','taker_quote','ignore']
+
+def klines_frame(rows: list) -> pd.DataFrame:
+    """Raw /klines rows -> typed frame, sorted and de-duplicated by open_time."""
+    df = pd.DataFrame(rows, columns=KLINE_RAW_COLUMNS)
+    for c in ['open','high','low','close','volume','qav','taker_base','taker_quote']:
+        df[c] = pd.to_numeric(df[c], errors='coerce')
+    df = df.drop_duplicates('open_time').sort_values('open_time', kind='stable').reset_index(drop=True)
+    return df[['open_time','open','high','low','close','volume','close_time']]
@@ -0,0 +1,225 @@
+from __future__ import annotations
+import json, os
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from ..core.logger import get_logger
+from ..core.types import KLINE_COLUMNS
+from ..core.utils import interval_ms, ms
+from ..exchange.binance_http import BinanceUMClient
+from .downloader import KlineDownloader
+
+KLINE_DTYPES = {c: np.dtype('<i8') if c.endswith('_time') else np.dtype('<f8') for c in KLINE_COLUMNS}
+
+log = get_logger(__name__)
+
+class KlineStore:
+    """Local columnar kline store.
+    Layout: {root}/{SYMBOL}/{interval}/{column}.bin  (raw little-endian int64/float64, one file per column)
+            {root}/{SYMBOL}/{interval}/meta.json     ({"rows": n, "covered": [[lo, hi), ...]} - committed
+                                                      after the column writes)
+    Rows are kept sorted and unique by open_time, which doubles as the index (binary search).
+    Reads are read-only np.memmap views, so slices are zero-copy. Appends only grow the files; a rewrite
+    (backfill before the tail) swaps in new files, so existing maps keep the old, consistent data.
+    `covered` lists the open_time ranges known to be complete (synced from the exchange, or spanned by
+    contiguous appended rows), so a hole inside the stored span is still reported by missing(), while
+    a range the exchange has no bars for is not fetched again.
+    """
+    def __init__(self, root: str):
+        self.root = root
+        self._maps: Dict[Tuple[str, str], Dict[str, np.ndarray]] = {}
+
+    def _dir(self, symbol: str, interval: str) -> str:
+        return os.path.join(self.root, symbol.upper(), interval)
+
+    def _meta(self, symbol: str, interval: str) -> dict:
+        d = self._dir(symbol, interval)
+        if os.path.exists(os.path.join(d, 'meta.json.next')):
+            self._finish_rewrite(d)
+        try:
+            with open(os.path.join(d, 'meta.json'), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {'rows': 0}
+
+    def rows(self, symbol: str, interval: str) -> int:
+        return int(self._meta(symbol, interval)['rows'])
+
+    def covered(self, symbol: str, interval: str) -> List[Tuple[int, int]]:
+        """Half-open open_time ranges [lo, hi) known to be complete (stores written before coverage
+        was recorded: the runs of consecutive bars on disk)."""
+        meta = self._meta(symbol, interval)
+        if 'covered' in meta:
+            return [(int(lo), int(hi)) for lo, hi in meta['covered']]
+        return _runs(self.columns(symbol, interval)['open_time'], interval_ms(interval))
+
+    def columns(self, symbol: str, interval: str) -> Dict[str, np.ndarray]:
+        key = (symbol.upper(), interval)
+        cols = self._maps.get(key)
+        if cols is None:
+            n = self.rows(symbol, interval)
+            d = self._dir(symbol, interval)
+            cols = {c: (np.memmap(os.path.join(d, f'{c}.bin'), dtype=KLINE_DTYPES[c], mode='r', shape=(n,)) if n
+                        else np.empty(0, dtype=KLINE_DTYPES[c])) for c in KLINE_COLUMNS}
+            self._maps[key] = cols
+        return cols
+
+    def span(self, symbol: str, interval: str) -> Optional[Tuple[int, int]]:
+        """(first open_time, last open_time) on disk, or None if empty."""
+        ot = self.columns(symbol, interval)['open_time']
+        return (int(ot[0]), int(ot[-1])) if len(ot) else None
+
+    def slice(self, symbol: str, interval: str, start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Zero-copy column views for start_ms <= open_time < end_ms."""
+        cols = self.columns(symbol, interval)
+        ot = cols['open_time']
+        lo = int(np.searchsorted(ot, start_ms, 'left')) if start_ms is not None else 0
+        hi = int(np.searchsorted(ot, end_ms, 'left')) if end_ms is not None else len(ot)
+        return {c: a[lo:hi] for c, a in cols.items()}
+
+    def tail(self, symbol: str, interval: str, n: int) -> Dict[str, np.ndarray]:
+        return {c: a[max(0, len(a) - n):] for c, a in self.columns(symbol, interval).items()}
+
+    def frame(self, symbol: str, interval: str, start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> pd.DataFrame:
+        return pd.DataFrame(self.slice(symbol, interval, start_ms, end_ms), columns=list(KLINE_COLUMNS), copy=False)
+
+    def iter_frames(self, symbol: str, interval: str, start_ms: Optional[int] = None, end_ms: Optional[int] = None,
+                    rows: int = 100_000) -> Iterator[pd.DataFrame]:
+        """frame() in consecutive chunks of at most `rows` bars (each chunk reads only its pages)."""
+        cols = self.slice(symbol, interval, start_ms, end_ms)
+        n = len(cols['open_time'])
+        for lo in range(0, n, max(1, int(rows))):
+            yield pd.DataFrame({c: a[lo:lo + rows] for c, a in cols.items()}, columns=list(KLINE_COLUMNS))
+
+    def append(self, symbol: str, interval: str, df: pd.DataFrame, covered: Optional[Tuple[int, int]] = None) -> int:
+        """Add rows (a kline frame); rows already on disk are skipped. Returns rows added.
+        `covered` ([lo, hi) open_time range the frame is complete for, e.g. the fetched range) is added to
+        the coverage; by default the runs of consecutive bars in the frame are."""
+        step = interval_ms(interval)
+        new = df[list(KLINE_COLUMNS)].drop_duplicates('open_time').sort_values('open_time') \
+            if df is not None and len(df) else pd.DataFrame(columns=list(KLINE_COLUMNS))
+        ranges = self.covered(symbol, interval) + ([covered] if covered is not None else
+                                                   _runs(new['open_time'].to_numpy(dtype='int64'), step))
+        n = self.rows(symbol, interval)
+        span = self.span(symbol, interval)
+        if span is not None and len(new):
+            new = new[~np.isin(new['open_time'].to_numpy(dtype='int64'), self.columns(symbol, interval)['open_time'])]
+            if len(new) and int(new['open_time'].iat[0]) < span[1]:
+                # backfill before the head or into a hole: rewrite (rare; normal syncs only append at the tail)
+                merged = pd.concat([new, self.frame(symbol, interval)], ignore_index=True).sort_values('open_time')
+                return self._rewrite(symbol, interval, merged, covered=ranges) - n
+        if not len(new):
+            if n or covered is not None:
+                self._write(symbol, interval, new, mode='r+b' if n else 'wb', base=n, covered=ranges)
+            return 0
+        return self._write(symbol, interval, new, mode='r+b' if n else 'wb', base=n, covered=ranges)
+
+    def _write(self, symbol: str, interval: str, df: pd.DataFrame, mode: str, base: int,
+               covered: Iterable[Tuple[int, int]] = ()) -> int:
+        d = self._dir(symbol, interval)
+        os.makedirs(d, exist_ok=True)
+        self._maps.pop((symbol.upper(), interval), None)
+        for c in KLINE_COLUMNS:
+            path = os.path.join(d, f'{c}.bin')
+            with open(path, mode if os.path.exists(path) else 'wb') as f:
+                # drop any bytes past the committed row count (interrupted earlier write)
+                f.truncate(base * KLINE_DTYPES[c].itemsize)
+                f.seek(0, os.SEEK_END)
+                f.write(df[c].to_numpy(dtype=KLINE_DTYPES[c]).tobytes())
+        total = base + len(df)
+        _write_json(os.path.join(d, 'meta.json'), {'rows': total, 'covered': [list(r) for r in _merge(covered)]})
+        return total - base
+
+    def _rewrite(self, symbol: str, interval: str, df: pd.DataFrame, covered: Iterable[Tuple[int, int]] = ()) -> int:
+        """Replace the whole series without touching the files readers may have mapped: new columns go to
+        {column}.bin.new, meta.json.next commits them, then each is swapped in with os.replace and the meta
+        last. A rewrite interrupted after the commit is finished by the next _meta(); one interrupted before
+        it leaves the old series in place (stray .bin.new files are overwritten by the next rewrite)."""
+        d = self._dir(symbol, interval)
+        os.makedirs(d, exist_ok=True)
+        self._maps.pop((symbol.upper(), interval), None)
+        for c in KLINE_COLUMNS:
+            with open(os.path.join(d, f'{c}.bin.new'), 'wb') as f:
+                f.write(df[c].to_numpy(dtype=KLINE_DTYPES[c]).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+        _write_json(os.path.join(d, 'meta.json.next'), {'rows': len(df), 'covered': [list(r) for r in _merge(covered)]})
+        self._finish_rewrite(d)
+        return len(df)
+
+    @staticmethod
+    def _finish_rewrite(d: str):
+        """Swap in the committed {column}.bin.new files, then meta.json.next (idempotent)."""
+        for c in KLINE_COLUMNS:
+            new = os.path.join(d, f'{c}.bin.new')
+            if os.path.exists(new):
+                os.replace(new, os.path.join(d, f'{c}.bin'))
+        os.replace(os.path.join(d, 'meta.json.next'), os.path.join(d, 'meta.json'))
+
+    def missing(self, symbol: str, interval: str, start_ms: int, end_ms: int) -> List[Tuple[int, int]]:
+        """Inclusive ranges of [start_ms, end_ms) not covered (before the head, after the tail, or holes)."""
+        step = interval_ms(interval)
+        end_ms = min(end_ms, ms())
+        ranges, lo = [], start_ms
+        for c_lo, c_hi in self.covered(symbol, interval):
+            if c_hi <= lo:
+                continue
+            if c_lo >= end_ms:
+                break
+            if c_lo > lo:
+                ranges.append((lo, c_lo - 1))
+            lo = max(lo, c_hi)
+        if lo < end_ms:
+            ranges.append((lo, end_ms - 1))
+        return [(lo, hi) for lo, hi in ranges if hi - lo + 1 >= step]
+
+    def sync(self, client: BinanceUMClient, symbol: str, interval: str, start_ms: int, end_ms: int) -> int:
+        """Fetch only the ranges of [start_ms, end_ms) missing on disk and append them. Unclosed bars are not stored."""
+        return self.sync_many(client, [symbol], interval, start_ms, end_ms)[symbol]
+
+    def sync_many(self, client: BinanceUMClient, symbols: Iterable[str], interval: str, start_ms: int, end_ms: int,
+                  max_workers: int = 8) -> Dict[str, int]:
+        """sync() for several symbols with every missing page downloaded concurrently."""
+        symbols = list(symbols)
+        jobs = [(s, lo, hi) for s in symbols for lo, hi in self.missing(s, interval, start_ms, end_ms)]
+        frames = KlineDownloader.from_client(client, max_workers=max_workers).fetch_ranges(interval, jobs) if jobs else []
+        added = {s: 0 for s in symbols}
+        now = ms()
+        step = interval_ms(interval)
+        for (s, lo, hi), df in zip(jobs, frames):
+            # the fetched range is complete up to the last closed bar (open_time <= now - step)
+            hi = min(hi + 1, now - step + 1)
+            added[s] += self.append(s, interval, df[df['close_time'] < now], covered=(lo, hi) if hi > lo else None)
+        for s, n in added.items():
+            if n:
+                log.info(f"[{s.upper()} {interval}] store +{n} rows ({self.rows(s, interval)} total)")
+        return added
+
+def _write_json(path: str, obj: dict):
+    """Write obj to path atomically (temp file, then os.replace)."""
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(obj, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def _runs(open_time: np.ndarray, step: int) -> List[Tuple[int, int]]:
+    """[first, last + step) of each run of consecutive bars."""
+    if not len(open_time):
+        return []
+    ot = np.asarray(open_time, dtype='int64')
+    breaks = np.flatnonzero(np.diff(ot) != step)
+    starts = np.concatenate(([0], breaks + 1))
+    ends = np.concatenate((breaks, [len(ot) - 1]))
+    return [(int(ot[a]), int(ot[b]) + step) for a, b in zip(starts, ends)]
+
+def _merge(ranges: Iterable[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Sorted union of half-open ranges (overlapping or adjacent ones joined)."""
+    out: List[List[int]] = []
+    for lo, hi in sorted(ranges):
+        if out and lo <= out[-1][1]:
+            out[-1][1] = max(out[-1][1], hi)
+        else:
+            out.append([lo, hi])
+    return [(lo, hi) for lo, hi in out]
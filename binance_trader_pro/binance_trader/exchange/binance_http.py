@@ -1,11 +1,16 @@
 from __future__ import annotations
 import os, time, json, requests
-from typing import Dict, Optional, Any
+from typing import Dict, List, Optional, Any
 from dataclasses import dataclass
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from ..core.utils import sign_query, ms
 from ..core.logger import get_logger
+from ..core.latency import LatencyRegistry
+from .rate_limit import DEFAULT_GOVERNOR, RateGovernor
 
 DEFAULT_TIMEOUT = 15
+MAX_BATCH_ORDERS = 5  # per /fapi/v1/batchOrders request
 
 @dataclass
 class BinanceConfig:
@@ -13,18 +18,52 @@ class BinanceConfig:
     api_secret: str
     base_url: str
 
+def order_params(symbol: str, side: str, type_: str, qty: float, price: Optional[float] = None,
+                 reduceOnly: Optional[bool] = None, timeInForce: Optional[str] = None,
+                 client_id: Optional[str] = None) -> Dict[str, Any]:
+    """new_order arguments -> Binance order parameters (shared by the REST and WS order paths)."""
+    params: Dict[str, Any] = {"symbol": symbol, "side": side, "type": type_, "quantity": qty}
+    if price is not None: params["price"] = price
+    if timeInForce: params["timeInForce"] = timeInForce
+    if reduceOnly is not None: params["reduceOnly"] = str(reduceOnly).lower()
+    if client_id: params["newClientOrderId"] = client_id
+    return params
+
 class BinanceUMClient:
     """Minimal REST client for Binance USDⓈ-M Futures (/fapi).
     Official base URLs (2025-07-27):
       - Mainnet: https://fapi.binance.com
       - Testnet: https://testnet.binancefuture.com
     """
-    def __init__(self, cfg: BinanceConfig, timeout: int = DEFAULT_TIMEOUT):
+    def __init__(self, cfg: BinanceConfig, timeout: int = DEFAULT_TIMEOUT, pool_size: int = 16,
+                 retries: int = 3, backoff: float = 0.2, governor: Optional[RateGovernor] = None):
         self.key = cfg.api_key
         self.secret = cfg.api_secret
         self.base = cfg.base_url.rstrip('/')
         self.timeout = timeout
         self.log = get_logger(__name__)
+        self.session = self._make_session(pool_size, retries, backoff)
+        # per-endpoint round-trip latency, keyed "METHOD /path"
+        self.latency = LatencyRegistry()
+        # request weight / order count limits, shared process-wide by default
+        self.governor = governor or DEFAULT_GOVERNOR
+
+    def _make_session(self, pool_size: int, retries: int, backoff: float) -> requests.Session:
+        """Keep-alive session: connections are reused across calls, so only the first request pays TCP/TLS setup.
+        Transient 5xx/connection errors are retried with backoff for idempotent methods only (never POST orders).
+        """
+        retry = Retry(total=retries, connect=retries, read=retries, backoff_factor=backoff,
+                      status_forcelist=(500, 502, 503, 504), allowed_methods=frozenset({'GET', 'PUT', 'DELETE'}),
+                      respect_retry_after_header=True, raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry)
+        sess = requests.Session()
+        sess.mount('https://', adapter)
+        sess.mount('http://', adapter)
+        sess.headers.update(self._headers())
+        return sess
+
+    def close(self):
+        self.session.close()
 
     # ---- Public endpoints ----
     def ping(self) -> Dict[str, Any]:
@@ -62,13 +101,17 @@ class BinanceUMClient:
 
     def new_order(self, symbol: str, side: str, type_: str, qty: float, price: Optional[float] = None,
                   reduceOnly: Optional[bool] = None, timeInForce: Optional[str] = None, client_id: Optional[str] = None):
-        params: Dict[str, Any] = {"symbol": symbol, "side": side, "type": type_, "quantity": qty}
-        if price is not None: params["price"] = price
-        if timeInForce: params["timeInForce"] = timeInForce
-        if reduceOnly is not None: params["reduceOnly"] = str(reduceOnly).lower()
-        if client_id: params["newClientOrderId"] = client_id
+        params = order_params(symbol, side, type_, qty, price, reduceOnly, timeInForce, client_id)
         return self._signed_post("/fapi/v1/order", params)
 
+    def batch_orders(self, orders: List[Dict[str, Any]]):
+        """POST /fapi/v1/batchOrders: up to MAX_BATCH_ORDERS order_params() dicts in one request.
+        Returns one entry per order, in order: the order, or {'code', 'msg'} if that order failed."""
+        if not 0 < len(orders) <= MAX_BATCH_ORDERS:
+            raise ValueError(f"batch of {len(orders)} orders (1..{MAX_BATCH_ORDERS} allowed)")
+        batch = json.dumps([{k: str(v) for k, v in o.items()} for o in orders], separators=(',', ':'))
+        return self._signed_post("/fapi/v1/batchOrders", {"batchOrders": batch})
+
     def cancel_order(self, symbol: str, orderId: Optional[int] = None, clientOrderId: Optional[str] = None):
         params: Dict[str, Any] = {"symbol": symbol}
         if orderId: params["orderId"] = orderId
@@ -94,56 +137,41 @@ class BinanceUMClient:
             h["X-MBX-APIKEY"] = self.key
         return h
 
-    def _get(self, path: str, params: Optional[Dict[str, Any]] = None):
+    def _request(self, method: str, path: str, params: Optional[Dict[str, Any]] = None, signed: bool = False):
         url = self.base + path
-        r = requests.get(url, params=params, headers=self._headers(False), timeout=self.timeout)
+        if signed:
+            query = dict(params or {})
+            query["timestamp"] = ms()
+            url = f"{url}?{sign_query(query, self.secret)}"
+            params = None
+        self.governor.acquire(method, path, query if signed else params)
+        t0 = time.perf_counter()
+        r = self.session.request(method, url, params=params, timeout=self.timeout)
+        self.latency.record(f"{method} {path}", time.perf_counter() - t0)
+        self.governor.observe(r.headers, r.status_code)
         self._raise(r)
         return r.json()
 
+    def _get(self, path: str, params: Optional[Dict[str, Any]] = None):
+        return self._request("GET", path, params)
+
     def _post(self, path: str, params: Optional[Dict[str, Any]] = None):
-        url = self.base + path
-        r = requests.post(url, params=params, headers=self._headers(True), timeout=self.timeout)
-        self._raise(r)
-        return r.json()
+        return self._request("POST", path, params)
 
     def _put(self, path: str, params: Optional[Dict[str, Any]] = None):
-        url = self.base + path
-        r = requests.put(url, params=params, headers=self._headers(True), timeout=self.timeout)
-        self._raise(r)
-        return r.json()
+        return self._request("PUT", path, params)
 
     def _delete(self, path: str, params: Optional[Dict[str, Any]] = None):
-        url = self.base + path
-        r = requests.delete(url, params=params, headers=self._headers(True), timeout=self.timeout)
-        self._raise(r)
-        return r.json()
+        return self._request("DELETE", path, params)
 
     def _signed_get(self, path: str, params: Dict[str, Any]):
-        query = dict(params)
-        query["timestamp"] = ms()
-        qs = sign_query(query, self.secret)
-        url = f"{self.base}{path}?{qs}"
-        r = requests.get(url, headers=self._headers(True), timeout=self.timeout)
-        self._raise(r)
-        return r.json()
+        return self._request("GET", path, params, signed=True)
 
     def _signed_post(self, path: str, params: Dict[str, Any]):
-        query = dict(params)
-        query["timestamp"] = ms()
-        qs = sign_query(query, self.secret)
-        url = f"{self.base}{path}?{qs}"
-        r = requests.post(url, headers=self._headers(True), timeout=self.timeout)
-        self._raise(r)
-        return r.json()
+        return self._request("POST", path, params, signed=True)
 
     def _signed_delete(self, path: str, params: Dict[str, Any]):
-        query = dict(params)
-        query["timestamp"] = ms()
-        qs = sign_query(query, self.secret)
-        url = f"{self.base}{path}?{qs}"
-        r = requests.delete(url, headers=self._headers(True), timeout=self.timeout)
-        self._raise(r)
-        return r.json()
+        return self._request("DELETE", path, params, signed=True)
 
     def _raise(self, r: requests.Response):
         if r.status_code >= 400:
@@ -0,0 +1,72 @@
+from __future__ import annotations
+import time
+from typing import Dict, Optional, Any
+import aiohttp
+from yarl import URL
+from ..core.utils import sign_query, ms
+from ..core.logger import get_logger
+from ..core.latency import LatencyRegistry
+from .binance_http import BinanceUMClient, BinanceConfig, DEFAULT_TIMEOUT
+from .rate_limit import DEFAULT_GOVERNOR, RateGovernor
+
+class AsyncBinanceUMClient(BinanceUMClient):
+    """asyncio twin of BinanceUMClient on a pooled aiohttp session.
+    Same endpoint methods (account, new_order, klines, ...) - each returns an awaitable, so an
+    HTTP round trip suspends only the calling task instead of blocking the event loop.
+    The session is created lazily inside the running loop; call `await close()` when done.
+    """
+    def __init__(self, cfg: BinanceConfig, timeout: int = DEFAULT_TIMEOUT, pool_size: int = 64,
+                 governor: Optional[RateGovernor] = None):
+        self.key = cfg.api_key
+        self.secret = cfg.api_secret
+        self.base = cfg.base_url.rstrip('/')
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.log = get_logger(__name__)
+        self.latency = LatencyRegistry()
+        self.governor = governor or DEFAULT_GOVERNOR
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @classmethod
+    def from_client(cls, client: BinanceUMClient, **kw) -> "AsyncBinanceUMClient":
+        kw.setdefault('governor', client.governor)
+        return cls(BinanceConfig(client.key, client.secret, client.base), timeout=client.timeout, **kw)
+
+    def _ensure_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(connector=connector, headers=self._headers(),
+                                                  timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self._session
+
+    async def _request(self, method: str, path: str, params: Optional[Dict[str, Any]] = None, signed: bool = False):
+        session = self._ensure_session()
+        url = self.base + path
+        if signed:
+            query = dict(params or {})
+            query["timestamp"] = ms()
+            # encoded=True: send the signed query string byte-for-byte
+            url = URL(f"{url}?{sign_query(query, self.secret)}", encoded=True)
+            params = None
+        await self.governor.acquire_async(method, path, query if signed else params)
+        t0 = time.perf_counter()
+        async with session.request(method, url, params=params) as r:
+            try:
+                payload = await r.json(content_type=None)
+            except Exception:
+                payload = await r.text()
+            self.latency.record(f"{method} {path}", time.perf_counter() - t0)
+            self.governor.observe(r.headers, r.status)
+            if r.status >= 400:
+                raise RuntimeError(f"HTTP {r.status}: {payload}")
+            return payload
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
@@ -1,10 +1,11 @@
 from __future__ import annotations
-import asyncio, json
-from typing import Iterable, Dict, Any, Optional
+import asyncio, json, random, time
+from typing import Iterable, Dict, Any, List, Optional
 import websockets
 
 from ..core.logger import get_logger
-from ..exchange.binance_http import BinanceUMClient
+from ..exchange.binance_http_async import AsyncBinanceUMClient
+from .ws_decode import KlineDecoder
 
 log = get_logger(__name__)
 
@@ -14,41 +15,136 @@ def _ws_market_base(settings: dict) -> str:
 def _ws_user_base(settings: dict) -> str:
     return settings['wss_market_testnet'] if settings.get('testnet', True) else settings['wss_market_mainnet']
 
-class BinanceMarketWS:
-    """Combined kline stream consumer.
-    URL: {base}/stream?streams=btcusdt@kline_1m/ethusdt@kline_1m
+class MarketShard:
+    """One market-stream connection: its symbols, a reader task and a bounded queue to its consumer.
+    The reader decodes and enqueues; when the queue is full it waits (backpressure on this socket
+    only), and the time spent waiting is recorded. Records are never dropped here.
     """
-    def __init__(self, settings: dict, symbols: Iterable[str], interval: str):
-        self.base = _ws_market_base(settings).rstrip('/')
-        self.symbols = [s.lower() for s in symbols]
-        self.interval = interval
-        self.url = self.base + "/stream?streams=" + "/".join(f"{s}@kline_{interval}" for s in self.symbols)
+    def __init__(self, index: int, base: str, symbols: List[str], interval: str, queue_size: int):
+        self.index = index
+        self.symbols = symbols
+        self.url = base + "/stream?streams=" + "/".join(f"{s}@kline_{interval}" for s in symbols)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.received = 0
+        self.max_depth = 0
+        self.full_waits = 0
+        self.blocked_s = 0.0
+        self.reconnects = 0
+        self.connected = False
 
-    async def run(self, handler):
+    async def _put(self, rec):
+        q = self.queue
+        if q.full():
+            self.full_waits += 1
+            t0 = time.perf_counter()
+            await q.put(rec)
+            self.blocked_s += time.perf_counter() - t0
+        else:
+            q.put_nowait(rec)
+        depth = q.qsize()
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+    async def read(self, decode, first_delay: float, backoff: float, max_backoff: float):
+        await asyncio.sleep(first_delay)  # staggered start: shards do not all connect at once
+        delay = backoff
         while True:
             try:
-                async with websockets.connect(self.url, max_queue=1000, ping_interval=20) as ws:
-                    log.info(f"Market WS connected: {self.url}")
+                # short close_timeout: on shutdown the read side may be paused (max_queue), so the closing
+                # handshake is given 1s before the socket is dropped
+                async with websockets.connect(self.url, max_queue=64, ping_interval=20, close_timeout=1.0,
+                                              max_size=None) as ws:
+                    self.connected = True
+                    delay = backoff
+                    log.info(f"Market WS shard {self.index} connected ({len(self.symbols)} streams)")
                     async for msg in ws:
-                        data = json.loads(msg)
-                        payload = data.get('data', data)
-                        if 'e' in payload and payload.get('e') == 'kline':
-                            k = payload.get('k', {})
-                            await handler({
-                                'symbol': payload.get('s', k.get('s')),
-                                'event_time': payload.get('E'),
-                                'kline': k
-                            })
+                        rec = decode(msg)
+                        if rec is not None:
+                            self.received += 1
+                            await self._put(rec)
+                    raise ConnectionError("closed by server")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.connected = False
+                self.reconnects += 1
+                # jittered exponential backoff, so shards that dropped together reconnect apart
+                wait = delay * (0.5 + random.random())
+                log.warning(f"Market WS shard {self.index} error: {e}, reconnecting in {wait:.1f}s")
+                await asyncio.sleep(wait)
+                delay = min(max_backoff, delay * 2)
+
+    async def consume(self, handler):
+        q = self.queue
+        while True:
+            rec = await q.get()
+            try:
+                await handler(rec)
             except Exception as e:
-                log.warning(f"Market WS error: {e}, reconnecting in 3s")
-                await asyncio.sleep(3.0)
+                log.warning(f"Market handler error ({rec}): {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {'shard': self.index, 'streams': len(self.symbols), 'connected': self.connected,
+                'received': self.received, 'depth': self.queue.qsize(), 'max_depth': self.max_depth,
+                'full_waits': self.full_waits, 'blocked_s': round(self.blocked_s, 6), 'reconnects': self.reconnects}
+
+class BinanceMarketWS:
+    """Combined kline stream consumer, sharded over several connections.
+    URL per shard: {base}/stream?streams=btcusdt@kline_1m/ethusdt@kline_1m
+    Symbols are split into shards of at most `streams_per_conn` streams; each shard has its own
+    connection, reader task and bounded queue, so one slow or reconnecting shard does not stall the
+    others. Messages are decoded by a KlineDecoder and the handler receives KlineRecord objects.
+    """
+    def __init__(self, settings: dict, symbols: Iterable[str], interval: str, streams_per_conn: Optional[int] = None,
+                 queue_size: Optional[int] = None, stagger_s: Optional[float] = None):
+        self.base = _ws_market_base(settings).rstrip('/')
+        self.symbols = [s.lower() for s in symbols]
+        self.interval = interval
+        per = int(streams_per_conn or settings.get('ws_streams_per_conn', 200))
+        self.stagger_s = float(settings.get('ws_stagger_s', 0.25) if stagger_s is None else stagger_s)
+        qsize = int(queue_size or settings.get('ws_queue_size', 1000))
+        self.shards = [MarketShard(i, self.base, self.symbols[lo:lo + per], interval, qsize)
+                       for i, lo in enumerate(range(0, len(self.symbols), per))]
+
+    @property
+    def url(self) -> str:
+        return self.shards[0].url if self.shards else self.base + "/stream?streams="
+
+    async def run(self, handler, decoder: Optional[KlineDecoder] = None, backoff: float = 3.0, max_backoff: float = 60.0,
+                  instrument=None):
+        """instrument: a core.instrument.Instrumentation timing decode / E lag on every message (None = off)."""
+        decode = (decoder or KlineDecoder()).decode
+        if instrument is not None:
+            decode = instrument.wrap_decode(decode)
+        tasks = []
+        for sh in self.shards:
+            tasks.append(asyncio.create_task(sh.read(decode, sh.index * self.stagger_s, backoff, max_backoff)))
+            tasks.append(asyncio.create_task(sh.consume(handler)))
+        cancelled = False
+        try:
+            await asyncio.gather(*tasks)
+        except asyncio.CancelledError:
+            # gather() has cancelled every task already; cancelling the readers again would cut their
+            # websocket close handshakes short and leave the connections half-closed
+            cancelled = True
+            raise
+        finally:
+            if not cancelled:
+                for t in tasks:
+                    t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Per-shard backpressure metrics: queue depth / high-water mark, waits on a full queue, reconnects."""
+        return [sh.stats() for sh in self.shards]
 
 class BinanceUserDataWS:
     """User data stream with listenKey keepalive.
     REST: POST /fapi/v1/listenKey (create), PUT /fapi/v1/listenKey (keepalive)
     WS:   {base}/ws/<listenKey>
+    listenKey REST calls go through the async client so they never block the event loop.
     """
-    def __init__(self, settings: dict, client: BinanceUMClient):
+    def __init__(self, settings: dict, client: AsyncBinanceUMClient):
         self.settings = settings
         self.client = client
         self.listen_key: Optional[str] = None
@@ -64,15 +160,16 @@ class BinanceUserDataWS:
             await asyncio.sleep(30 * 60)
             try:
                 if self.listen_key:
-                    self.client.keepalive_listen_key(self.listen_key)
+                    await self.client.keepalive_listen_key(self.listen_key)
                     log.info("listenKey keepalive sent")
             except Exception as e:
                 log.warning(f"listenKey keepalive failed: {e}")
 
     async def run(self, handler):
         while not self._stop:
+            keepalive_task = None
             try:
-                res = self.client.user_stream_listen_key()
+                res = await self.client.user_stream_listen_key()
                 self.listen_key = res.get('listenKey') if isinstance(res, dict) else res
                 self.ws_url = self._make_url()
                 log.info(f"UserData WS connecting: {self.ws_url}")
@@ -86,6 +183,9 @@ class BinanceUserDataWS:
             except Exception as e:
                 log.warning(f"UserData WS error: {e}, reconnecting in 5s")
                 await asyncio.sleep(5.0)
+            finally:
+                if keepalive_task is not None:
+                    keepalive_task.cancel()
 
     def stop(self):
         self._stop = True
@@ -0,0 +1,163 @@
+from __future__ import annotations
+import asyncio, hashlib, hmac, itertools, json, random, time
+from typing import Any, Dict, Optional
+from urllib.parse import urlencode
+import websockets
+
+from ..core.latency import LatencyRegistry
+from ..core.logger import get_logger
+from ..core.utils import ms
+from .binance_http import order_params
+from .rate_limit import RateGovernor
+
+log = get_logger(__name__)
+
+def _ws_order_base(settings: dict) -> str:
+    return settings['wss_order_testnet'] if settings.get('testnet', True) else settings['wss_order_mainnet']
+
+class OrderNotSent(ConnectionError):
+    """The request never left the process (no connection / send failed): safe to retry elsewhere."""
+
+class BinanceWSOrderGateway:
+    """Orders over the WebSocket trading API (ws-fapi) on one persistent connection.
+    Each request carries an id and is answered with the same id, so any number of requests can be
+    in flight at once (pipelining) and are matched to their futures by the reader task. Requests are
+    signed per call (apiKey + timestamp + HMAC of the sorted params). The connection is re-opened
+    with jittered backoff when it drops.
+    new_order() has the client's signature, so it can stand in for the REST client as an order
+    transport. It falls back to REST (`fallback`) only when the request was not sent; once sent, a
+    lost response or timeout is raised rather than retried, since the order may have been placed.
+    """
+    def __init__(self, settings: dict, api_key: str, api_secret: str, fallback=None, url: Optional[str] = None,
+                 timeout: float = 5.0, backoff: float = 1.0, max_backoff: float = 30.0, governor: Optional[RateGovernor] = None):
+        self.url = url or _ws_order_base(settings)
+        self.key = api_key
+        self.secret = api_secret.encode()
+        self.fallback = fallback
+        self.governor = governor  # order-count limits are per account, whatever the transport
+        self.timeout = timeout
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.latency = LatencyRegistry()
+        self._ids = itertools.count(1)
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._ws = None
+        self._connected: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.sent = 0
+        self.fallbacks = 0
+        self.reconnects = 0
+
+    @classmethod
+    def from_client(cls, settings: dict, client, **kw) -> "BinanceWSOrderGateway":
+        """Gateway with the client's credentials, falling back to that client."""
+        kw.setdefault('governor', getattr(client, 'governor', None))
+        return cls(settings, client.key, client.secret, fallback=client, **kw)
+
+    @property
+    def connected(self) -> bool:
+        return self._ws is not None
+
+    async def start(self, wait: float = 5.0):
+        """Open the connection (kept open by a background task); waits up to `wait` s for the first connect."""
+        if self._task is None:
+            self._connected = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+        try:
+            await asyncio.wait_for(self._connected.wait(), wait)
+        except asyncio.TimeoutError:
+            log.warning(f"order WS not connected after {wait}s; orders use REST until it is")
+
+    async def _run(self):
+        delay = self.backoff
+        while True:
+            try:
+                async with websockets.connect(self.url, ping_interval=20, max_size=None) as ws:
+                    self._ws = ws
+                    self._connected.set()
+                    delay = self.backoff
+                    log.info(f"Order WS connected: {self.url}")
+                    async for msg in ws:
+                        data = json.loads(msg)
+                        fut = self._pending.pop(str(data.get('id')), None)
+                        if fut is not None and not fut.done():
+                            fut.set_result(data)
+                    raise ConnectionError("closed by server")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                wait = delay * (0.5 + random.random())
+                log.warning(f"Order WS error: {e}, reconnecting in {wait:.1f}s")
+            finally:
+                self._ws = None
+                self._connected.clear()
+                self._fail_pending(ConnectionError("order WS closed before the response; order state unknown"))
+            self.reconnects += 1
+            await asyncio.sleep(wait)
+            delay = min(self.max_backoff, delay * 2)
+
+    def _fail_pending(self, exc: Exception):
+        pending, self._pending = self._pending, {}
+        for fut in pending.values():
+            if not fut.done():
+                fut.set_exception(exc)
+
+    def _sign(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        p = dict(params, apiKey=self.key, timestamp=ms())
+        p = dict(sorted(p.items()))
+        p['signature'] = hmac.new(self.secret, urlencode(p).encode(), hashlib.sha256).hexdigest()
+        return p
+
+    async def request(self, method: str, params: Dict[str, Any], signed: bool = True) -> Any:
+        """Send one request and wait for its response; returns `result`, raises on an error status."""
+        ws = self._ws
+        if ws is None:
+            raise OrderNotSent("order WS not connected")
+        rid = str(next(self._ids))
+        fut = asyncio.get_running_loop().create_future()
+        self._pending[rid] = fut
+        t0 = time.perf_counter()
+        try:
+            await ws.send(json.dumps({'id': rid, 'method': method, 'params': self._sign(params) if signed else params}))
+        except Exception as e:
+            self._pending.pop(rid, None)
+            raise OrderNotSent(f"order WS send failed: {e}")
+        self.sent += 1
+        try:
+            data = await asyncio.wait_for(fut, self.timeout)
+        finally:
+            self._pending.pop(rid, None)
+        self.latency.record(method, time.perf_counter() - t0)
+        status = data.get('status', 200)
+        if status >= 400 or 'error' in data:
+            raise RuntimeError(f"WS {status}: {data.get('error')}")
+        return data.get('result')
+
+    async def new_order(self, symbol: str, side: str, type_: str, qty: float, price: Optional[float] = None,
+                        reduceOnly: Optional[bool] = None, timeInForce: Optional[str] = None, client_id: Optional[str] = None):
+        params = order_params(symbol, side, type_, qty, price, reduceOnly, timeInForce, client_id)
+        # charged here only if the order goes out over WS; the REST fallback charges its own call
+        charged = self.governor is not None and self.connected
+        if charged:
+            await self.governor.acquire_async('POST', '/fapi/v1/order')
+        try:
+            return await self.request('order.place', params)
+        except OrderNotSent as e:
+            if charged:
+                self.governor.release('POST', '/fapi/v1/order')
+            if self.fallback is None:
+                raise
+            self.fallbacks += 1
+            log.warning(f"[{symbol}] {e}; order sent over REST")
+            return await self.fallback.new_order(symbol, side, type_, qty, price=price, reduceOnly=reduceOnly,
+                                                 timeInForce=timeInForce, client_id=client_id)
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {'connected': self.connected, 'sent': self.sent, 'in_flight': len(self._pending),
+                'fallbacks': self.fallbacks, 'reconnects': self.reconnects, 'latency': self.latency.snapshot()}
@@ -0,0 +1,249 @@
+from __future__ import annotations
+import asyncio, heapq, itertools, threading, time
+from collections import deque
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+from ..core.logger import get_logger
+
+log = get_logger(__name__)
+
+# USDⓈ-M futures limits (exchangeInfo.rateLimits)
+DEFAULT_WEIGHT_LIMIT = 2400      # REQUEST_WEIGHT per minute (per IP)
+DEFAULT_ORDER_LIMIT_10S = 300    # ORDERS per 10 seconds (per account)
+DEFAULT_ORDER_LIMIT_1M = 1200    # ORDERS per minute (per account)
+
+# priorities: lower goes first; orders pre-empt account reads, which pre-empt bulk history downloads
+ORDER, NORMAL, BULK = 0, 1, 2
+
+def klines_weight(limit: int) -> int:
+    """Request weight of GET /fapi/v1/klines for a given limit."""
+    if limit < 100:
+        return 1
+    if limit < 500:
+        return 2
+    if limit <= 1000:
+        return 5
+    return 10
+
+# (method, path) -> (IP weight, 10s order count, 1m order count, priority)
+ENDPOINT_COSTS: Dict[Tuple[str, str], Tuple[int, int, int, int]] = {
+    ('GET', '/fapi/v1/ping'): (1, 0, 0, NORMAL),
+    ('GET', '/fapi/v1/time'): (1, 0, 0, NORMAL),
+    ('GET', '/fapi/v1/exchangeInfo'): (1, 0, 0, NORMAL),
+    ('GET', '/fapi/v2/account'): (5, 0, 0, NORMAL),
+    ('GET', '/fapi/v2/balance'): (5, 0, 0, NORMAL),
+    ('GET', '/fapi/v2/positionRisk'): (5, 0, 0, NORMAL),
+    ('POST', '/fapi/v1/leverage'): (1, 0, 0, NORMAL),
+    ('POST', '/fapi/v1/marginType'): (1, 0, 0, NORMAL),
+    ('POST', '/fapi/v1/order'): (0, 1, 1, ORDER),
+    ('POST', '/fapi/v1/batchOrders'): (5, 5, 1, ORDER),
+    ('DELETE', '/fapi/v1/order'): (1, 0, 0, ORDER),
+    ('POST', '/fapi/v1/listenKey'): (1, 0, 0, NORMAL),
+    ('PUT', '/fapi/v1/listenKey'): (1, 0, 0, NORMAL),
+}
+
+def request_cost(method: str, path: str, params: Optional[Mapping[str, Any]] = None) -> Tuple[int, int, int, int]:
+    """(IP weight, 10s order count, 1m order count, priority) of one REST call."""
+    if path == '/fapi/v1/klines':
+        return klines_weight(int((params or {}).get('limit', 500))), 0, 0, BULK
+    if path == '/fapi/v1/openOrders':
+        return (1 if (params or {}).get('symbol') else 40), 0, 0, NORMAL
+    return ENDPOINT_COSTS.get((method, path), (1, 0, 0, NORMAL))
+
+class SlidingWindow:
+    """Sum of costs over the last `window_s` seconds (exact: one entry per request, expired lazily)."""
+    def __init__(self, limit: float, window_s: float):
+        self.limit = float(limit)
+        self.window = float(window_s)
+        self.used = 0.0
+        self._q: deque = deque()
+
+    def _expire(self, now: float):
+        q = self._q
+        while q and q[0][0] <= now - self.window:
+            self.used -= q.popleft()[1]
+
+    def wait_time(self, cost: float, now: float, limit: Optional[float] = None) -> float:
+        """Seconds until `cost` more fits under `limit` (default: the window's limit)."""
+        self._expire(now)
+        limit = self.limit if limit is None else limit
+        excess = self.used + cost - limit
+        if excess <= 0 or not cost:
+            return 0.0
+        freed = 0.0
+        for t, c in self._q:
+            freed += c
+            if freed >= excess:
+                return t + self.window - now
+        return self.window
+
+    def add(self, cost: float, now: float):
+        if cost:
+            self._q.append((now, cost))
+            self.used += cost
+
+    def refund(self, cost: float):
+        """Take back `cost` of the latest usage (a call that was admitted but never sent)."""
+        q = self._q
+        while cost > 0 and q:
+            t, c = q.pop()
+            take = min(c, cost)
+            self.used -= take
+            cost -= take
+            if c > take:
+                q.append((t, c - take))
+
+    def sync(self, used: float, now: float):
+        """Server-reported usage (response header): count any usage this process did not see."""
+        self._expire(now)
+        if used > self.used:
+            self.add(used - self.used, now)
+
+class RateGovernor:
+    """Process-wide client-side limiter for the REST API, shared by every client and downloader.
+    Sliding windows track the per-minute IP request weight and the 10s / 1m order counts; a call
+    waits until its cost fits (limits scaled by `safety`). Usage reported by the server in
+    X-MBX-USED-WEIGHT-1M / X-MBX-ORDER-COUNT-* headers is merged in, so traffic from other
+    processes on the same IP / account is counted too. A 429/418 with Retry-After blocks every
+    call until it expires.
+    Priorities: a call does not proceed while a higher-priority call is waiting, and BULK calls may
+    only use `bulk_share` of the weight window, so orders always find headroom during downloads.
+    acquire() blocks the calling thread, acquire_async() suspends the calling task. `clock` / `sleep`
+    (time.monotonic / time.sleep) can be replaced, e.g. by a simulated clock in tests.
+    """
+    def __init__(self, weight_limit: int = DEFAULT_WEIGHT_LIMIT, order_limit_10s: int = DEFAULT_ORDER_LIMIT_10S,
+                 order_limit_1m: int = DEFAULT_ORDER_LIMIT_1M, safety: float = 0.8, bulk_share: float = 0.7,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        self._clock = clock
+        self._sleep = sleep
+        self.weight = SlidingWindow(weight_limit * safety, 60.0)
+        self.orders_10s = SlidingWindow(order_limit_10s * safety, 10.0)
+        self.orders_1m = SlidingWindow(order_limit_1m * safety, 60.0)
+        self.bulk_limit = weight_limit * safety * bulk_share
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+        self._waiting: list = []  # heap of (priority, seq)
+        self._seq = itertools.count()
+        self.calls = [0, 0, 0]
+        self.waits = [0, 0, 0]
+        self.waited_s = [0.0, 0.0, 0.0]
+        self.throttled = 0
+
+    @classmethod
+    def unlimited(cls) -> "RateGovernor":
+        """A governor that never waits (local stubs / benchmarks)."""
+        return cls(10 ** 12, 10 ** 12, 10 ** 12)
+
+    def _try(self, ticket: Tuple[int, int], weight: int, o10: int, o1m: int) -> Tuple[float, bool]:
+        """(0.0, _) when admitted, else (seconds to wait, waiting on IP weight); caller holds the lock."""
+        now = self._clock()
+        if self.blocked_until > now:
+            return self.blocked_until - now, False
+        prio = ticket[0]
+        if weight and self._waiting and self._waiting[0][0] < prio:
+            return 0.005, False  # a higher-priority call is waiting for weight: let it go first
+        w_wait = self.weight.wait_time(weight, now, self.bulk_limit if prio == BULK else None)
+        wait = max(w_wait, self.orders_10s.wait_time(o10, now), self.orders_1m.wait_time(o1m, now))
+        if wait > 0:
+            return wait, w_wait > 0
+        self.weight.add(weight, now)
+        self.orders_10s.add(o10, now)
+        self.orders_1m.add(o1m, now)
+        return 0.0, False
+
+    def _enter(self, prio: int) -> Tuple[int, int]:
+        ticket = (prio, next(self._seq))
+        self.calls[prio] += 1
+        return ticket
+
+    def _wait_step(self, ticket, cost) -> float:
+        with self._lock:
+            wait, on_weight = self._try(ticket, *cost)
+            queued = ticket in self._waiting
+            if on_weight and not queued:
+                heapq.heappush(self._waiting, ticket)
+            elif not on_weight and queued:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+            return wait
+
+    def _done_waiting(self, prio: int, t0: float, waited: bool):
+        if waited:
+            self.waits[prio] += 1
+            self.waited_s[prio] += self._clock() - t0
+
+    def acquire(self, method: str, path: str, params: Optional[Mapping[str, Any]] = None):
+        weight, o10, o1m, prio = request_cost(method, path, params)
+        ticket = self._enter(prio)
+        t0, waited = self._clock(), False
+        while True:
+            wait = self._wait_step(ticket, (weight, o10, o1m))
+            if wait <= 0:
+                break
+            waited = True
+            self._sleep(min(wait, 1.0))
+        self._done_waiting(prio, t0, waited)
+
+    async def acquire_async(self, method: str, path: str, params: Optional[Mapping[str, Any]] = None):
+        weight, o10, o1m, prio = request_cost(method, path, params)
+        ticket = self._enter(prio)
+        t0, waited = self._clock(), False
+        try:
+            while True:
+                wait = self._wait_step(ticket, (weight, o10, o1m))
+                if wait <= 0:
+                    break
+                waited = True
+                await asyncio.sleep(min(wait, 1.0))
+        except asyncio.CancelledError:
+            with self._lock:
+                if ticket in self._waiting:
+                    self._waiting.remove(ticket)
+                    heapq.heapify(self._waiting)
+            raise
+        self._done_waiting(prio, t0, waited)
+
+    def release(self, method: str, path: str, params: Optional[Mapping[str, Any]] = None):
+        """Undo acquire() for a call that was never sent, so a retry over another transport is not counted twice."""
+        weight, o10, o1m, _ = request_cost(method, path, params)
+        with self._lock:
+            self.weight.refund(weight)
+            self.orders_10s.refund(o10)
+            self.orders_1m.refund(o1m)
+
+    def observe(self, headers: Mapping[str, str], status: int = 200):
+        """Merge server-reported usage from response headers; back off on 429 / 418."""
+        now = self._clock()
+        get = headers.get
+        with self._lock:
+            used = get('X-MBX-USED-WEIGHT-1M') or get('X-MBX-USED-WEIGHT')
+            if used is not None:
+                self.weight.sync(float(used), now)
+            o10 = get('X-MBX-ORDER-COUNT-10S')
+            if o10 is not None:
+                self.orders_10s.sync(float(o10), now)
+            o1m = get('X-MBX-ORDER-COUNT-1M')
+            if o1m is not None:
+                self.orders_1m.sync(float(o1m), now)
+            if status in (418, 429):
+                self.throttled += 1
+                wait = float(get('Retry-After') or 60)
+                self.blocked_until = max(self.blocked_until, now + wait)
+                log.warning(f"HTTP {status} from the exchange: all REST calls paused for {wait:.0f}s")
+
+    def stats(self) -> Dict[str, Any]:
+        now = self._clock()
+        with self._lock:
+            for w in (self.weight, self.orders_10s, self.orders_1m):
+                w._expire(now)
+            names = ('order', 'normal', 'bulk')
+            return {
+                'weight_1m': self.weight.used, 'weight_util': self.weight.used / self.weight.limit,
+                'orders_10s': self.orders_10s.used, 'orders_10s_util': self.orders_10s.used / self.orders_10s.limit,
+                'orders_1m': self.orders_1m.used, 'orders_1m_util': self.orders_1m.used / self.orders_1m.limit,
+                'waiting': len(self._waiting), 'blocked_s': max(0.0, self.blocked_until - now), 'throttled': self.throttled,
+                'calls': dict(zip(names, self.calls)), 'waits': dict(zip(names, self.waits)),
+                'waited_s': {n: round(s, 6) for n, s in zip(names, self.waited_s)},
+            }
+
+# shared by every client / downloader in the process (one IP weight budget, one account order budget)
+DEFAULT_GOVERNOR = RateGovernor()
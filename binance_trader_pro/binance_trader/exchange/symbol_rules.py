@@ -0,0 +1,169 @@
+from __future__ import annotations
+import json, math, os, time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional, Tuple
+from ..core.logger import get_logger
+
+log = get_logger(__name__)
+
+class OrderRuleError(ValueError):
+    """An order that the exchange filters would reject (raised before it is sent)."""
+
+def _decimals(step: float) -> int:
+    """Decimal places of a filter step such as 0.001 (-> 3)."""
+    s = f"{step:.12f}".rstrip('0')
+    return len(s.split('.')[1]) if '.' in s else 0
+
+def _round(x: float, dp: int):
+    """round(x, dp); an int for whole steps, so a quantity of step 1 is sent as '1234', not '1234.0'."""
+    return int(round(x)) if dp == 0 else round(x, dp)
+
+@dataclass(frozen=True)
+class SymbolRule:
+    """Order filters of one symbol (PRICE_FILTER, LOT_SIZE, MARKET_LOT_SIZE, MIN_NOTIONAL)."""
+    symbol: str
+    tick_size: float = 0.0
+    min_price: float = 0.0
+    max_price: float = 0.0
+    step_size: float = 0.0
+    min_qty: float = 0.0
+    max_qty: float = 0.0
+    market_step_size: float = 0.0
+    market_min_qty: float = 0.0
+    market_max_qty: float = 0.0
+    min_notional: float = 0.0
+    status: str = 'TRADING'
+
+    @classmethod
+    def from_exchange_info(cls, sym: Dict[str, Any]) -> "SymbolRule":
+        f = {x.get('filterType'): x for x in sym.get('filters', [])}
+        g = lambda name, key: float(f.get(name, {}).get(key, 0) or 0)
+        return cls(symbol=sym['symbol'], status=sym.get('status', 'TRADING'),
+                   tick_size=g('PRICE_FILTER', 'tickSize'), min_price=g('PRICE_FILTER', 'minPrice'),
+                   max_price=g('PRICE_FILTER', 'maxPrice'),
+                   step_size=g('LOT_SIZE', 'stepSize'), min_qty=g('LOT_SIZE', 'minQty'), max_qty=g('LOT_SIZE', 'maxQty'),
+                   market_step_size=g('MARKET_LOT_SIZE', 'stepSize') or g('LOT_SIZE', 'stepSize'),
+                   market_min_qty=g('MARKET_LOT_SIZE', 'minQty') or g('LOT_SIZE', 'minQty'),
+                   market_max_qty=g('MARKET_LOT_SIZE', 'maxQty') or g('LOT_SIZE', 'maxQty'),
+                   min_notional=g('MIN_NOTIONAL', 'notional'))
+
+    def __post_init__(self):
+        # decimals of the steps, so rounded values print exactly (e.g. 0.1 + 0.2 -> 0.3)
+        object.__setattr__(self, '_qty_dp', _decimals(self.step_size))
+        object.__setattr__(self, '_mqty_dp', _decimals(self.market_step_size))
+        object.__setattr__(self, '_px_dp', _decimals(self.tick_size))
+
+    def round_qty(self, qty: float, market: bool = True) -> float:
+        """Round down to the (market) lot step."""
+        step, dp = (self.market_step_size, self._mqty_dp) if market else (self.step_size, self._qty_dp)
+        if step <= 0:
+            return float(qty)
+        return _round(math.floor(qty / step + 1e-9) * step, dp)
+
+    def round_price(self, price: float) -> float:
+        """Round to the nearest tick."""
+        if self.tick_size <= 0:
+            return float(price)
+        return _round(round(price / self.tick_size) * self.tick_size, self._px_dp)
+
+    def check(self, qty: float, price: Optional[float] = None, market: bool = True, reduce_only: bool = False) -> Optional[str]:
+        """Reason the (already rounded) order would be rejected, or None. price is the limit price,
+        or a reference price for the notional check of a market order."""
+        if self.status != 'TRADING':
+            return f"status {self.status}"
+        lo, hi = (self.market_min_qty, self.market_max_qty) if market else (self.min_qty, self.max_qty)
+        if qty <= 0 or qty < lo:
+            return f"qty {qty} < min {lo}"
+        if hi and qty > hi:
+            return f"qty {qty} > max {hi}"
+        if price is not None:
+            if not market and (price < self.min_price or (self.max_price and price > self.max_price)):
+                return f"price {price} outside [{self.min_price}, {self.max_price}]"
+            if not reduce_only and qty * price < self.min_notional:
+                return f"notional {qty * price:.4f} < min {self.min_notional}"
+        return None
+
+class SymbolRules:
+    """Symbol -> SymbolRule table built from GET /fapi/v1/exchangeInfo.
+    Lookups, rounding and validation are O(1) dict + arithmetic. The table is small, so it is persisted
+    as JSON with its fetch time (load_symbol_rules) and reused on startup until it is older than the TTL.
+    """
+    def __init__(self, rules: Dict[str, SymbolRule], fetched_at: Optional[float] = None):
+        self.rules = rules
+        self.fetched_at = time.time() if fetched_at is None else float(fetched_at)
+
+    @classmethod
+    def from_exchange_info(cls, info: Dict[str, Any]) -> "SymbolRules":
+        return cls({s['symbol']: SymbolRule.from_exchange_info(s) for s in info.get('symbols', [])})
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self.rules
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def get(self, symbol: str) -> Optional[SymbolRule]:
+        return self.rules.get(symbol)
+
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+    def round_qty(self, symbol: str, qty: float, market: bool = True) -> float:
+        r = self.rules.get(symbol)
+        return r.round_qty(qty, market) if r is not None else float(qty)
+
+    def round_price(self, symbol: str, price: float) -> float:
+        r = self.rules.get(symbol)
+        return r.round_price(price) if r is not None else float(price)
+
+    def validate(self, symbol: str, qty: float, price: Optional[float] = None, market: bool = True,
+                 reduce_only: bool = False) -> Tuple[float, Optional[float]]:
+        """(rounded qty, rounded price) for an order, or OrderRuleError if it would be rejected.
+        Symbols missing from the table pass through unchanged."""
+        r = self.rules.get(symbol)
+        if r is None:
+            return float(qty), price
+        qty = r.round_qty(qty, market)
+        if price is not None and not market:
+            price = r.round_price(price)
+        reason = r.check(qty, price, market, reduce_only)
+        if reason:
+            raise OrderRuleError(f"[{symbol}] order rejected locally: {reason}")
+        return qty, price
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp = path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'fetched_at': self.fetched_at, 'symbols': [asdict(r) for r in self.rules.values()]}, f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "SymbolRules":
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls({r['symbol']: SymbolRule(**r) for r in data['symbols']}, data['fetched_at'])
+
+def rules_path(settings: dict) -> Optional[str]:
+    """symbol_rules_path, else {data_dir}/symbol_rules_{mainnet|testnet}.json (None without a data_dir)."""
+    if settings.get('symbol_rules_path'):
+        return settings['symbol_rules_path']
+    data_dir = settings.get('data_dir')
+    if not data_dir:
+        return None
+    return os.path.join(data_dir, f"symbol_rules_{'testnet' if settings.get('testnet') else 'mainnet'}.json")
+
+def load_symbol_rules(client, path: Optional[str] = None, ttl_s: float = 86400.0, refresh: bool = False) -> SymbolRules:
+    """Rules from `path` if younger than ttl_s, else fetched with client.exchange_info() (sync client) and saved."""
+    if path and not refresh and os.path.exists(path):
+        try:
+            rules = SymbolRules.load(path)
+            if rules.age() < ttl_s:
+                return rules
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            log.warning(f"symbol rules cache {path} unreadable, refetching: {e}")
+    rules = SymbolRules.from_exchange_info(client.exchange_info())
+    log.info(f"Loaded order rules for {len(rules)} symbols")
+    if path:
+        rules.save(path)
+    return rules
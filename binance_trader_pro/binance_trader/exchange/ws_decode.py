@@ -0,0 +1,77 @@
+from __future__ import annotations
+import json
+from operator import itemgetter
+from typing import Any, Callable, Optional, Tuple, Union
+
+try:  # optional fast JSON backend (pip install orjson)
+    import orjson
+    _fast_loads: Optional[Callable[[Union[str, bytes]], Any]] = orjson.loads
+except ImportError:  # pragma: no cover - depends on the environment
+    _fast_loads = None
+
+def json_backend(name: Optional[str] = None) -> Tuple[str, Callable[[Union[str, bytes]], Any]]:
+    """(name, loads) for 'orjson' / 'json'; None picks orjson when installed."""
+    if name in (None, 'orjson') and _fast_loads is not None:
+        return 'orjson', _fast_loads
+    if name == 'orjson':
+        raise RuntimeError("orjson is not installed")
+    if name not in (None, 'json'):
+        raise ValueError(f"Unknown JSON backend: {name}")
+    return 'json', json.loads
+
+class KlineRecord(tuple):
+    """One kline stream update, decoded once: an immutable tuple (no per-instance dict), laid out as
+    (open_time, open, high, low, close, volume, close_time, symbol, closed, event_time) so that
+    row() - the KLINE_COLUMNS values - is a plain slice.
+    """
+    __slots__ = ()
+
+    def __new__(cls, symbol: str, event_time: int, open_time: int, open: float, high: float, low: float,
+                close: float, volume: float, close_time: int, closed: bool):
+        return _new(cls, (open_time, open, high, low, close, volume, close_time, symbol, closed, event_time))
+
+    open_time = property(itemgetter(0))
+    open = property(itemgetter(1))
+    high = property(itemgetter(2))
+    low = property(itemgetter(3))
+    close = property(itemgetter(4))
+    volume = property(itemgetter(5))
+    close_time = property(itemgetter(6))
+    symbol = property(itemgetter(7))
+    closed = property(itemgetter(8))
+    event_time = property(itemgetter(9))
+
+    def row(self) -> Tuple[float, ...]:
+        """Values in KLINE_COLUMNS order (a BarRingBuffer row)."""
+        return self[:7]
+
+    def __repr__(self) -> str:
+        return (f"KlineRecord({self.symbol} t={self.open_time} o={self.open} h={self.high} l={self.low} "
+                f"c={self.close} v={self.volume} x={self.closed})")
+
+_new = tuple.__new__
+
+_OPEN_MARK = '"x":false'
+_OPEN_MARK_B = b'"x":false'
+
+class KlineDecoder:
+    """Raw market WS message (combined or raw stream) -> KlineRecord, or None for anything else.
+    closed_only skips in-progress updates on a substring test, before any JSON parsing
+    (Binance sends compact JSON, so an open kline always contains `"x":false`).
+    """
+    def __init__(self, closed_only: bool = False, backend: Optional[str] = None):
+        self.closed_only = closed_only
+        self.backend, self._loads = json_backend(backend)
+        self.skipped = 0
+
+    def decode(self, msg: Union[str, bytes]) -> Optional[KlineRecord]:
+        if self.closed_only and (_OPEN_MARK_B if isinstance(msg, (bytes, bytearray)) else _OPEN_MARK) in msg:
+            self.skipped += 1
+            return None
+        data = self._loads(msg)
+        payload = data.get('data', data)
+        if payload.get('e') != 'kline':
+            return None
+        k = payload['k']
+        return _new(KlineRecord, (k['t'], float(k['o']), float(k['h']), float(k['l']), float(k['c']), float(k['v']),
+                                  k['T'], payload.get('s') or k['s'], k['x'], payload.get('E', 0)))
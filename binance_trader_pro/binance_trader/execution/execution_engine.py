@@ -1,12 +1,20 @@
 from __future__ import annotations
-from typing import Optional
-from ..exchange.binance_http import BinanceUMClient
+from typing import Any, Dict, Optional
+from ..exchange.binance_http import BinanceUMClient, order_params
+from ..exchange.symbol_rules import SymbolRules
 from ..core.logger import get_logger
 
 class ExecutionEngine:
-    def __init__(self, client: BinanceUMClient, symbol: str):
+    """Order helpers for one symbol. With `rules`, quantities are rounded to the lot step and checked
+    against the symbol's filters before sending (OrderRuleError instead of an exchange rejection);
+    ref_price (e.g. the last close) enables the MIN_NOTIONAL check for market orders.
+    `orders` is the order transport (anything with the client's new_order, e.g. a
+    BinanceWSOrderGateway or an OrderBatcher for the async engine); default: the REST client."""
+    def __init__(self, client: BinanceUMClient, symbol: str, rules: Optional[SymbolRules] = None, orders=None):
         self.client = client
         self.symbol = symbol
+        self.rules = rules
+        self.orders = orders or client
         self.log = get_logger(__name__)
 
     def ensure_leverage(self, leverage: int):
@@ -23,8 +31,45 @@ class ExecutionEngine:
         except Exception as e:
             self.log.warning(f"margin type set failed: {e}")
 
-    def market_buy(self, qty: float, reduce_only: bool = False):
-        return self.client.new_order(self.symbol, "BUY", "MARKET", qty, reduceOnly=reduce_only)
+    def _market_qty(self, qty: float, reduce_only: bool, ref_price: Optional[float]) -> float:
+        if self.rules is None:
+            return qty
+        return self.rules.validate(self.symbol, qty, ref_price, market=True, reduce_only=reduce_only)[0]
 
-    def market_sell(self, qty: float, reduce_only: bool = False):
-        return self.client.new_order(self.symbol, "SELL", "MARKET", qty, reduceOnly=reduce_only)
+    def market_order_params(self, side: str, qty: float, reduce_only: bool = False,
+                            ref_price: Optional[float] = None) -> Dict[str, Any]:
+        """Checked market order parameters, e.g. to send several symbols in one client.batch_orders()."""
+        qty = self._market_qty(qty, reduce_only, ref_price)
+        return order_params(self.symbol, side, "MARKET", qty, reduceOnly=reduce_only)
+
+    def market_buy(self, qty: float, reduce_only: bool = False, ref_price: Optional[float] = None):
+        qty = self._market_qty(qty, reduce_only, ref_price)
+        return self.orders.new_order(self.symbol, "BUY", "MARKET", qty, reduceOnly=reduce_only)
+
+    def market_sell(self, qty: float, reduce_only: bool = False, ref_price: Optional[float] = None):
+        qty = self._market_qty(qty, reduce_only, ref_price)
+        return self.orders.new_order(self.symbol, "SELL", "MARKET", qty, reduceOnly=reduce_only)
+
+class AsyncExecutionEngine(ExecutionEngine):
+    """ExecutionEngine for AsyncBinanceUMClient: same methods as coroutines."""
+    async def ensure_leverage(self, leverage: int):
+        try:
+            res = await self.client.leverage(self.symbol, leverage)
+            self.log.info(f"Set leverage: {res}")
+        except Exception as e:
+            self.log.warning(f"leverage set failed: {e}")
+
+    async def ensure_margin_type(self, margin_type: str = "ISOLATED"):
+        try:
+            res = await self.client.margin_type(self.symbol, margin_type)
+            self.log.info(f"Set margin type: {res}")
+        except Exception as e:
+            self.log.warning(f"margin type set failed: {e}")
+
+    async def market_buy(self, qty: float, reduce_only: bool = False, ref_price: Optional[float] = None):
+        qty = self._market_qty(qty, reduce_only, ref_price)
+        return await self.orders.new_order(self.symbol, "BUY", "MARKET", qty, reduceOnly=reduce_only)
+
+    async def market_sell(self, qty: float, reduce_only: bool = False, ref_price: Optional[float] = None):
+        qty = self._market_qty(qty, reduce_only, ref_price)
+        return await self.orders.new_order(self.symbol, "SELL", "MARKET", qty, reduceOnly=reduce_only)
@@ -0,0 +1,95 @@
+from __future__ import annotations
+import asyncio, time
+from typing import Any, Dict, List, Optional, Set, Tuple
+from ..core.latency import LatencyStats
+from ..core.logger import get_logger
+from ..exchange.binance_http import MAX_BATCH_ORDERS, order_params
+
+log = get_logger(__name__)
+
+class OrderBatcher:
+    """Coalesces new_order() calls into /fapi/v1/batchOrders requests (async client).
+    Orders submitted within `window_ms` of the first pending one (0 = the same event-loop tick) are
+    split into batches of at most MAX_BATCH_ORDERS and the batches are sent concurrently. Each caller
+    awaits its own order: the response entries map back one-to-one, and a per-order error
+    ({'code', 'msg'}) is raised in that caller only. A lone order goes through plain new_order.
+    new_order() has the client's signature, so the batcher can serve as an engine's order transport.
+    """
+    def __init__(self, client, window_ms: float = 0.0, max_batch: int = MAX_BATCH_ORDERS):
+        self.client = client
+        self.window = max(0.0, float(window_ms)) / 1000.0
+        self.max_batch = max(1, min(int(max_batch), MAX_BATCH_ORDERS))
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.Handle] = None
+        self._sending: Set[asyncio.Task] = set()  # in-flight sends (the loop holds tasks only weakly)
+        self.requests = 0
+        self.orders = 0
+        self.failed = 0
+        self.flush_span = LatencyStats()  # one flush: first request sent -> last response in
+
+    async def new_order(self, symbol: str, side: str, type_: str, qty: float, price: Optional[float] = None,
+                        reduceOnly: Optional[bool] = None, timeInForce: Optional[str] = None, client_id: Optional[str] = None):
+        fut = asyncio.get_running_loop().create_future()
+        self._pending.append((order_params(symbol, side, type_, qty, price, reduceOnly, timeInForce, client_id), fut))
+        if self._flush_handle is None:
+            loop = asyncio.get_running_loop()
+            self._flush_handle = loop.call_later(self.window, self.flush) if self.window else loop.call_soon(self.flush)
+        return await fut
+
+    def flush(self):
+        """Send everything pending now."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, []
+        if pending:
+            chunks = [pending[i:i + self.max_batch] for i in range(0, len(pending), self.max_batch)]
+            task = asyncio.ensure_future(self._send_all(chunks))
+            self._sending.add(task)
+            task.add_done_callback(self._sending.discard)
+
+    async def close(self):
+        """Send what is pending and wait for every in-flight request, so none is dropped at shutdown."""
+        self.flush()
+        while self._sending:
+            await asyncio.gather(*list(self._sending), return_exceptions=True)
+
+    async def _send_all(self, chunks: List[list]):
+        t0 = time.perf_counter()
+        await asyncio.gather(*(self._send(c) for c in chunks))
+        self.flush_span.record(time.perf_counter() - t0)
+
+    async def _send(self, chunk: list):
+        self.requests += 1
+        self.orders += len(chunk)
+        try:
+            if len(chunk) == 1:
+                p = dict(chunk[0][0])
+                res = [await self.client.new_order(p.pop('symbol'), p.pop('side'), p.pop('type'), p.pop('quantity'),
+                                                   price=p.get('price'), reduceOnly=_bool(p.get('reduceOnly')),
+                                                   timeInForce=p.get('timeInForce'), client_id=p.get('newClientOrderId'))]
+            else:
+                res = await self.client.batch_orders([p for p, _ in chunk])
+        except Exception as e:
+            self.failed += len(chunk)
+            for _, fut in chunk:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        if not isinstance(res, list) or len(res) != len(chunk):
+            res = [{'code': -1, 'msg': f"unexpected batch response: {res}"}] * len(chunk)
+        for (p, fut), r in zip(chunk, res):
+            if fut.done():
+                continue
+            if isinstance(r, dict) and 'code' in r and 'orderId' not in r:
+                self.failed += 1
+                fut.set_exception(RuntimeError(f"[{p['symbol']}] order rejected: {r.get('code')} {r.get('msg')}"))
+            else:
+                fut.set_result(r)
+
+    def stats(self) -> Dict[str, Any]:
+        return {'requests': self.requests, 'orders': self.orders, 'failed': self.failed,
+                'pending': len(self._pending), 'in_flight': len(self._sending), 'flush_span': self.flush_span.snapshot()}
+
+def _bool(v: Optional[str]) -> Optional[bool]:
+    return None if v is None else v == 'true'
@@ -0,0 +1,81 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+
+# Vectorized indicators over whole arrays. Warm-up / missing-input semantics follow the pandas
+# expressions used by the freqtrade strategies (rolling(n) with min_periods=n): NaN until the
+# window holds n valid values, and a NaN anywhere in the window yields NaN.
+
+def _f64(x) -> np.ndarray:
+    return np.asarray(x, dtype=np.float64)
+
+def sma(x, n: int) -> np.ndarray:
+    """x.rolling(n).mean(), run by pandas' rolling kernel: the compensated running sum that
+    streaming.RollingMean repeats value by value, so batch and streaming SMAs (and ATR / RSI built on
+    them) are bit-equal. A prefix sum is faster but drifts ~1e-12 relative over a long series.
+    """
+    x = _f64(x)
+    if n <= 0 or len(x) < n:
+        return np.full(len(x), np.nan)
+    return pd.Series(x, copy=False).rolling(n, min_periods=n).mean().to_numpy()
+
+def _rolling_extreme(x, n: int, op: np.ufunc) -> np.ndarray:
+    """O(n) rolling max/min (van Herk / Gil-Werman): block prefix and suffix scans combined per window.
+    NaN propagates exactly to the windows that contain it.
+    """
+    x = _f64(x)
+    m = len(x)
+    out = np.full(m, np.nan)
+    if n <= 0 or m < n:
+        return out
+    blocks = np.concatenate([x, np.full((-m) % n, x[-1])]).reshape(-1, n)
+    pre = op.accumulate(blocks, axis=1).ravel()
+    suf = op.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+    op(suf[:m - n + 1], pre[n - 1:m], out=out[n - 1:])
+    return out
+
+def rolling_max(x, n: int) -> np.ndarray:
+    """x.rolling(n).max()"""
+    return _rolling_extreme(x, n, np.maximum)
+
+def rolling_min(x, n: int) -> np.ndarray:
+    """x.rolling(n).min()"""
+    return _rolling_extreme(x, n, np.minimum)
+
+def true_range(high, low, close) -> np.ndarray:
+    """max(h - l, |h - prev_close|, |l - prev_close|) in one pass; NaN on the first bar (no previous close)."""
+    high, low, close = _f64(high), _f64(low), _f64(close)
+    out = np.full(len(close), np.nan)
+    if len(close) > 1:
+        pc = close[:-1]
+        h, l = high[1:], low[1:]
+        out[1:] = np.maximum(h - l, np.maximum(np.abs(h - pc), np.abs(l - pc)))
+    return out
+
+def _shifted(fn, x: np.ndarray) -> np.ndarray:
+    """Apply fn to x[1:] (first bar has no previous close) and re-align with a leading NaN."""
+    out = np.full(len(x), np.nan)
+    if len(x) > 1:
+        out[1:] = fn(x[1:])
+    return out
+
+def atr(high, low, close, n: int = 14) -> np.ndarray:
+    """Simple-mean ATR: true_range.rolling(n).mean() (as in the freqtrade strategies)."""
+    return _shifted(lambda tr: sma(tr, n), true_range(high, low, close))
+
+def rsi(close, n: int = 14) -> np.ndarray:
+    """Simple-mean RSI as in RSIStrategy: rolling means of gains/losses, zero loss floored at 1e-9."""
+    close = _f64(close)
+    delta = np.diff(close, prepend=np.nan)
+    gain = _shifted(lambda d: sma(np.maximum(d, 0.0), n), delta)
+    loss = np.abs(_shifted(lambda d: sma(-np.minimum(d, 0.0), n), delta))
+    rs = gain / np.where(loss == 0, 1e-9, loss)
+    return 100 - 100 / (1 + rs)
+
+def pct_change(x, n: int = 1) -> np.ndarray:
+    """x.pct_change(n) (momentum)."""
+    x = _f64(x)
+    out = np.full(len(x), np.nan)
+    if 0 < n < len(x):
+        out[n:] = x[n:] / x[:-n] - 1
+    return out
@@ -0,0 +1,156 @@
+from __future__ import annotations
+from collections import deque
+from typing import Optional
+
+class RollingMean:
+    """O(1) simple moving average over the last `window` values.
+    Mirrors pandas' rolling mean arithmetic (Kahan-compensated running sum with separate add/remove
+    compensation, oldest value removed before the newest is added, runs of equal values returned
+    exactly) so signals built on it agree with the batch pandas version bit for bit.
+    update() returns None until the window is full, matching rolling(window, min_periods=window).
+    """
+    def __init__(self, window: int):
+        self.window = int(window)
+        self._buf: deque = deque()
+        self._sum = 0.0
+        self._comp_add = 0.0
+        self._comp_remove = 0.0
+        self._same = 0  # length of the current run of equal values
+        self._prev = None
+
+    def update(self, x: float) -> Optional[float]:
+        if len(self._buf) == self.window:
+            y = -self._buf.popleft() - self._comp_remove
+            t = self._sum + y
+            self._comp_remove = t - self._sum - y
+            self._sum = t
+        self._buf.append(x)
+        y = x - self._comp_add
+        t = self._sum + y
+        self._comp_add = t - self._sum - y
+        self._sum = t
+        self._same = self._same + 1 if x == self._prev else 1
+        self._prev = x
+        return self.value
+
+    @property
+    def value(self) -> Optional[float]:
+        if len(self._buf) < self.window:
+            return None
+        if self._same >= self.window:
+            return self._prev
+        return self._sum / self.window
+
+class WilderRSI:
+    """RSI with Wilder smoothing (alpha = 1/period), seeded with the simple mean of the first `period` changes."""
+    def __init__(self, period: int = 14):
+        self.period = int(period)
+        self._prev: Optional[float] = None
+        self._n = 0
+        self._gain = 0.0
+        self._loss = 0.0
+
+    def update(self, close: float) -> Optional[float]:
+        prev, self._prev = self._prev, close
+        if prev is None:
+            return None
+        d = close - prev
+        gain, loss = (d, 0.0) if d > 0 else (0.0, -d)
+        self._n += 1
+        p = self.period
+        if self._n <= p:
+            self._gain += gain / p
+            self._loss += loss / p
+            if self._n < p:
+                return None
+        else:
+            self._gain = (self._gain * (p - 1) + gain) / p
+            self._loss = (self._loss * (p - 1) + loss) / p
+        return self.value
+
+    @property
+    def value(self) -> Optional[float]:
+        if self._n < self.period:
+            return None
+        if self._loss == 0:
+            return 100.0 if self._gain > 0 else 50.0
+        return 100.0 - 100.0 / (1.0 + self._gain / self._loss)
+
+class _RollingExtreme:
+    """Rolling max/min over `window` values with a monotonic deque: amortised O(1) per update."""
+    def __init__(self, window: int, sign: float):
+        self.window = int(window)
+        self._sign = sign  # +1 max, -1 min
+        self._dq: deque = deque()  # (index, value), values monotonic from the front
+        self._i = 0
+
+    def update(self, x: float) -> Optional[float]:
+        dq, sg = self._dq, self._sign
+        while dq and sg * dq[-1][1] <= sg * x:
+            dq.pop()
+        dq.append((self._i, x))
+        if dq[0][0] <= self._i - self.window:
+            dq.popleft()
+        self._i += 1
+        return self.value
+
+    @property
+    def value(self) -> Optional[float]:
+        return self._dq[0][1] if self._i >= self.window else None
+
+class RollingMax(_RollingExtreme):
+    def __init__(self, window: int):
+        super().__init__(window, 1.0)
+
+class RollingMin(_RollingExtreme):
+    def __init__(self, window: int):
+        super().__init__(window, -1.0)
+
+class TrueRange:
+    """max(h - l, |h - prev_close|, |l - prev_close|); None on the first bar."""
+    def __init__(self):
+        self._prev: Optional[float] = None
+
+    def update(self, high: float, low: float, close: float) -> Optional[float]:
+        pc, self._prev = self._prev, close
+        if pc is None:
+            return None
+        return max(high - low, abs(high - pc), abs(low - pc))
+
+class ATR:
+    """Simple-mean ATR (rolling mean of true range), same numerics as indicators.batch.atr."""
+    def __init__(self, period: int = 14):
+        self._tr = TrueRange()
+        self._mean = RollingMean(period)
+
+    def update(self, high: float, low: float, close: float) -> Optional[float]:
+        tr = self._tr.update(high, low, close)
+        return None if tr is None else self._mean.update(tr)
+
+class RSI:
+    """Simple-mean RSI (rolling mean of gains/losses), same numerics as indicators.batch.rsi."""
+    def __init__(self, period: int = 14):
+        self._prev: Optional[float] = None
+        self._gain = RollingMean(period)
+        self._loss = RollingMean(period)
+
+    def update(self, close: float) -> Optional[float]:
+        prev, self._prev = self._prev, close
+        if prev is None:
+            return None
+        d = close - prev
+        gain = self._gain.update(d if d > 0 else 0.0)
+        loss = self._loss.update(-d if d < 0 else 0.0)
+        if gain is None or loss is None:
+            return None
+        return 100 - 100 / (1 + gain / (abs(loss) or 1e-9))
+
+class Momentum:
+    """Percent change over `period` bars (pct_change(period))."""
+    def __init__(self, period: int = 10):
+        self.period = int(period)
+        self._buf: deque = deque(maxlen=self.period + 1)
+
+    def update(self, close: float) -> Optional[float]:
+        self._buf.append(close)
+        return close / self._buf[0] - 1 if len(self._buf) > self.period else None
@@ -1,8 +1,134 @@
 from __future__ import annotations
+import time
 from dataclasses import dataclass
+from typing import Any, Dict
+from ..core.logger import get_logger
+
+log = get_logger(__name__)
 
 @dataclass
 class AccountState:
     equity: float
     balance: float
     upnl: float
+
+@dataclass
+class PositionState:
+    symbol: str
+    amount: float = 0.0
+    entry_price: float = 0.0
+    upnl: float = 0.0
+
+class AccountCache:
+    """In-memory account / position state, so order sizing never waits on a REST call.
+    Seeded and periodically reconciled from GET /fapi/v2/account (apply_rest / reconcile) and kept
+    current between snapshots from user-data ACCOUNT_UPDATE events (apply_event). Reads are O(1).
+    `balance` is the wallet balance of `asset` from both sources: walletBalance of its assets[] entry
+    in the REST snapshot, wb of its B[] entry in events (totalWalletBalance would also count other
+    assets in multi-assets mode, and drift against the events). Unrealized PnL is the sum over cached
+    positions and only moves when the exchange reports it.
+    """
+    def __init__(self, asset: str = 'USDT'):
+        self.asset = asset
+        self.state = AccountState(0.0, 0.0, 0.0)
+        self.positions: Dict[str, PositionState] = {}
+        self.ready = False      # True once a REST snapshot has been applied
+        self.event_time = 0     # E of the last applied ACCOUNT_UPDATE
+        self.updated = 0.0      # monotonic time of the last change
+        self.events = 0
+        self.reconciles = 0
+        self.last_drift = 0.0   # |REST balance - cached balance| at the last reconcile
+
+    @property
+    def balance(self) -> float:
+        return self.state.balance
+
+    @property
+    def equity(self) -> float:
+        return self.state.equity
+
+    def age(self) -> float:
+        """Seconds since the cache last changed (inf before the first snapshot)."""
+        return time.monotonic() - self.updated if self.ready else float('inf')
+
+    def position(self, symbol: str) -> float:
+        p = self.positions.get(symbol)
+        return p.amount if p is not None else 0.0
+
+    def _set_balance(self, balance: float):
+        st = self.state
+        st.balance = balance
+        st.equity = balance + st.upnl
+
+    def _set_position(self, symbol: str, amount: float, entry_price: float, upnl: float):
+        p = self.positions.get(symbol)
+        if p is None:
+            p = self.positions[symbol] = PositionState(symbol)
+        st = self.state
+        st.upnl += upnl - p.upnl
+        st.equity = st.balance + st.upnl
+        p.amount, p.entry_price, p.upnl = amount, entry_price, upnl
+
+    def apply_rest(self, acct: Dict[str, Any]):
+        """Replace the state with a GET /fapi/v2/account response."""
+        self.positions.clear()
+        self.state = AccountState(0.0, 0.0, 0.0)
+        for p in acct.get('positions') or []:
+            amt = float(p.get('positionAmt', 0) or 0)
+            if amt:
+                self._set_position(p['symbol'], amt, float(p.get('entryPrice', 0) or 0),
+                                   float(p.get('unrealizedProfit', 0) or 0))
+        for a in acct.get('assets') or []:
+            if a.get('asset') == self.asset:
+                self._set_balance(float(a.get('walletBalance', 0) or 0))
+        self.ready = True
+        self.updated = time.monotonic()
+
+    def apply_event(self, event: Dict[str, Any]) -> bool:
+        """Apply a user-data ACCOUNT_UPDATE event; returns False for other (or stale) events."""
+        if event.get('e') != 'ACCOUNT_UPDATE':
+            return False
+        t = int(event.get('E', 0) or 0)
+        if t < self.event_time:
+            return False
+        a = event.get('a') or {}
+        for b in a.get('B') or []:
+            if b.get('a') == self.asset:
+                self._set_balance(float(b.get('wb', 0) or 0))
+        for p in a.get('P') or []:
+            if p.get('ps', 'BOTH') == 'BOTH':  # one-way mode
+                self._set_position(p['s'], float(p.get('pa', 0) or 0), float(p.get('ep', 0) or 0),
+                                   float(p.get('up', 0) or 0))
+        self.event_time = t
+        self.events += 1
+        self.updated = time.monotonic()
+        return True
+
+    async def reconcile(self, client) -> bool:
+        """Refresh from REST (async client). Skipped if an event arrived while the request was in
+        flight, since the snapshot may predate it; returns True if the snapshot was applied."""
+        seen = self.events
+        acct = await client.account()
+        return self._reconciled(acct, seen)
+
+    def reconcile_sync(self, client) -> bool:
+        seen = self.events
+        return self._reconciled(client.account(), seen)
+
+    def _reconciled(self, acct: Dict[str, Any], seen: int) -> bool:
+        if self.events != seen:
+            return False
+        before = self.state.balance if self.ready else None
+        self.apply_rest(acct)
+        self.reconciles += 1
+        if before is not None:
+            self.last_drift = abs(self.state.balance - before)
+            if self.last_drift > 1e-6 * max(1.0, abs(before)):
+                log.warning(f"account cache drift {self.last_drift:.6f} {self.asset} corrected from REST")
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {'ready': self.ready, 'balance': self.state.balance, 'equity': self.state.equity,
+                'upnl': self.state.upnl, 'positions': sum(1 for p in self.positions.values() if p.amount),
+                'events': self.events, 'reconciles': self.reconciles, 'last_drift': self.last_drift,
+                'age_s': self.age()}
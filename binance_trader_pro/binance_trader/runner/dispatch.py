@@ -0,0 +1,118 @@
+from __future__ import annotations
+import asyncio, time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set
+from ..core.latency import LatencyStats
+from ..core.logger import get_logger
+from ..exchange.ws_decode import KlineRecord
+
+log = get_logger(__name__)
+
+Process = Callable[[KlineRecord], Awaitable[Any]]
+
+class SymbolDispatcher:
+    """Hands decoded kline records from the WS readers to worker tasks, per symbol and in order.
+    submit() never blocks or awaits, so the socket readers only decode and enqueue. For each symbol:
+    - closed klines are queued and always processed, in arrival order;
+    - only the latest in-progress kline is kept (a newer update, or the close of that bar, replaces it).
+    A symbol is scheduled at most once in the ready queue and handled by one worker at a time, so its
+    records stay ordered while different symbols are processed concurrently by `workers` tasks.
+    Queue depth and event-to-decision latency (submit -> process() done, closed klines) are tracked.
+    """
+    def __init__(self, process: Process, workers: int = 4):
+        self.process = process
+        self.workers = max(1, int(workers))
+        self._ready: asyncio.Queue = asyncio.Queue()
+        self._closed: Dict[str, Deque] = {}
+        self._open: Dict[str, tuple] = {}
+        self._scheduled: Set[str] = set()
+        self._tasks: List[asyncio.Task] = []
+        self.latency = LatencyStats()
+        self.submitted = 0
+        self.conflated = 0
+        self.processed = 0
+        self.backlog = 0
+        self.max_backlog = 0
+        self.errors = 0
+
+    def submit(self, rec: KlineRecord):
+        s = rec.symbol
+        now = time.perf_counter()
+        self.submitted += 1
+        pending = self._open.get(s)
+        if rec.closed:
+            if pending is not None and pending[0].open_time <= rec.open_time:
+                del self._open[s]  # the close carries that bar's final values
+                self.conflated += 1
+                self.backlog -= 1
+            self._closed.setdefault(s, deque()).append((rec, now))
+        else:
+            if pending is not None:
+                self.conflated += 1
+                self.backlog -= 1
+            self._open[s] = (rec, now)
+        self.backlog += 1
+        if self.backlog > self.max_backlog:
+            self.max_backlog = self.backlog
+        if s not in self._scheduled:
+            self._scheduled.add(s)
+            self._ready.put_nowait(s)
+
+    async def on_record(self, rec: KlineRecord):
+        """Async handler form of submit() (for BinanceMarketWS.run)."""
+        self.submit(rec)
+
+    def _take(self, s: str) -> Optional[tuple]:
+        q = self._closed.get(s)
+        if q:
+            item = q.popleft()
+        else:
+            item = self._open.pop(s, None)
+        if item is not None:
+            self.backlog -= 1
+        return item
+
+    async def _worker(self):
+        while True:
+            s = await self._ready.get()
+            try:
+                while True:
+                    item = self._take(s)
+                    if item is None:
+                        break
+                    rec, t0 = item
+                    try:
+                        await self.process(rec)
+                    except Exception as e:
+                        self.errors += 1
+                        log.warning(f"[{s}] kline processing failed: {e}")
+                    self.processed += 1
+                    if rec.closed:
+                        self.latency.record(time.perf_counter() - t0)
+            finally:
+                self._scheduled.discard(s)
+                if self._closed.get(s) or s in self._open:
+                    self._scheduled.add(s)
+                    self._ready.put_nowait(s)
+
+    def start(self):
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def drain(self):
+        """Wait until every submitted record has been processed."""
+        while self.backlog or self._scheduled:
+            if not self._tasks:
+                raise RuntimeError(f"drain() with {self.backlog} records pending and no workers (call start())")
+            await asyncio.sleep(0)
+
+    def stats(self) -> Dict[str, Any]:
+        return {'workers': self.workers, 'ready_symbols': self._ready.qsize(), 'backlog': self.backlog,
+                'max_backlog': self.max_backlog, 'submitted': self.submitted, 'processed': self.processed,
+                'conflated': self.conflated, 'errors': self.errors, 'event_to_decision': self.latency.snapshot()}
@@ -1,22 +1,43 @@
 from __future__ import annotations
-import asyncio, json
+import asyncio, json, time
+import numpy as np
 import pandas as pd
-from typing import Dict, List, Any, Iterable
+from typing import Dict, List, Any, Iterable, Set
+from ..backtest.metrics import MetricsAccumulator
+from ..core.instrument import Instrumentation, MetricsServer
+from ..core.latency import LatencyStats
 from ..core.logger import get_logger
+from ..core.ring_buffer import BarRingBuffer
+from ..core.types import Bar, KLINE_COLUMNS
+from ..core.utils import interval_ms
 from ..exchange.binance_http import BinanceUMClient
+from ..exchange.binance_http_async import AsyncBinanceUMClient
 from ..exchange.binance_ws import BinanceMarketWS, BinanceUserDataWS
+from ..exchange.ws_decode import KlineDecoder, KlineRecord
 from ..data.fetch import fetch_klines
-from ..execution.execution_engine import ExecutionEngine
+from ..data.store import KlineStore
+from ..execution.execution_engine import AsyncExecutionEngine
+from ..execution.order_batcher import OrderBatcher
+from ..strategy.base import IncrementalStrategy, Strategy
+from ..portfolio.account import AccountCache
+from ..exchange.symbol_rules import SymbolRules, load_symbol_rules, rules_path
+from ..exchange.binance_ws_api import BinanceWSOrderGateway
 from ..strategy.registry import build as build_strategy
+from .dispatch import SymbolDispatcher
+from .pool_eval import PoolEvaluator
 
 log = get_logger(__name__)
 
 class MultiSymbolWSRunner:
     def __init__(self, settings: dict, client: BinanceUMClient, symbols: Iterable[str], interval: str,
                  strategy_name: str, strategy_params: Dict[str, Any] | None = None, lookback: int = 500,
-                 fixed_qty: float | None = None):
+                 fixed_qty: float | None = None, aclient: AsyncBinanceUMClient | None = None, closed_only: bool = True,
+                 eval_pool: str | None = None, eval_pool_workers: int | None = None, barrier: bool | None = None,
+                 order_transport: str | None = None, order_batch_window_ms: float | None = None,
+                 instrument: bool | None = None, metrics_port: int | None = None):
         self.settings = settings
-        self.client = client
+        self.client = client  # sync client: startup history only
+        self.aclient = aclient or AsyncBinanceUMClient.from_client(client)  # everything on the event loop
         self.symbols = [s.upper() for s in symbols]
         self.interval = interval
         self.strategy_name = strategy_name
@@ -24,67 +45,346 @@ class MultiSymbolWSRunner:
         self.lookback = int(lookback)
         self.fixed_qty = fixed_qty
 
-        self.df: Dict[str, pd.DataFrame] = {s: pd.DataFrame(columns=['open_time','open','high','low','close','volume','close_time']) for s in self.symbols}
+        # eval_pool='process'|'thread': bars that close together are evaluated as one batch on a pool,
+        # with the ring buffers in shared memory (see runner/pool_eval.py)
+        eval_pool = eval_pool or settings.get('eval_pool')
+        # barrier=True: each bar-close batch is evaluated at once as a (symbols x lookback) matrix op
+        self.barrier = bool(settings.get('barrier_eval', False) if barrier is None else barrier)
+        if self.barrier and eval_pool:
+            raise ValueError("barrier and eval_pool modes are exclusive")
+        self._xs = build_strategy(strategy_name, self.strategy_params) if self.barrier else None
+        if self._xs is not None and type(self._xs).last_signals is Strategy.last_signals:
+            raise ValueError(f"strategy {strategy_name} has no cross-sectional last_signals()")
+        self.pool = PoolEvaluator(self.symbols, self.lookback, strategy_name, self.strategy_params, kind=eval_pool,
+                                  workers=eval_pool_workers or settings.get('eval_pool_workers')) if eval_pool else None
+        self._close_batches: Dict[int, List[tuple]] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._batch_wait = settings.get('close_batch_wait_ms', 50) / 1000.0
+        self.close_latency = LatencyStats()  # first close of a batch -> all decisions made
+        self.barrier_compute = LatencyStats()  # barrier mode: matrix gather + signals for one batch
+
+        # preallocated per-symbol ring buffers: open bar updated in place, O(1) append on a new bar
+        self.bars: Dict[str, BarRingBuffer] = self.pool.buffers if self.pool else \
+            {s: BarRingBuffer(self.lookback) for s in self.symbols}
         self.last_signal: Dict[str, int] = {s: 0 for s in self.symbols}
-        self.strategy = build_strategy(strategy_name, self.strategy_params)
-        self.exec: Dict[str, ExecutionEngine] = {s: ExecutionEngine(client, s) for s in self.symbols}
+        # one instance per symbol: incremental strategies keep rolling state
+        self.strategies = {s: build_strategy(strategy_name, self.strategy_params) for s in self.symbols}
+        self._fed: Dict[str, float] = {s: float('-inf') for s in self.symbols}  # last open_time fed to update()
+        # orders over REST, or over the WebSocket trading API (REST fallback while it is down)
+        order_transport = order_transport or settings.get('order_transport', 'rest')
+        if order_transport not in ('rest', 'ws'):
+            raise ValueError(f"order transport must be 'rest' or 'ws', got {order_transport}")
+        self.order_gateway = BinanceWSOrderGateway.from_client(settings, self.aclient) if order_transport == 'ws' else None
+        # REST orders placed within order_batch_window_ms are coalesced into batchOrders requests (null = off)
+        window = settings.get('order_batch_window_ms') if order_batch_window_ms is None else order_batch_window_ms
+        if window is not None and window >= 0 and self.order_gateway is not None:
+            raise ValueError("order batching applies to the REST transport only")
+        self.order_batcher = OrderBatcher(self.aclient, window) if window is not None and window >= 0 else None
+        orders = self.order_gateway or self.order_batcher
+        self.exec: Dict[str, AsyncExecutionEngine] = {s: AsyncExecutionEngine(self.aclient, s, orders=orders)
+                                                      for s in self.symbols}
+        self._tasks: Set[asyncio.Task] = set()
+        # signals are only evaluated on closed bars, and a closing update carries the final OHLCV,
+        # so in-progress updates can be dropped before they are parsed
+        self.closed_only = closed_only
+        self.market: BinanceMarketWS | None = None
+        # WS readers only decode and enqueue; evaluation runs on dispatcher workers (per-symbol order, conflation)
+        self.dispatch = SymbolDispatcher(self._on_market, workers=settings.get('eval_workers', 4))
+        self.decoder = KlineDecoder(closed_only=closed_only, backend=settings.get('ws_json_backend'))
+        # paper metrics of the signal stream per symbol (position held over each closed bar, taker costs)
+        self.metrics: Dict[str, MetricsAccumulator] = {s: MetricsAccumulator(interval) for s in self.symbols}
+        self._fee = settings.get('taker_fee_rate', 0.0)
+        self._slip = settings.get('slippage_bps', 0.0) * 1e-4
+        # wallet balance / positions from user-data ACCOUNT_UPDATE events, reconciled via REST periodically
+        self.account = AccountCache(settings.get('quote_asset', 'USDT'))
+        self._reconcile_s = settings.get('account_reconcile_s', 60)
+        # exchange order filters: quantities are rounded / validated locally before sending (loaded in run())
+        self.rules: SymbolRules | None = None
+        self._rules_ttl = settings.get('symbol_rules_ttl_s', 86400)
+        # hot-path stage histograms (core/instrument.py); None = off, each stage then costs one `is None` test
+        on = settings.get('instrument', False) if instrument is None else instrument
+        self.instr: Instrumentation | None = Instrumentation() if on else None
+        self._metrics_port = settings.get('metrics_port') if metrics_port is None else metrics_port
+        self._metrics_log_s = settings.get('metrics_log_s', 60)
+        self.metrics_server: MetricsServer | None = None
 
     async def _init_history(self):
         now_ms = int(pd.Timestamp.utcnow().timestamp() * 1000)
-        start_ms = now_ms - 1000 * 60 * (self.lookback + 50)
+        start_ms = now_ms - interval_ms(self.interval) * (self.lookback + 50)
+        data_dir = self.settings.get('data_dir')
+        store = KlineStore(data_dir) if data_dir else None
+        if store is not None:
+            # closed bars come from the local store (only the missing tails are fetched, concurrently)
+            await asyncio.to_thread(store.sync_many, self.client, self.symbols, self.interval, start_ms, now_ms)
         for s in self.symbols:
-            df = fetch_klines(self.client, s, self.interval, start_ms, now_ms)
-            self.df[s] = df.tail(self.lookback).reset_index(drop=True)
-            log.info(f"[{s}] primed with {len(self.df[s])} klines")
-
-    async def _on_market(self, event: Dict[str, Any]):
-        k = event['kline']
-        s = (event['symbol'] or k.get('s', '')).upper()
-        if s not in self.symbols:
+            if store is not None:
+                df = pd.DataFrame(store.tail(s, self.interval, self.lookback), copy=False)
+            else:
+                df = await asyncio.to_thread(fetch_klines, self.client, s, self.interval, start_ms, now_ms)
+            self.bars[s].extend(df[list(KLINE_COLUMNS)].to_numpy(dtype='float64'))
+            self._feed_closed(s, now_ms)
+            log.info(f"[{s}] primed with {len(self.bars[s])} klines")
+
+    async def _on_market(self, rec: KlineRecord):
+        bars = self.bars.get(rec.symbol)
+        if bars is None:
+            return
+        batched = self.pool is not None or self.barrier
+        if batched:
+            for key in [k for k in self._close_batches if k < rec.open_time]:
+                self._flush(key)  # a newer bar started: older batches are complete
+            busy = self._inflight.get(rec.symbol)
+            if busy is not None:
+                await busy  # a pool worker is still reading this symbol's window
+        ins = self.instr
+        if ins is None:
+            bars.upsert(rec.row())
+        else:
+            self._timed_upsert(ins, bars, rec)
+        if not rec.closed:
             return
-        rec = {
-            'open_time': int(k['t']),
-            'open': float(k['o']),
-            'high': float(k['h']),
-            'low': float(k['l']),
-            'close': float(k['c']),
-            'volume': float(k['v']),
-            'close_time': int(k['T'])
-        }
-        df = self.df[s]
-        if len(df) and df.iloc[-1]['open_time'] == rec['open_time']:
-            df.iloc[-1] = rec
+        if batched:
+            self._queue_close(rec)
         else:
-            self.df[s] = pd.concat([df, pd.DataFrame([rec])], ignore_index=True).tail(self.lookback)
-        if k.get('x', False):
-            await self._evaluate_symbol(s)
+            await self._evaluate_symbol(rec.symbol)
 
-    async def _evaluate_symbol(self, s: str):
-        df = self.df[s]
-        if len(df) < 10:
+    def _timed_upsert(self, ins: Instrumentation, bars: BarRingBuffer, rec: KlineRecord):
+        t0 = time.perf_counter()
+        bars.upsert(rec.row())
+        t1 = time.perf_counter()
+        ins.hist['buffer_update'].record(t1 - t0)
+        if rec.closed:
+            t = ins.close_received(rec.symbol)
+            if t is not None:
+                ins.hist['queue'].record(t0 - t)
+
+    def _queue_close(self, rec: KlineRecord):
+        """Pool / barrier mode: group closed bars by close_time; a batch is evaluated once every symbol
+        has closed, or close_batch_wait_ms after its first close (stragglers go in a later batch)."""
+        key = rec.close_time
+        batch = self._close_batches.get(key)
+        if batch is None:
+            batch = self._close_batches[key] = []
+            asyncio.get_running_loop().call_later(self._batch_wait, self._flush, key)
+        view = self.bars[rec.symbol].view()
+        c_prev = view[-2, 4] if len(view) > 1 else float('nan')
+        cursor = self.pool.cursor(rec.symbol) if self.pool is not None else None
+        batch.append((rec.symbol, cursor, c_prev, rec.close, time.perf_counter()))
+        if len(batch) == len(self.symbols):
+            self._flush(key)
+
+    def flush_batches(self):
+        """Evaluate every pending close batch now (pool / barrier mode)."""
+        for key in list(self._close_batches):
+            self._flush(key)
+
+    def _flush(self, key: int):
+        batch = self._close_batches.pop(key, None)
+        if not batch:
             return
-        sig_series = self.strategy.generate_signals(df)
-        if len(sig_series) == 0:
+        if self.barrier:
+            self._evaluate_barrier(batch)
             return
-        sig = int(sig_series.iat[-1])
+        task = self._spawn(self._evaluate_batch(batch))
+        for s, *_ in batch:
+            self._inflight[s] = task
+
+    async def _evaluate_batch(self, batch: List[tuple]):
+        t0 = time.perf_counter()
+        try:
+            sigs = await self.pool.evaluate([cur for _, cur, *_ in batch])
+        except Exception as e:
+            log.warning(f"pool evaluation failed for {len(batch)} symbols: {e}")
+            sigs = [0] * len(batch)
+        if self.instr is not None:
+            self.instr.hist['signal'].record(time.perf_counter() - t0)
+        for (s, _, c_prev, c, _), sig in zip(batch, sigs):
+            if self._inflight.get(s) is asyncio.current_task():
+                del self._inflight[s]
+            self._track(s, sig, c_prev, c)
+            self._apply_signal(s, sig, c)
+        self.close_latency.record(time.perf_counter() - batch[0][4])
+
+    def _evaluate_barrier(self, batch: List[tuple]):
+        """One vectorized signal pass over the batch's (symbols x lookback) closes; orders go out together."""
+        t0 = time.perf_counter()
+        n = self.lookback
+        close = np.full((len(batch), n), np.nan)
+        for row, (s, *_) in zip(close, batch):
+            c = self.bars[s].column('close')
+            row[n - len(c):] = c
+        sigs = self._xs.last_signals(close).tolist()
+        if self.instr is not None:
+            self.instr.hist['signal'].record(time.perf_counter() - t0)
+        orders = []
+        for (s, _, c_prev, c, _), sig in zip(batch, sigs):
+            self._track(s, sig, c_prev, c)
+            if sig != 0 and sig != self.last_signal[s]:
+                orders.append((s, sig, c, self.last_signal[s]))
+                self.last_signal[s] = sig
+        now = time.perf_counter()
+        self.barrier_compute.record(now - t0)
+        self.close_latency.record(now - batch[0][4])
+        if orders:
+            self._spawn(self._place_orders(orders))
+
+    def _feed_closed(self, s: str, now_ms: float | None = None) -> int:
+        """Feed closed bars not yet seen by an incremental strategy; returns the last signal."""
+        strat = self.strategies[s]
+        if not isinstance(strat, IncrementalStrategy):
+            return 0
+        view = self.bars[s].view()
+        i = len(view)
+        while i > 0 and view[i - 1, 0] > self._fed[s]:
+            i -= 1
+        sig = 0
+        for ot, o, h, l, c, v, ct in view[i:].tolist():
+            if now_ms is not None and ct >= now_ms:
+                break  # still-open bar
+            sig = strat.update(Bar(int(ot), o, h, l, c, v, int(ct)))
+            self._fed[s] = ot
+        return sig
+
+    async def _evaluate_symbol(self, s: str):
+        bars = self.bars[s]
+        strat = self.strategies[s]
+        t0 = time.perf_counter() if self.instr is not None else 0.0
+        if isinstance(strat, IncrementalStrategy):
+            sig = self._feed_closed(s)  # O(1) per closed bar
+        else:
+            if len(bars) < 10:
+                return
+            df = bars.frame()  # zero-copy view of the ring buffer
+            sig_series = strat.generate_signals(df)
+            if len(sig_series) == 0:
+                return
+            sig = int(sig_series.iat[-1])
+        if self.instr is not None:
+            self.instr.hist['signal'].record(time.perf_counter() - t0)
+        self._track(s, sig)
+        self._apply_signal(s, sig, bars.last('close'))
+
+    def _apply_signal(self, s: str, sig: int, px: float):
         if sig != 0 and sig != self.last_signal[s]:
-            px = float(df['close'].iat[-1])
+            # last_signal moves when the order is sent (a repeat of the signal is not sent again while it
+            # is in flight) and is rolled back by _place_order if the order fails
+            prev, self.last_signal[s] = self.last_signal[s], sig
+            # order placement runs as its own task: the market handler returns immediately,
+            # so a slow REST round trip never delays kline handling for other symbols
+            self._spawn(self._place_order(s, sig, px, prev))
+
+    def _track(self, s: str, sig: int, c_prev: float | None = None, c: float | None = None):
+        """O(1) metrics update for the bar that just closed (closes default to the last two bars)."""
+        if c is None:
+            view = self.bars[s].view()
+            if len(view) < 2:
+                return
+            c_prev, c = view[-2, 4], view[-1, 4]
+        if not c_prev == c_prev:  # NaN: no previous bar
+            return
+        pos = self.last_signal[s]
+        traded = sig != 0 and sig != pos
+        ret = pos * (c / c_prev - 1)
+        if traded:
+            # same cost model as the backtest engine: fee + slippage to open, fee to close the old leg
+            ret -= self._fee + self._slip + (self._fee if pos else 0.0)
+        self.metrics[s].update(ret, traded)
+
+    def metrics_snapshot(self) -> Dict[str, dict]:
+        """Current per-symbol metrics (no recomputation)."""
+        return {s: m.snapshot() for s, m in self.metrics.items()}
+
+    def market_stats(self) -> List[Dict[str, Any]]:
+        """Per-shard market WS backpressure metrics (empty before run())."""
+        return self.market.stats() if self.market is not None else []
+
+    def dispatch_stats(self) -> Dict[str, Any]:
+        """Dispatcher backlog / conflation counters and event-to-decision latency."""
+        return self.dispatch.stats()
+
+    def rate_limit_stats(self) -> Dict[str, Any]:
+        """Request-weight / order-count utilization of the shared rate governor."""
+        return self.aclient.governor.stats()
+
+    def latency_stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-close decision latency percentiles (pool / barrier mode), plus the hot-path stages when instrumented."""
+        stats = {'close_to_decision': self.close_latency.snapshot(), 'barrier_compute': self.barrier_compute.snapshot()}
+        if self.instr is not None:
+            stats.update(self.instr.snapshot())
+        return stats
+
+    def prometheus(self) -> str:
+        """Stage histograms and backlog / rate-limit gauges in Prometheus text format (instrumented runner)."""
+        d = self.dispatch
+        shards = self.market_stats()
+        gauges = {'dispatch_backlog': d.backlog, 'dispatch_max_backlog': d.max_backlog,
+                  'ws_queue_depth': sum(sh['depth'] for sh in shards),
+                  'ws_reconnects': sum(sh['reconnects'] for sh in shards), 'tasks_in_flight': len(self._tasks)}
+        if getattr(self.aclient, 'governor', None) is not None:  # not on a SimulatedExchange
+            gov = self.rate_limit_stats()
+            gauges.update(rate_weight_util=gov['weight_util'], rate_orders_10s_util=gov['orders_10s_util'],
+                          rate_throttled=gov['throttled'])
+        return (self.instr or Instrumentation()).prometheus(gauges=gauges)
+
+    async def _metrics_log_loop(self):
+        while True:
+            await asyncio.sleep(self._metrics_log_s)
+            summary = self.instr.summary()
+            if summary:
+                log.info(f"hot-path latency:\n{summary}")
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _equity(self) -> float:
+        """Sizing equity from the account cache; REST only until the first snapshot is in."""
+        if not self.account.ready:
+            self.account.apply_rest(await self.aclient.account())
+        return self.account.balance
+
+    async def _place_orders(self, orders: List[tuple]):
+        """Send a batch of (symbol, signal, price, previous signal) orders concurrently. Each is sized from
+        the account cache when it is placed, as in inline mode, so both modes size (and fill) the same."""
+        await asyncio.gather(*(self._place_order(s, sig, px, prev) for s, sig, px, prev in orders))
+
+    async def _place_order(self, s: str, sig: int, px: float, prev: int = 0):
+        """Size and send one market order; on failure last_signal[s] goes back to `prev`, so the signal
+        state only records orders the exchange accepted."""
+        ins = self.instr
+        if ins is not None:
+            t_close = ins.close_received(s)
+            t0 = time.perf_counter()
+        try:
             qty = self.fixed_qty
             if qty is None:
-                acct = self.client.account()
-                equity = float(acct.get('totalWalletBalance', 0) or 0)
+                equity = await self._equity()
                 qty = max(0.0, (equity * self.settings['risk_per_trade']) / px)
+            if ins is not None:
+                t1 = time.perf_counter()
+                ins.hist['sizing'].record(t1 - t0)
             ex = self.exec[s]
             if sig > 0:
                 log.info(f"[{s}] BUY qty={qty} px~{px}")
-                ex.market_buy(qty)
+                await ex.market_buy(qty, ref_price=px)
             else:
                 log.info(f"[{s}] SELL qty={qty} px~{px}")
-                ex.market_sell(qty)
-            self.last_signal[s] = sig
+                await ex.market_sell(qty, ref_price=px)
+            if ins is not None:
+                t2 = time.perf_counter()
+                ins.hist['order_rtt'].record(t2 - t1)
+                if t_close is not None:
+                    ins.hist['close_to_ack'].record(t2 - t_close)
+        except Exception as e:
+            log.warning(f"[{s}] order failed: {e}")
+            if self.last_signal[s] == sig:
+                self.last_signal[s] = prev
 
     async def _on_user(self, event: Dict[str, Any]):
         try:
+            self.account.apply_event(event)
             e = event.get('e')
             if e == 'ORDER_TRADE_UPDATE' or 'ORDER_TRADE_UPDATE' in json.dumps(event):
                 log.info(f"UserData ORDER: {event}")
@@ -93,16 +393,77 @@ class MultiSymbolWSRunner:
         except Exception:
             log.info(f"UserData: {event}")
 
+    async def _reconcile_loop(self):
+        while True:
+            await asyncio.sleep(self._reconcile_s)
+            try:
+                await self.account.reconcile(self.aclient)
+            except Exception as e:
+                log.warning(f"account reconcile failed: {e}")
+
+    async def _load_rules(self, refresh: bool = False):
+        rules = await asyncio.to_thread(load_symbol_rules, self.client, rules_path(self.settings),
+                                        self._rules_ttl, refresh)
+        self.set_rules(rules)
+
+    def set_rules(self, rules: SymbolRules | None):
+        self.rules = rules
+        for ex in self.exec.values():
+            ex.rules = rules
+
+    async def _rules_loop(self):
+        while True:
+            await asyncio.sleep(max(60.0, self._rules_ttl - self.rules.age()))
+            try:
+                await self._load_rules(refresh=True)
+            except Exception as e:
+                log.warning(f"symbol rules refresh failed: {e}")
+
     async def run(self):
         await self._init_history()
+        await self._load_rules()
+        if self.order_gateway is not None:
+            await self.order_gateway.start()
+        if self.fixed_qty is None:
+            await self.account.reconcile(self.aclient)
         if self.symbols:
-            ex = ExecutionEngine(self.client, self.symbols[0])
-            ex.ensure_margin_type('ISOLATED')
-            ex.ensure_leverage(self.settings['max_leverage'])
-
-        market = BinanceMarketWS(self.settings, self.symbols, self.interval)
-        user = BinanceUserDataWS(self.settings, self.client)
-        await asyncio.gather(
-            market.run(self._on_market),
-            user.run(self._on_user)
-        )
+            ex = self.exec[self.symbols[0]]
+            await ex.ensure_margin_type('ISOLATED')
+            await ex.ensure_leverage(self.settings['max_leverage'])
+
+        market = self.market = BinanceMarketWS(self.settings, self.symbols, self.interval)
+        user = BinanceUserDataWS(self.settings, self.aclient)
+        extra = []
+        if self.instr is not None:
+            if self._metrics_port is not None:
+                self.metrics_server = MetricsServer(self.prometheus, port=int(self._metrics_port))
+                await self.metrics_server.start()
+            if self._metrics_log_s:
+                extra.append(self._metrics_log_loop())
+        self.dispatch.start()
+        try:
+            await asyncio.gather(
+                market.run(self.dispatch.on_record, self.decoder, instrument=self.instr),
+                user.run(self._on_user),
+                self._rules_loop(),
+                *([self._reconcile_loop()] if self.fixed_qty is None else []),
+                *extra
+            )
+        finally:
+            await self.dispatch.stop()
+            if self.metrics_server is not None:
+                await self.metrics_server.close()
+            if self.instr is not None:
+                log.info(f"hot-path latency:\n{self.instr.summary()}")
+            if self.order_gateway is not None:
+                await self.order_gateway.close()
+            if self.order_batcher is not None:
+                await self.order_batcher.close()
+            await self.aclient.close()
+            self.shutdown()
+
+    def shutdown(self):
+        """Release the evaluation pool and its shared memory (pool mode)."""
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
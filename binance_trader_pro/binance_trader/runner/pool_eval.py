@@ -0,0 +1,83 @@
+from __future__ import annotations
+import asyncio, math, os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from ..core.ring_buffer import BarRingBuffer
+from ..core.types import KLINE_COLUMNS
+from ..strategy.registry import build as build_strategy
+
+# ---- worker side ----
+_W: Dict[str, Any] = {}
+
+def _worker_init(shm_name: str, shape: Tuple[int, int, int], strategy_name: str, params: Dict[str, Any]):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _W['shm'] = shm  # keep the mapping alive for the worker's lifetime
+    _W['bars'] = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    _W['capacity'] = shape[1] // 2
+    _W['strategy'] = build_strategy(strategy_name, params)
+
+def _eval_chunk(items: Sequence[Tuple[int, int, int]]) -> List[int]:
+    """Last signal of generate_signals() over each (symbol row, head, length) ring buffer window.
+    No minimum length: a short window gives what the inline incremental update() gives for it."""
+    bars, cap, strat = _W['bars'], _W['capacity'], _W['strategy']
+    out = []
+    for i, head, n in items:
+        rb = BarRingBuffer(cap, buf=bars[i])
+        rb.seek(head, n)
+        sig = strat.generate_signals(rb.frame())
+        out.append(int(sig.iat[-1]) if len(sig) else 0)
+    return out
+
+# ---- runner side ----
+class PoolEvaluator:
+    """Evaluates batches of symbols' bar windows on a process (or thread) pool.
+    Every symbol's BarRingBuffer lives in one shared-memory block of shape (symbols, 2*lookback, ncols);
+    a task only carries (row, head, length) cursors, never a DataFrame. Workers build the strategy once
+    and run the stateless generate_signals() on the window, so no per-symbol state is needed there.
+    """
+    def __init__(self, symbols: Sequence[str], lookback: int, strategy_name: str, params: Dict[str, Any],
+                 kind: str = 'process', workers: Optional[int] = None):
+        if kind not in ('process', 'thread'):
+            raise ValueError(f"eval pool must be 'process' or 'thread', got {kind}")
+        self.symbols = list(symbols)
+        self.index = {s: i for i, s in enumerate(self.symbols)}
+        self.kind = kind
+        self.workers = int(workers or 0) or os.cpu_count() or 1
+        shape = (len(self.symbols), 2 * int(lookback), len(KLINE_COLUMNS))
+        self._shm = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)) * 8))
+        arr = np.ndarray(shape, dtype=np.float64, buffer=self._shm.buf)
+        arr[:] = np.nan
+        self.buffers: Dict[str, BarRingBuffer] = {s: BarRingBuffer(lookback, buf=arr[i]) for i, s in enumerate(self.symbols)}
+        init_args = (self._shm.name, shape, strategy_name, params)
+        if kind == 'process':
+            self.executor: Executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_worker_init, initargs=init_args)
+        else:  # threads see the parent's array directly
+            _W.update(bars=arr, capacity=int(lookback), strategy=build_strategy(strategy_name, params))
+            self.executor = ThreadPoolExecutor(max_workers=self.workers)
+
+    def cursor(self, s: str) -> Tuple[int, int, int]:
+        head, n = self.buffers[s].cursor
+        return self.index[s], head, n
+
+    async def evaluate(self, cursors: Sequence[Tuple[int, int, int]]) -> List[int]:
+        """Signals for the given cursors, split into one chunk per worker."""
+        if not cursors:
+            return []
+        loop = asyncio.get_running_loop()
+        size = math.ceil(len(cursors) / self.workers)
+        parts = await asyncio.gather(*(loop.run_in_executor(self.executor, _eval_chunk, cursors[i:i + size])
+                                       for i in range(0, len(cursors), size)))
+        return [sig for part in parts for sig in part]
+
+    def close(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        if self.kind == 'thread':
+            _W.clear()
+        self.buffers.clear()
+        try:
+            self._shm.close()
+        except BufferError:  # a view is still referenced somewhere; the unlink below still frees it
+            pass
+        self._shm.unlink()
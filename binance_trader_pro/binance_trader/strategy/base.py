@@ -1,6 +1,8 @@
 from __future__ import annotations
+import numpy as np
 import pandas as pd
 from typing import Dict, Any
+from ..core.types import Bar, KLINE_COLUMNS
 
 class Strategy:
     def __init__(self, params: Dict[str, Any]):
@@ -9,3 +11,38 @@ class Strategy:
     def generate_signals(self, df: pd.DataFrame) -> pd.Series:
         """Return signal series: 1 buy, -1 sell, 0 hold."""
         raise NotImplementedError
+
+    def last_signals(self, close: np.ndarray) -> np.ndarray:
+        """Cross-sectional form: the last bar's signal for every row of a (symbols, bars) close matrix,
+        oldest bar first, rows with fewer bars NaN-padded on the left. Optional (bar-close barrier mode).
+        """
+        raise NotImplementedError
+
+class IncrementalStrategy(Strategy):
+    """Strategy that can also be fed one closed bar at a time.
+    update(bar) must return the same value generate_signals() would give for that bar, in O(1),
+    from rolling state kept on the instance (so use one instance per symbol).
+    """
+    def __init__(self, params: Dict[str, Any]):
+        super().__init__(params)
+        self.reset()
+
+    def reset(self):
+        """Clear rolling state."""
+        raise NotImplementedError
+
+    def update(self, bar: Bar) -> int:
+        """Consume the next closed bar; return its signal (1 buy, -1 sell, 0 hold)."""
+        raise NotImplementedError
+
+    def feed(self, df: pd.DataFrame) -> int:
+        """Feed every row of a kline frame through update(); returns the last signal."""
+        sigs = self.update_many(df)
+        return int(sigs[-1]) if len(sigs) else 0
+
+    def update_many(self, df: pd.DataFrame) -> np.ndarray:
+        """update() for every row of a kline frame, in order; returns the per-row signals."""
+        upd = self.update
+        cols = [df[c].tolist() for c in KLINE_COLUMNS]
+        return np.fromiter((upd(Bar(int(ot), o, h, l, c, v, int(ct))) for ot, o, h, l, c, v, ct in zip(*cols)),
+                           dtype=np.int8, count=len(df))
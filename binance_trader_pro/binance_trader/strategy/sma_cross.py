@@ -1,8 +1,28 @@
 from __future__ import annotations
+from typing import Iterator, Sequence, Tuple
+import numpy as np
 import pandas as pd
-from .base import Strategy
+from .base import IncrementalStrategy
+from ..core.types import Bar
+from ..indicators.streaming import RollingMean
+
+class SmaCross(IncrementalStrategy):
+    def reset(self):
+        self._fast = RollingMean(int(self.params.get('fast', 20)))
+        self._slow = RollingMean(int(self.params.get('slow', 60)))
+        self._state = 0
+        self._bars = 0
+
+    def update(self, bar: Bar) -> int:
+        f = self._fast.update(bar.close)
+        s = self._slow.update(bar.close)
+        state = 0 if f is None or s is None else (f > s) - (f < s)
+        # first bar has no previous state (diff().fillna(0) in the batch version)
+        sig = max(-1, min(1, state - self._state)) if self._bars else 0
+        self._state = state
+        self._bars += 1
+        return sig
 
-class SmaCross(Strategy):
     def generate_signals(self, df: pd.DataFrame) -> pd.Series:
         fast = int(self.params.get('fast', 20))
         slow = int(self.params.get('slow', 60))
@@ -12,3 +32,102 @@ class SmaCross(Strategy):
         # signal on crossover change only
         sig = sig.diff().fillna(0).clip(-1, 1)
         return sig
+
+    def last_signals(self, close: np.ndarray) -> np.ndarray:
+        fast = int(self.params.get('fast', 20))
+        slow = int(self.params.get('slow', 60))
+        close = np.asarray(close, dtype=np.float64)
+        if close.shape[-1] < max(fast, slow) + 1:
+            return np.zeros(close.shape[0], dtype=np.int8)
+        f1, f0 = _tail_means(close, fast)
+        s1, s0 = _tail_means(close, slow)
+        state1 = (f1 > s1).astype(np.int8) - (f1 < s1).astype(np.int8)
+        state0 = (f0 > s0).astype(np.int8) - (f0 < s0).astype(np.int8)
+        return np.clip(state1 - state0, -1, 1).astype(np.int8)
+
+def _tail_means(close: np.ndarray, n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Row means of the last n columns and of the n columns before the last; a window of identical
+    values gives that value exactly (as pandas' rolling mean does), NaN anywhere gives NaN."""
+    out = []
+    for end in (close.shape[-1], close.shape[-1] - 1):
+        win = close[:, end - n:end]
+        m = win.mean(axis=1)
+        const = win.max(axis=1) == win.min(axis=1)
+        m[const] = win[const, -1]
+        out.append(m)
+    return out[0], out[1]
+
+# ---- batched (multi-parameter) evaluation ----
+
+class PrefixSum:
+    """One int64 cumulative sum of a close series on an integer price grid; the SMA of any window is
+    read off it as an exact integer window sum divided once.
+    Prices that are multiples of 10**-k (k <= 8, i.e. exchange tick sizes) are used as-is, so equal SMAs
+    come out bit-equal and unequal ones keep their order; other prices are rounded to a binary grid as
+    fine as the int64 sum allows and `tie_tol` bounds the error of an SMA difference (0 on the tick grid).
+    """
+    def __init__(self, close: np.ndarray):
+        x = np.asarray(close, dtype=np.float64)
+        if not np.isfinite(x).all():
+            raise ValueError("close prices must be finite")
+        self.n = len(x)
+        self.scale, self.tie_tol = _price_grid(x)
+        self.cs = np.zeros(self.n + 1, dtype=np.int64)
+        np.cumsum(np.rint(x * self.scale).astype(np.int64), out=self.cs[1:])
+
+    def sma(self, windows: Sequence[int]) -> np.ndarray:
+        """(len(windows), bars) SMA matrix, NaN before warm-up."""
+        cs, n = self.cs, self.n
+        out = np.full((len(windows), n), np.nan)
+        for row, w in zip(out, windows):
+            w = int(w)
+            if 0 < w <= n:
+                np.divide(cs[w:] - cs[:-w], w * self.scale, out=row[w - 1:])
+        return out
+
+# window sums must be exact in float64 (< 2**53) for the division to round them once
+_EXACT = float(2 ** 53)
+
+def _price_grid(x: np.ndarray) -> Tuple[float, float]:
+    """(scale, tie_tol): decimal tick grid if every price is on one, else the finest binary grid."""
+    n = max(1, len(x))
+    top = float(np.abs(x).max()) if len(x) else 0.0
+    for k in range(9):
+        scale = 10.0 ** k
+        if top * scale * n >= _EXACT:
+            break
+        y = x * scale
+        if np.all(np.abs(y - np.rint(y)) < 1e-6):
+            return scale, 0.0
+    # off the decimal grid: rounding each price moves an SMA by at most 0.5 / scale
+    scale = 2.0 ** np.floor(np.log2(_EXACT / (max(top, 1e-300) * n)))
+    return scale, 1.0 / scale
+
+def sma_matrix(close: np.ndarray, windows: Sequence[int]) -> np.ndarray:
+    """SMA for every window from a single prefix sum: (len(windows), bars), NaN before warm-up."""
+    return PrefixSum(close).sma(windows)
+
+def cross_signals(s_fast: np.ndarray, s_slow: np.ndarray, tol: float = 0.0) -> np.ndarray:
+    """Crossover signals (+1/-1 on change, else 0) for broadcastable (..., bars) SMA arrays.
+    Same rule as SmaCross.generate_signals (NaN during warm-up compares as flat); SMAs within `tol`
+    (PrefixSum.tie_tol) count as equal.
+    """
+    d = s_fast - s_slow
+    state = (d > tol).astype(np.int8) - (d < -tol).astype(np.int8)
+    sig = np.zeros(state.shape, dtype=np.int8)
+    np.clip(np.diff(state, axis=-1), -1, 1, out=sig[..., 1:])
+    return sig
+
+def grid_signals(close: np.ndarray, fasts: Sequence[int], slows: Sequence[int]) -> np.ndarray:
+    """(len(fasts), len(slows), bars) int8 signal tensor in one pass over the data."""
+    p = PrefixSum(close)
+    return cross_signals(p.sma(fasts)[:, None, :], p.sma(slows)[None, :, :], p.tie_tol)
+
+def iter_grid_signals(close: np.ndarray, fasts: Sequence[int], slows: Sequence[int]) -> Iterator[Tuple[int, np.ndarray]]:
+    """Streamed variant of grid_signals: yields (fast, (len(slows), bars) signals) per fast window,
+    so peak memory is one row of the tensor instead of all of it.
+    """
+    p = PrefixSum(close)
+    s_slow = p.sma(slows)
+    for fast, s_fast in zip(fasts, p.sma(fasts)):
+        yield int(fast), cross_signals(s_fast[None, :], s_slow, p.tie_tol)
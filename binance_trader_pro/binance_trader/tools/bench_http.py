@@ -0,0 +1,46 @@
+from __future__ import annotations
+import argparse, time
+import requests
+from ..core.latency import LatencyStats
+from ..exchange.binance_http import BinanceUMClient, BinanceConfig
+from ..exchange.rate_limit import RateGovernor
+from .stub_server import StubRestServer
+
+def _route(path, params):
+    if path == '/fapi/v1/order':
+        return {'orderId': 1, 'symbol': params.get('symbol'), 'status': 'NEW'}
+    return {}
+
+def _report(label: str, st: LatencyStats, wall: float):
+    s = st.snapshot()
+    print(f"{label:>16}: n={s['count']} mean={s['mean_ms']:.3f}ms p50={s['p50_ms']:.3f}ms "
+          f"p99={s['p99_ms']:.3f}ms max={s['max_ms']:.3f}ms ({s['count'] / wall:.0f} req/s)")
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark REST round trips: per-call requests.* vs pooled client session.")
+    ap.add_argument('--n', type=int, default=2000)
+    args = ap.parse_args(argv)
+
+    with StubRestServer(_route) as srv:
+        client = BinanceUMClient(BinanceConfig('key', 'secret', srv.url), governor=RateGovernor.unlimited())
+        # baseline: the previous module-level requests.post per call (new connection each time)
+        base = LatencyStats(window=args.n)
+        t_wall = time.perf_counter()
+        for _ in range(args.n):
+            t0 = time.perf_counter()
+            requests.post(srv.url + '/fapi/v1/order', params={'symbol': 'BTCUSDT'}, timeout=5).json()
+            base.record(time.perf_counter() - t0)
+        _report('requests.post', base, time.perf_counter() - t_wall)
+
+        pooled = LatencyStats(window=args.n)
+        t_wall = time.perf_counter()
+        for _ in range(args.n):
+            t0 = time.perf_counter()
+            client.new_order('BTCUSDT', 'BUY', 'MARKET', 0.001)
+            pooled.record(time.perf_counter() - t0)
+        _report('client session', pooled, time.perf_counter() - t_wall)
+        print(f"mean speedup: {base.snapshot()['mean_ms'] / max(1e-9, pooled.snapshot()['mean_ms']):.2f}x")
+        print("client per-endpoint:", client.latency.snapshot())
+
+if __name__ == '__main__':
+    main()
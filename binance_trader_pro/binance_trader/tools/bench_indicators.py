@@ -0,0 +1,67 @@
+from __future__ import annotations
+import argparse, time
+import numpy as np
+import pandas as pd
+from ..indicators import batch as B, streaming as S
+
+# pandas expressions as written in integrations/freqtrade/user_data/strategies/*
+def _pd_true_range(df):
+    return np.maximum(df["high"]-df["low"], np.maximum(abs(df["high"]-df["close"].shift(1)), abs(df["low"]-df["close"].shift(1))))
+
+def _pd_rsi(df, n=14):
+    delta = df["close"].diff()
+    gain = delta.clip(lower=0).rolling(n).mean()
+    loss = (-delta.clip(upper=0)).rolling(n).mean().abs()
+    return 100 - (100 / (1 + gain / (loss.replace(0, 1e-9))))
+
+CASES = {
+    # name: (pandas, numpy batch, streaming factory, streaming inputs)
+    'atr14': (lambda df: _pd_true_range(df).rolling(14).mean(),
+              lambda h, l, c: B.atr(h, l, c, 14), lambda: S.ATR(14), 'hlc'),
+    'rsi14': (_pd_rsi, lambda h, l, c: B.rsi(c, 14), lambda: S.RSI(14), 'c'),
+    'max20': (lambda df: df["high"].rolling(20).max(),
+              lambda h, l, c: B.rolling_max(h, 20), lambda: S.RollingMax(20), 'h'),
+    'min20': (lambda df: df["low"].rolling(20).min(),
+              lambda h, l, c: B.rolling_min(l, 20), lambda: S.RollingMin(20), 'l'),
+    'sma50': (lambda df: df["close"].rolling(50).mean(),
+              lambda h, l, c: B.sma(c, 50), lambda: S.RollingMean(50), 'c'),
+}
+
+def _best(fn, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Microbenchmark: pandas indicator expressions vs indicators.batch / indicators.streaming.")
+    ap.add_argument('--bars', type=int, default=500_000)
+    ap.add_argument('--stream-bars', type=int, default=50_000, help='Bars fed through the streaming objects')
+    ap.add_argument('--repeat', type=int, default=5)
+    args = ap.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    c = 30000 + np.cumsum(rng.normal(0, 5, args.bars))
+    h = c + rng.random(args.bars) * 10
+    l = c - rng.random(args.bars) * 10
+    df = pd.DataFrame({'high': h, 'low': l, 'close': c})
+    cols = {'h': h, 'l': l, 'c': c}
+
+    print(f"{'case':>6} {'pandas ms':>10} {'numpy ms':>10} {'speedup':>8} {'max|diff|':>10} {'stream us/upd':>14}")
+    for name, (pd_fn, np_fn, mk_stream, inputs) in CASES.items():
+        t_pd = _best(lambda: pd_fn(df), args.repeat)
+        t_np = _best(lambda: np_fn(h, l, c), args.repeat)
+        diff = np.nanmax(np.abs(pd_fn(df).to_numpy() - np_fn(h, l, c)))
+        k = min(args.stream_bars, args.bars)
+        feed = list(zip(*(cols[x][:k].tolist() for x in inputs)))
+        ind = mk_stream()
+        t0 = time.perf_counter()
+        for x in feed:
+            ind.update(*x)
+        t_st = (time.perf_counter() - t0) / k
+        print(f"{name:>6} {t_pd * 1e3:10.2f} {t_np * 1e3:10.2f} {t_pd / t_np:7.1f}x {diff:10.2e} {t_st * 1e6:14.2f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+from __future__ import annotations
+import argparse, asyncio, json, time
+from ..core.latency import LatencyStats
+from ..exchange.binance_http import BinanceConfig
+from ..exchange.binance_http_async import AsyncBinanceUMClient
+from ..exchange.binance_ws_api import BinanceWSOrderGateway
+from ..exchange.rate_limit import RateGovernor
+from ..execution.order_batcher import OrderBatcher
+from .stub_server import StubOrderWSServer, StubRestServer
+
+def _make_route(delay_ms: float):
+    def route(path, params):
+        if delay_ms:
+            time.sleep(delay_ms / 1000.0)
+        if path == '/fapi/v1/order':
+            return {'orderId': 1, 'symbol': params.get('symbol'), 'status': 'FILLED'}
+        if path == '/fapi/v1/batchOrders':
+            return [{'orderId': i, 'symbol': o['symbol'], 'status': 'FILLED'}
+                    for i, o in enumerate(json.loads(params['batchOrders']))]
+        return {}
+    return route
+
+def _report(label: str, st: LatencyStats, wall: float):
+    s = st.snapshot()
+    print(f"{label:>16}: n={s['count']} mean={s['mean_ms']:.3f}ms p50={s['p50_ms']:.3f}ms "
+          f"p99={s['p99_ms']:.3f}ms max={s['max_ms']:.3f}ms ({s['count'] / wall:.0f} orders/s)")
+
+async def _measure(orders, n: int, concurrency: int) -> tuple:
+    """n order round trips, `concurrency` at a time; (per-order LatencyStats, wall seconds)."""
+    st = LatencyStats(window=n)
+
+    async def one():
+        t0 = time.perf_counter()
+        await orders.new_order('BTCUSDT', 'BUY', 'MARKET', 0.001)
+        st.record(time.perf_counter() - t0)
+
+    t_wall = time.perf_counter()
+    for i in range(0, n, concurrency):
+        await asyncio.gather(*(one() for _ in range(min(concurrency, n - i))))
+    return st, time.perf_counter() - t_wall
+
+async def _burst(client, symbols: int, repeat: int):
+    """A bar close where `symbols` symbols signal at once: first order sent -> last response, per mode."""
+    batcher = OrderBatcher(client, window_ms=0)
+    syms = [f"SYM{i:03d}USDT" for i in range(symbols)]
+
+    async def sequential():
+        for s in syms:
+            await client.new_order(s, 'BUY', 'MARKET', 0.001)
+
+    async def concurrent(orders):
+        await asyncio.gather(*(orders.new_order(s, 'BUY', 'MARKET', 0.001) for s in syms))
+
+    for label, fn in (('sequential', sequential), ('concurrent', lambda: concurrent(client)),
+                      ('batchOrders', lambda: concurrent(batcher))):
+        st = LatencyStats(window=repeat)
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            await fn()
+            st.record(time.perf_counter() - t0)
+        s = st.snapshot()
+        print(f"{label:>16}: {symbols} orders first->last p50={s['p50_ms']:.3f}ms p99={s['p99_ms']:.3f}ms")
+    print("batcher:", {k: v for k, v in batcher.stats().items() if k != 'flush_span'})
+
+async def _bench(rest_url: str, ws_url: str, n: int, concurrency: int):
+    client = AsyncBinanceUMClient(BinanceConfig('key', 'secret', rest_url), governor=RateGovernor.unlimited())
+    gw = BinanceWSOrderGateway({}, 'key', 'secret', fallback=client, url=ws_url)
+    await gw.start()
+    try:
+        for label, orders in (('REST', client), ('WS API', gw)):
+            await _measure(orders, min(n, 50), concurrency)  # warm-up: connections, code paths
+            st, wall = await _measure(orders, n, concurrency)
+            _report(label, st, wall)
+        print("gateway:", {k: v for k, v in gw.stats().items() if k != 'latency'})
+    finally:
+        await gw.close()
+        await client.close()
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Order round-trip latency over REST vs the WebSocket trading API "
+                                             "(or a multi-symbol burst with batchOrders), against local stubs.")
+    ap.add_argument('--n', type=int, default=2000)
+    ap.add_argument('--concurrency', type=int, default=1, help='Orders in flight at once')
+    ap.add_argument('--delay-ms', type=float, default=0.0, help='Simulated exchange processing time per request')
+    ap.add_argument('--burst', type=int, default=0,
+                    help='Instead: N symbols signalling at once - sequential vs concurrent vs batchOrders (REST)')
+    args = ap.parse_args(argv)
+    with StubRestServer(_make_route(args.delay_ms)) as rest, StubOrderWSServer(delay_ms=args.delay_ms) as ws:
+        if args.burst:
+            async def burst():
+                client = AsyncBinanceUMClient(BinanceConfig('key', 'secret', rest.url), governor=RateGovernor.unlimited())
+                try:
+                    await _burst(client, args.burst, max(1, args.n // args.burst))
+                finally:
+                    await client.close()
+            asyncio.run(burst())
+        else:
+            asyncio.run(_bench(rest.url, ws.url, args.n, args.concurrency))
+
+if __name__ == '__main__':
+    main()
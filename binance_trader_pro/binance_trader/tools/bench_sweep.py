@@ -0,0 +1,33 @@
+from __future__ import annotations
+import argparse, os, time
+import numpy as np
+import pandas as pd
+from ..backtest.sweep import parse_range, param_grid, run_sweep
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark the parameter sweep: serial vs process pool.")
+    ap.add_argument('--data', default=None, help='Kline CSV (default: synthetic random walk)')
+    ap.add_argument('--bars', type=int, default=100_000, help='Synthetic bar count when --data is omitted')
+    ap.add_argument('--fast', default='5..50:5')
+    ap.add_argument('--slow', default='20..200:20')
+    ap.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = ap.parse_args(argv)
+
+    if args.data:
+        close = pd.read_csv(args.data, usecols=['close'])['close'].to_numpy(dtype=np.float64)
+    else:
+        rng = np.random.default_rng(0)
+        close = 30000 * np.exp(np.cumsum(rng.normal(0, 1e-3, args.bars)))
+    combos = param_grid(parse_range(args.fast), parse_range(args.slow))
+    print(f"bars={len(close)} combos={len(combos)} workers={args.workers}")
+
+    timings = {}
+    for label, workers in (('serial', 1), ('pool', args.workers)):
+        t0 = time.perf_counter()
+        res = run_sweep(close, combos, workers=workers)
+        timings[label] = time.perf_counter() - t0
+        print(f"{label:>6}: {timings[label]:.2f}s ({len(combos) / timings[label]:.1f} combos/s) best={res.iloc[0].to_dict()}")
+    print(f"speedup: {timings['serial'] / timings['pool']:.2f}x")
+
+if __name__ == '__main__':
+    main()
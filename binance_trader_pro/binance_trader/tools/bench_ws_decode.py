@@ -0,0 +1,81 @@
+from __future__ import annotations
+import argparse, json, time
+from typing import List
+import numpy as np
+from ..exchange.ws_decode import KlineDecoder, json_backend
+
+def synth_messages(symbols: int, bars: int, updates_per_bar: int, interval_ms: int = 60_000, seed: int = 0) -> List[str]:
+    """Combined-stream kline messages in Binance's compact format: updates_per_bar - 1 open updates, then the close."""
+    rng = np.random.default_rng(seed)
+    out = []
+    for b in range(bars):
+        t = 1_700_000_000_000 + b * interval_ms
+        for i in range(symbols):
+            s = f"SYM{i:03d}USDT"
+            c = 100 + rng.normal()
+            for u in range(updates_per_bar):
+                x = u == updates_per_bar - 1
+                k = {"t": t, "T": t + interval_ms - 1, "s": s, "i": "1m", "f": 1, "L": 2, "o": f"{c:.4f}",
+                     "c": f"{c + 0.01 * u:.4f}", "h": f"{c + 0.05:.4f}", "l": f"{c - 0.05:.4f}", "v": "123.456",
+                     "n": 42, "x": x, "q": "12345.6", "V": "60.1", "Q": "6000.5", "B": "0"}
+                out.append(json.dumps({"stream": f"{s.lower()}@kline_1m",
+                                       "data": {"e": "kline", "E": t + u, "s": s, "k": k}}, separators=(',', ':')))
+    return out
+
+def _baseline(msgs: List[str]):
+    """The previous path: json.loads, a handler dict per event, then seven float() conversions."""
+    for msg in msgs:
+        data = json.loads(msg)
+        payload = data.get('data', data)
+        if 'e' in payload and payload.get('e') == 'kline':
+            k = payload.get('k', {})
+            event = {'symbol': payload.get('s', k.get('s')), 'event_time': payload.get('E'), 'kline': k}
+            k = event['kline']
+            (float(k['t']), float(k['o']), float(k['h']), float(k['l']), float(k['c']), float(k['v']), float(k['T']))
+
+def _decode(dec: KlineDecoder, msgs: List[str]):
+    decode = dec.decode
+    for msg in msgs:
+        rec = decode(msg)
+        if rec is not None:
+            rec.row()
+
+def _best(fn, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Decode throughput of market WS kline messages: old path vs KlineDecoder backends.")
+    ap.add_argument('--input', default=None, help='Recorded raw messages, one per line (default: synthetic)')
+    ap.add_argument('--symbols', type=int, default=200)
+    ap.add_argument('--bars', type=int, default=20)
+    ap.add_argument('--updates-per-bar', type=int, default=10, help='Synthetic: WS updates per bar (last one closes it)')
+    ap.add_argument('--repeat', type=int, default=5)
+    args = ap.parse_args(argv)
+
+    if args.input:
+        with open(args.input, 'r', encoding='utf-8') as f:
+            msgs = [line.rstrip('\n') for line in f if line.strip()]
+    else:
+        msgs = synth_messages(args.symbols, args.bars, args.updates_per_bar)
+    cases = [('baseline json+dict', lambda: _baseline(msgs))]
+    backends = ['json'] + (['orjson'] if json_backend()[0] == 'orjson' else [])
+    for b in backends:
+        for closed_only in (False, True):
+            dec = KlineDecoder(closed_only=closed_only, backend=b)
+            cases.append((f"{b}{' closed_only' if closed_only else ''}", lambda dec=dec: _decode(dec, msgs)))
+
+    print(f"{len(msgs)} messages")
+    print(f"{'decoder':>22} {'msgs/s':>12} {'us/msg':>8} {'speedup':>8}")
+    base = None
+    for name, fn in cases:
+        t = _best(fn, args.repeat)
+        base = base or t
+        print(f"{name:>22} {len(msgs) / t:12,.0f} {t / len(msgs) * 1e6:8.2f} {base / t:7.1f}x")
+
+if __name__ == '__main__':
+    main()
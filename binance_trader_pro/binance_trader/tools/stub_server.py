@@ -0,0 +1,231 @@
+from __future__ import annotations
+import asyncio, json, threading, time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from urllib.parse import urlparse, parse_qsl, parse_qs
+
+Route = Callable[[str, Dict[str, str]], Any]
+
+class Reply:
+    """A route result with a status code and headers other than 200 / none."""
+    def __init__(self, body: Any = None, status: int = 200, headers: Optional[Dict[str, str]] = None):
+        self.body = {} if body is None else body
+        self.status = status
+        self.headers = headers or {}
+
+DROP = object()  # route result: close the connection without answering (a dropped socket)
+
+class StubRestServer:
+    """Local HTTP/1.1 keep-alive server for benchmarks: answers every request with JSON from `route(path, params)`.
+    A route may return a Reply (status / headers) or DROP; params hold the query string and a form body.
+    `calls` records (method, path, request headers) of every request.
+    Usage: with StubRestServer() as srv: client = BinanceUMClient(BinanceConfig('k', 's', srv.url))
+    """
+    def __init__(self, route: Optional[Route] = None, host: str = '127.0.0.1', port: int = 0):
+        self.route = route or (lambda path, params: {})
+        self.requests = 0
+        self.connections = 0
+        self.calls: List[tuple] = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def setup(self):
+                super().setup()
+                stub.connections += 1
+
+            def _reply(self):
+                u = urlparse(self.path)
+                n = int(self.headers.get('Content-Length') or 0)
+                params = dict(parse_qsl(u.query))
+                if n:
+                    params.update(parse_qsl(self.rfile.read(n).decode()))
+                stub.requests += 1
+                stub.calls.append((self.command, u.path, dict(self.headers)))
+                res = stub.route(u.path, params)
+                if res is DROP:
+                    self.close_connection = True
+                    return
+                status, headers = 200, {}
+                if isinstance(res, Reply):
+                    res, status, headers = res.body, res.status, res.headers
+                body = json.dumps(res).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                for k, v in headers.items():
+                    self.send_header(k, str(v))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = do_PUT = do_DELETE = _reply
+
+        self._srv = ThreadingHTTPServer((host, port), Handler)
+        self._srv.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._srv.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubRestServer":
+        self._thread = threading.Thread(target=self._srv.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._srv.shutdown()
+        self._srv.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def kline_message(stream: str, open_time: int, price: float, closed: bool, event_time: int, interval_ms: int = 60_000) -> str:
+    """Combined-stream kline message in Binance's compact JSON layout."""
+    sym = stream.split('@', 1)[0].upper()
+    p = f"{price:.4f}"
+    return (f'{{"stream":"{stream}","data":{{"e":"kline","E":{event_time},"s":"{sym}","k":{{"t":{open_time},'
+            f'"T":{open_time + interval_ms - 1},"s":"{sym}","i":"1m","f":1,"L":2,"o":"{p}","c":"{p}","h":"{p}",'
+            f'"l":"{p}","v":"1.000","n":1,"x":{"true" if closed else "false"},"q":"1.0","V":"0.5","Q":"0.5","B":"0"}}}}}}')
+
+class StubWSServer:
+    """Local market-stream WebSocket server for tests and benchmarks, run on its own thread / event loop.
+    Each connection to /stream?streams=a@kline_1m/b@kline_1m gets synthetic kline messages for its
+    streams, round-robin, at `rate` messages/s (0 = as fast as possible); every `updates_per_bar`-th
+    update of a stream closes its bar. `messages` (recorded raw messages) replaces the synthetic ones.
+    A connection is closed after `max_messages` (None = never), which exercises client reconnects.
+    Usage: with StubWSServer(rate=50_000) as srv: settings['wss_market_testnet'] = srv.url
+    """
+    def __init__(self, rate: float = 0.0, updates_per_bar: int = 10, max_messages: Optional[int] = None,
+                 messages: Optional[Sequence[str]] = None, host: str = '127.0.0.1', port: int = 0):
+        self.rate = float(rate)
+        self.updates_per_bar = max(1, int(updates_per_bar))
+        self.max_messages = max_messages
+        self.messages = list(messages) if messages is not None else None
+        self.host, self.port = host, port
+        self.connections = 0
+        self.sent = 0
+        self.paths: List[str] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._stop: Optional[asyncio.Event] = None
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    def _synthetic(self, streams: List[str]):
+        t0 = 1_700_000_000_000
+        u, bar = 0, 0
+        while True:
+            closed = u == self.updates_per_bar - 1
+            for i, st in enumerate(streams):
+                yield kline_message(st, t0 + bar * 60_000, 100.0 + i + 0.01 * u, closed, int(time.time() * 1000))
+            u += 1
+            if closed:
+                u, bar = 0, bar + 1
+
+    async def _handle(self, ws, path: Optional[str] = None):
+        req = getattr(ws, 'request', None)
+        path = req.path if req is not None else (path or getattr(ws, 'path', ''))
+        self.connections += 1
+        self.paths.append(path)
+        streams = parse_qs(urlparse(path).query).get('streams', [''])[0].split('/')
+        source = iter(self.messages) if self.messages is not None else self._synthetic(streams)
+        batch = 64
+        n = 0
+        t_start = time.perf_counter()
+        try:
+            for msg in source:
+                await ws.send(msg)
+                n += 1
+                self.sent += 1
+                if self.max_messages is not None and n >= self.max_messages:
+                    break
+                if n % batch == 0:
+                    if self.rate > 0:
+                        ahead = n / self.rate - (time.perf_counter() - t_start)
+                        await asyncio.sleep(max(0.0, ahead))
+                    else:
+                        await asyncio.sleep(0)
+            else:
+                await self._stop.wait()  # recorded messages exhausted: keep the connection open
+        except Exception:
+            pass  # client went away
+
+    async def _serve(self):
+        import websockets
+        self._stop = asyncio.Event()
+        async with websockets.serve(self._handle, self.host, self.port, max_size=None) as server:
+            self.port = next(iter(server.sockets)).getsockname()[1]
+            self._ready.set()
+            await self._stop.wait()
+
+    def start(self) -> "StubWSServer":
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_until_complete, args=(self._serve(),), daemon=True)
+        self._thread.start()
+        self._ready.wait(5)
+        return self
+
+    def stop(self):
+        if self._loop is not None and self._stop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+            self._thread.join(5)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+class StubOrderWSServer(StubWSServer):
+    """Local WebSocket trading-API (ws-fapi) server: answers each request with a FILLED order carrying
+    the same id, after `delay_ms`. Requests on one connection are handled concurrently (pipelining).
+    A connection is closed after `max_requests` (None = never) to exercise gateway reconnects.
+    Usage: with StubOrderWSServer() as srv: gw = BinanceWSOrderGateway(settings, 'k', 's', url=srv.url)
+    """
+    def __init__(self, delay_ms: float = 0.0, max_requests: Optional[int] = None, host: str = '127.0.0.1', port: int = 0):
+        super().__init__(host=host, port=port)
+        self.delay_ms = float(delay_ms)
+        self.max_requests = max_requests
+        self.requests = 0
+
+    async def _answer(self, ws, req: Dict[str, Any]):
+        if self.delay_ms:
+            await asyncio.sleep(self.delay_ms / 1000.0)
+        p = req.get('params', {})
+        res = {'orderId': self.requests, 'symbol': p.get('symbol'), 'side': p.get('side'), 'type': p.get('type'),
+               'status': 'FILLED', 'executedQty': str(p.get('quantity'))}
+        try:
+            await ws.send(json.dumps({'id': req.get('id'), 'status': 200, 'result': res}))
+        except Exception:
+            pass  # connection closed (max_requests) before the answer: the client sees it as lost
+
+    async def _handle(self, ws, path: Optional[str] = None):
+        self.connections += 1
+        n = 0
+        tasks = set()
+        try:
+            async for msg in ws:
+                self.requests += 1
+                n += 1
+                t = asyncio.ensure_future(self._answer(ws, json.loads(msg)))
+                tasks.add(t)
+                t.add_done_callback(tasks.discard)
+                if self.max_requests is not None and n >= self.max_requests:
+                    await ws.close()
+                    break
+        except Exception:
+            pass  # client went away
@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+
+from binance_trader.portfolio.account import AccountCache
+
+
+def rest_snapshot(usdt: float, bnb_usd: float = 0.0, positions=()):
+    """GET /fapi/v2/account in multi-assets mode: totalWalletBalance includes the BNB margin."""
+    return {'totalWalletBalance': str(usdt + bnb_usd),
+            'assets': [{'asset': 'USDT', 'walletBalance': str(usdt)}, {'asset': 'BNB', 'walletBalance': '1.5'}],
+            'positions': [{'symbol': s, 'positionAmt': str(a), 'entryPrice': str(e), 'unrealizedProfit': str(u)}
+                          for s, a, e, u in positions]}
+
+
+def account_update(t: int, usdt: float, positions=()):
+    return {'e': 'ACCOUNT_UPDATE', 'E': t,
+            'a': {'m': 'ORDER', 'B': [{'a': 'USDT', 'wb': str(usdt), 'cw': str(usdt)}, {'a': 'BNB', 'wb': '1.5'}],
+                  'P': [{'s': s, 'pa': str(a), 'ep': str(e), 'up': str(u), 'ps': 'BOTH'} for s, a, e, u in positions]}}
+
+
+class FakeClient:
+    def __init__(self, acct):
+        self.acct = acct
+
+    async def account(self):
+        return self.acct
+
+
+def test_rest_and_events_use_the_same_balance():
+    acc = AccountCache('USDT')
+    acc.apply_rest(rest_snapshot(1000.0, bnb_usd=900.0, positions=[('BTCUSDT', 0.01, 60000.0, 5.0)]))
+    assert acc.ready and acc.balance == 1000.0
+    assert acc.equity == pytest.approx(1005.0)
+
+    assert acc.apply_event(account_update(1, 998.0, [('BTCUSDT', 0.02, 60010.0, 7.0)]))
+    assert acc.balance == 998.0 and acc.position('BTCUSDT') == 0.02
+    assert acc.equity == pytest.approx(1005.0)
+
+    # the REST view of the same state reconciles without drift
+    assert asyncio.run(acc.reconcile(FakeClient(rest_snapshot(998.0, 900.0, [('BTCUSDT', 0.02, 60010.0, 7.0)]))))
+    assert acc.last_drift == 0.0 and acc.balance == 998.0
+
+
+def test_other_asset_and_stale_events_are_ignored():
+    acc = AccountCache('USDT')
+    acc.apply_rest(rest_snapshot(500.0))
+    assert acc.apply_event(account_update(10, 490.0))
+    assert not acc.apply_event(account_update(5, 1.0))
+    assert not acc.apply_event({'e': 'ORDER_TRADE_UPDATE', 'E': 11})
+    assert acc.balance == 490.0 and acc.events == 1
+
+
+def test_missing_asset_gives_zero_balance():
+    acc = AccountCache('USDC')
+    acc.apply_rest(rest_snapshot(500.0))
+    assert acc.ready and acc.balance == 0.0
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from binance_trader.backtest.engine import backtest_symmetric
+
+
+def reference_pnl(close: np.ndarray, signal: np.ndarray, fee: float, slippage_bps: float) -> np.ndarray:
+    """The original per-bar loop, with each bar's fees charged on that bar (one PnL entry per bar)."""
+    ret = pd.Series(close).pct_change().fillna(0.0).to_numpy()
+    slip = slippage_bps * 1e-4
+    pos, out = 0, []
+    for i in range(len(close)):
+        sig = signal[i] if i < len(signal) else 0
+        cost = 0.0
+        if sig != 0:
+            if pos != 0:
+                cost += fee
+            pos = 1 if sig > 0 else -1
+            cost += fee + slip
+        out.append(pos * ret[i] - cost)
+    return np.array(out)
+
+
+@pytest.mark.parametrize('fee,slippage_bps', [(0.0004, 1.0), (0.0, 0.0), (0.001, 5.0)])
+def test_matches_reference_loop(fee, slippage_bps):
+    rng = np.random.default_rng(7)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, 5000)))
+    signal = rng.choice([-1, 0, 0, 0, 0, 1], size=len(close))
+    df = pd.DataFrame({'close': close})
+
+    eq, pnl, stats = backtest_symmetric(df, pd.Series(signal), fee=fee, slippage_bps=slippage_bps)
+
+    ref = reference_pnl(close, signal, fee, slippage_bps)
+    assert len(pnl) == len(df) and pnl.index.equals(df.index)
+    np.testing.assert_allclose(pnl.to_numpy(), ref, rtol=0, atol=1e-15)
+    np.testing.assert_allclose(eq.to_numpy(), np.cumprod(1 + ref), rtol=1e-12)
+    assert stats['Trades'] == int((signal != 0).sum())
+    assert stats['Return%'] == pytest.approx((np.prod(1 + ref) - 1) * 100, rel=1e-9)
+
+
+def test_short_signal_is_padded_with_no_change():
+    close = np.array([100.0, 101.0, 99.0, 102.0, 103.0])
+    signal = np.array([1, 0, -1])
+    eq, pnl, _ = backtest_symmetric(pd.DataFrame({'close': close}), pd.Series(signal))
+    np.testing.assert_allclose(pnl.to_numpy(), reference_pnl(close, signal, 0.0004, 1.0), atol=1e-15)
+
+
+def test_empty_input():
+    eq, pnl, stats = backtest_symmetric(pd.DataFrame({'close': np.array([], dtype=float)}), pd.Series([], dtype=float))
+    assert len(eq) == 0 and len(pnl) == 0
+    assert stats['Trades'] == 0 and stats['Return%'] == 0.0
+
+
+def test_single_row():
+    eq, pnl, stats = backtest_symmetric(pd.DataFrame({'close': [100.0]}), pd.Series([1]), fee=0.0004, slippage_bps=1.0)
+    assert pnl.tolist() == pytest.approx([-0.0005])
+    assert eq.tolist() == pytest.approx([0.9995])
+    assert stats['Trades'] == 1
@@ -0,0 +1,78 @@
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from binance_trader.backtest.chunked import ChunkedBacktest, backtest_chunked
+from binance_trader.backtest.engine import backtest_symmetric
+from binance_trader.core.types import KLINE_COLUMNS
+from binance_trader.data.store import KlineStore
+from binance_trader.strategy.base import Strategy
+from binance_trader.strategy.sma_cross import SmaCross
+
+PARAMS = {'fast': 5, 'slow': 20}
+
+
+class BatchSmaCross(Strategy):
+    """SmaCross through generate_signals only (exercises the warm-up tail path)."""
+    def generate_signals(self, df):
+        return SmaCross(self.params).generate_signals(df)
+
+
+def klines(n: int, seed: int = 5, t0: int = 1_700_000_000_000) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    # unrounded: no exact SMA ties, which a tail-window recomputation may round the other way
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+    t = t0 + 60_000 * np.arange(n, dtype=np.int64)
+    return pd.DataFrame({'open_time': t, 'open': close, 'high': close, 'low': close, 'close': close,
+                         'volume': 1.0, 'close_time': t + 59_999}, columns=list(KLINE_COLUMNS))
+
+
+def split(df: pd.DataFrame, sizes):
+    lo = 0
+    for size in sizes:
+        yield df.iloc[lo:lo + size].reset_index(drop=True)
+        lo += size
+    if lo < len(df):
+        yield df.iloc[lo:].reset_index(drop=True)
+
+
+@pytest.mark.parametrize('strategy_cls', [SmaCross, BatchSmaCross])
+@pytest.mark.parametrize('sizes', [[5000], [1] * 50 + [7] * 30 + [13], [997] * 5, [0, 20, 0, 3]], ids=['one', 'small', 'even', 'empty'])
+def test_chunked_equals_in_memory(strategy_cls, sizes):
+    df = klines(5000)
+    eq_ref, pnl_ref, ref = backtest_symmetric(df, SmaCross(PARAMS).generate_signals(df), fee=0.0004, slippage_bps=1.0)
+
+    bt = ChunkedBacktest(strategy_cls(dict(PARAMS)), fee=0.0004, slippage_bps=1.0)
+    parts = [bt.update(c) for c in split(df, sizes)]
+    eq = np.concatenate([e for e, _ in parts])
+    pnl = np.concatenate([p for _, p in parts])
+
+    np.testing.assert_array_equal(pnl, pnl_ref.to_numpy())
+    np.testing.assert_allclose(eq, eq_ref.to_numpy(), rtol=1e-12)
+    got = bt.stats()
+    assert got['Trades'] == ref['Trades'] > 0
+    for k in ('Return%', 'MaxDD%', 'CAGR%', 'Sharpe'):
+        assert got[k] == pytest.approx(ref[k], rel=1e-9), k
+
+
+def test_store_chunks_keep_memory_bounded(tmp_path):
+    store = KlineStore(str(tmp_path))
+    n = 120_000
+    store.append('AAA', '1m', klines(n))
+    t = store.columns('AAA', '1m')['open_time']
+
+    def peak(bars: int) -> int:
+        chunks = store.iter_frames('AAA', '1m', int(t[0]), int(t[bars - 1]) + 1, rows=5_000)
+        tracemalloc.start()
+        stats = backtest_chunked(chunks, SmaCross(dict(PARAMS)))
+        _, top = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        assert stats['Trades'] > 0
+        return top
+
+    short, long = peak(n // 4), peak(n)
+    frame_bytes = n * len(KLINE_COLUMNS) * 8
+    assert long < 1.5 * short
+    assert long < frame_bytes / 4
@@ -0,0 +1,158 @@
+import asyncio
+import random
+
+import pytest
+
+from binance_trader.exchange.ws_decode import KlineRecord
+from binance_trader.runner.dispatch import SymbolDispatcher
+
+T0 = 1_700_000_000_000
+
+
+def rec(symbol: str, bar: int, close: float, closed: bool = False) -> KlineRecord:
+    t = T0 + 60_000 * bar
+    return KlineRecord(symbol, t + 1, t, close, close, close, close, 1.0, t + 59_999, closed)
+
+
+class Recorder:
+    """process() stub: logs every record, yields a random number of times, checks one worker per symbol."""
+    def __init__(self, seed: int = 0, fail=()):
+        self.seen = []
+        self.active = set()
+        self.fail = set(fail)
+        self.rng = random.Random(seed)
+
+    async def __call__(self, r: KlineRecord):
+        assert r.symbol not in self.active, 'two workers on one symbol'
+        self.active.add(r.symbol)
+        try:
+            for _ in range(self.rng.randrange(4)):
+                await asyncio.sleep(0)
+            self.seen.append(r)
+            if (r.symbol, r.close) in self.fail:
+                raise RuntimeError('boom')
+        finally:
+            self.active.discard(r.symbol)
+
+    def of(self, symbol: str):
+        return [(r.open_time, r.close, r.closed) for r in self.seen if r.symbol == symbol]
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_burst_of_updates_collapses_to_the_latest():
+    proc = Recorder()
+
+    async def main():
+        d = SymbolDispatcher(proc, workers=2)
+        d.start()
+        for i in range(10):
+            d.submit(rec('BTCUSDT', 0, 100.0 + i))
+        assert d.backlog == 1
+        await d.drain()
+        await d.stop()
+        return d
+
+    d = run(main())
+    assert proc.of('BTCUSDT') == [(T0, 109.0, False)]
+    assert (d.submitted, d.processed, d.conflated, d.backlog) == (10, 1, 9, 0)
+
+
+def test_closed_bars_are_never_conflated():
+    proc = Recorder()
+
+    async def main():
+        d = SymbolDispatcher(proc, workers=1)
+        d.start()
+        for bar in range(5):
+            for i in range(3):
+                d.submit(rec('ETHUSDT', bar, 10.0 * bar + i))
+            d.submit(rec('ETHUSDT', bar, 10.0 * bar + 9, closed=True))
+        d.submit(rec('ETHUSDT', 5, 50.0))  # next bar's first update survives the previous close
+        await d.drain()
+        await d.stop()
+        return d
+
+    d = run(main())
+    got = proc.of('ETHUSDT')
+    assert [g for g in got if g[2]] == [(T0 + 60_000 * b, 10.0 * b + 9, True) for b in range(5)]
+    assert got == [(T0 + 60_000 * b, 10.0 * b + 9, True) for b in range(5)] + [(T0 + 300_000, 50.0, False)]
+    assert d.processed + d.conflated == d.submitted
+    assert d.latency.snapshot()['count'] == 5
+
+
+def test_per_symbol_order_holds_across_workers():
+    proc = Recorder(seed=7, fail={('S3USDT', 4.0)})
+    symbols = [f"S{i}USDT" for i in range(8)]
+
+    async def main():
+        d = SymbolDispatcher(proc, workers=4)
+        d.start()
+        rng = random.Random(1)
+        for bar in range(40):
+            for s in rng.sample(symbols, len(symbols)):
+                if rng.random() < 0.5:
+                    d.submit(rec(s, bar, bar + 0.5))
+                d.submit(rec(s, bar, float(bar), closed=True))
+            if bar % 3 == 0:
+                await asyncio.sleep(0)
+        await d.drain()
+        await d.stop()
+        return d
+
+    d = run(main())
+    for s in symbols:
+        got = proc.of(s)
+        assert [g[0] for g in got] == sorted(g[0] for g in got)
+        assert [g[1] for g in got if g[2]] == [float(b) for b in range(40)]
+    assert d.errors == 1  # a failing record is logged and counted, the symbol keeps going
+    assert d.processed + d.conflated == d.submitted and d.backlog == 0
+    assert d.stats()['max_backlog'] >= len(symbols)
+
+
+def test_drain_waits_for_slow_processing():
+    done = []
+
+    async def slow(r):
+        await asyncio.sleep(0.01)
+        done.append(r.close)
+
+    async def main():
+        d = SymbolDispatcher(slow, workers=2)
+        d.start()
+        for i in range(3):
+            d.submit(rec('A', i, float(i), closed=True))
+            d.submit(rec('B', i, float(i), closed=True))
+        await d.drain()
+        assert len(done) == 6 and d.backlog == 0 and not d._scheduled
+        await d.drain()  # nothing pending: returns at once
+        await d.stop()
+
+    run(main())
+
+
+def test_stop_keeps_unprocessed_records_for_a_restart():
+    proc = Recorder()
+
+    async def main():
+        d = SymbolDispatcher(proc, workers=2)
+        with pytest.raises(RuntimeError, match='start'):
+            d.submit(rec('A', 0, 1.0, closed=True))
+            await d.drain()
+        await d.stop()  # never started: no-op
+        d.start()
+        await d.drain()
+        d.submit(rec('A', 1, 2.0, closed=True))
+        d.submit(rec('A', 2, 3.0, closed=True))
+        await d.stop()
+        assert not d._tasks and d.backlog == 2
+        with pytest.raises(RuntimeError):
+            await d.drain()
+        d.start()
+        await d.drain()
+        await d.stop()
+
+    run(main())
+    assert [g[1] for g in proc.of('A')] == [1.0, 2.0, 3.0]
@@ -0,0 +1,198 @@
+import asyncio
+import hashlib
+import hmac
+import json
+import threading
+from urllib.parse import urlencode
+
+import pytest
+import requests
+
+from binance_trader.exchange.binance_http import BinanceConfig, BinanceUMClient, order_params
+from binance_trader.exchange.binance_http_async import AsyncBinanceUMClient
+from binance_trader.exchange.rate_limit import RateGovernor
+from binance_trader.tools.stub_server import DROP, Reply, StubRestServer
+
+KEY, SECRET = 'test-key', 'test-secret'
+
+
+class Script:
+    """Route answering each path from a list of scripted results (the last one repeats), default {}."""
+    def __init__(self, **paths):
+        self.paths = {'/fapi/v1/' + k: list(v) for k, v in paths.items()}
+        self.params = []
+
+    def __call__(self, path, params):
+        self.params.append(params)
+        todo = self.paths.get(path)
+        if not todo:
+            return {'path': path}
+        return todo.pop(0) if len(todo) > 1 else todo[0]
+
+
+def signature_ok(params: dict) -> bool:
+    query = {k: v for k, v in params.items() if k != 'signature'}
+    want = hmac.new(SECRET.encode(), urlencode(query).encode(), hashlib.sha256).hexdigest()
+    return 'timestamp' in query and hmac.compare_digest(params.get('signature', ''), want)
+
+
+def client(srv, **kw) -> BinanceUMClient:
+    return BinanceUMClient(BinanceConfig(KEY, SECRET, srv.url), governor=RateGovernor.unlimited(), **kw)
+
+
+# ---- sync client (requests + urllib3 Retry) ----
+
+def test_session_reuses_one_connection():
+    with StubRestServer() as srv:
+        c = client(srv)
+        for _ in range(20):
+            c.time()
+        assert srv.requests == 20 and srv.connections == 1
+        c.close()
+
+
+def test_pool_keeps_one_connection_per_thread():
+    with StubRestServer() as srv:
+        c = client(srv, pool_size=8)
+        threads = [threading.Thread(target=lambda: [c.ping() for _ in range(25)]) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert srv.requests == 200 and srv.connections <= 8
+        c.close()
+
+
+@pytest.mark.parametrize('method,call', [('GET', lambda c: c.time()),
+                                         ('PUT', lambda c: c.keepalive_listen_key('lk')),
+                                         ('DELETE', lambda c: c.cancel_order('BTCUSDT', orderId=1))])
+def test_idempotent_requests_are_retried(method, call):
+    fail = Reply({'code': -1001, 'msg': 'Internal error'}, 503)
+    route = Script(time=[fail, fail, {'serverTime': 1}], listenKey=[fail, fail, {}], order=[fail, fail, {'orderId': 1}])
+    with StubRestServer(route) as srv:
+        c = client(srv, backoff=0.0)
+        call(c)
+        assert srv.requests == 3 and {m for m, _, _ in srv.calls} == {method}
+
+
+def test_retries_run_out_with_the_last_error():
+    route = Script(time=[Reply({'code': -1001, 'msg': 'Internal error'}, 502)])
+    with StubRestServer(route) as srv:
+        with pytest.raises(RuntimeError, match='HTTP 502.*-1001'):
+            client(srv, retries=2, backoff=0.0).time()
+        assert srv.requests == 3
+
+
+def test_dropped_get_is_retried():
+    with StubRestServer(Script(time=[DROP, {'serverTime': 1}])) as srv:
+        assert client(srv, backoff=0.0).time() == {'serverTime': 1}
+        assert srv.requests == 2
+
+
+@pytest.mark.parametrize('result', [Reply({'code': -1001, 'msg': 'Internal error'}, 503), DROP], ids=['503', 'drop'])
+def test_orders_are_never_retried(result):
+    with StubRestServer(Script(order=[result, {'orderId': 1}])) as srv:
+        with pytest.raises((RuntimeError, requests.ConnectionError)):
+            client(srv, backoff=0.0).new_order('BTCUSDT', 'BUY', 'MARKET', 0.01)
+        assert srv.requests == 1
+
+
+def test_signed_requests_and_error_mapping():
+    rejected = Reply({'code': -2019, 'msg': 'Margin is insufficient.'}, 400)
+    route = Script(order=[rejected])
+    with StubRestServer(route) as srv:
+        c = client(srv)
+        assert c.account() == {'path': '/fapi/v2/account'}
+        orders = [order_params('BTCUSDT', 'BUY', 'LIMIT', 0.01, 50000.5, timeInForce='GTC', client_id='a b/+'),
+                  order_params('ETHUSDT', 'SELL', 'MARKET', 1, reduceOnly=True)]
+        c.batch_orders(orders)
+        with pytest.raises(RuntimeError, match='HTTP 400.*-2019'):
+            c.new_order('BTCUSDT', 'BUY', 'MARKET', 0.01)
+        assert c.ping() == {'path': '/fapi/v1/ping'}
+    signed = route.params[:3]
+    assert all(map(signature_ok, signed)) and 'signature' not in route.params[3]
+    assert [o['newClientOrderId'] for o in json.loads(signed[1]['batchOrders']) if 'newClientOrderId' in o] == ['a b/+']
+    assert all(h['X-MBX-APIKEY'] == KEY for _, _, h in srv.calls)
+
+
+def test_latency_is_recorded_per_endpoint():
+    with StubRestServer(Script(order=[Reply({'code': -2019, 'msg': 'no'}, 400)])) as srv:
+        c = client(srv)
+        for _ in range(3):
+            c.time()
+        c.position_info('BTCUSDT')
+        with pytest.raises(RuntimeError):
+            c.new_order('BTCUSDT', 'BUY', 'MARKET', 0.01)
+        snap = c.latency.snapshot()
+    assert {k: v['count'] for k, v in snap.items()} == {'GET /fapi/v1/time': 3, 'GET /fapi/v2/positionRisk': 1,
+                                                         'POST /fapi/v1/order': 1}
+    assert all(v['max_ms'] >= v['p50_ms'] > 0 for v in snap.values())
+
+
+def test_server_usage_headers_reach_the_governor():
+    route = Script(time=[Reply({'serverTime': 1}, headers={'X-MBX-USED-WEIGHT-1M': 700})])
+    with StubRestServer(route) as srv:
+        c = client(srv)
+        c.time()
+        assert c.governor.stats()['weight_1m'] == 700
+
+
+# ---- async client (aiohttp) ----
+
+def run_async(srv, body, **kw):
+    async def main():
+        async with AsyncBinanceUMClient(BinanceConfig(KEY, SECRET, srv.url), governor=RateGovernor.unlimited(),
+                                        **kw) as c:
+            return await body(c)
+    return asyncio.run(main())
+
+
+def test_async_signing_matches_the_server_check():
+    route = Script()
+    with StubRestServer(route) as srv:
+        async def body(c):
+            await c.account()
+            await c.new_order('BTCUSDT', 'SELL', 'LIMIT', 0.001, price=65000.1, timeInForce='GTC', client_id='x:y z')
+            await c.batch_orders([order_params('BTCUSDT', 'BUY', 'MARKET', 0.01, client_id='a&b=c')])
+            return await c.klines('BTCUSDT', '1m', limit=5)
+        assert run_async(srv, body) == {'path': '/fapi/v1/klines'}
+    assert all(map(signature_ok, route.params[:3])) and 'signature' not in route.params[3]
+    assert route.params[1]['newClientOrderId'] == 'x:y z'
+    assert all(h['X-MBX-APIKEY'] == KEY for _, _, h in srv.calls)
+
+
+def test_async_error_mapping():
+    route = Script(order=[Reply({'code': -2019, 'msg': 'Margin is insufficient.'}, 400)],
+                   time=[Reply({'code': -1001, 'msg': 'Internal error'}, 503)])
+    with StubRestServer(route) as srv:
+        async def body(c):
+            errors = []
+            for call in (lambda: c.new_order('BTCUSDT', 'BUY', 'MARKET', 0.01), c.time):
+                with pytest.raises(RuntimeError) as e:
+                    await call()
+                errors.append(str(e.value))
+            return errors
+        order_err, time_err = run_async(srv, body)
+        assert srv.requests == 2  # no retries in the async client
+    assert order_err.startswith('HTTP 400') and '-2019' in order_err
+    assert time_err.startswith('HTTP 503') and '-1001' in time_err
+
+
+def test_async_session_is_pooled_and_latency_recorded():
+    with StubRestServer() as srv:
+        async def body(c):
+            for _ in range(10):
+                await c.time()
+            await asyncio.gather(*(c.ping() for _ in range(4)))
+            return c.latency.snapshot()
+        snap = run_async(srv, body, pool_size=4)
+        assert srv.requests == 14 and srv.connections <= 4
+    assert snap['GET /fapi/v1/time']['count'] == 10 and snap['GET /fapi/v1/ping']['count'] == 4
+
+
+def test_async_from_client_shares_config_and_governor():
+    sync = BinanceUMClient(BinanceConfig(KEY, SECRET, 'http://127.0.0.1:1/'), timeout=3)
+    c = AsyncBinanceUMClient.from_client(sync)
+    assert (c.key, c.secret, c.base, c.timeout) == (KEY, SECRET, 'http://127.0.0.1:1', 3)
+    assert c.governor is sync.governor
+    sync.close()
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from binance_trader.core.types import Bar, KLINE_COLUMNS
+from binance_trader.indicators import streaming
+from binance_trader.strategy.sma_cross import SmaCross
+
+
+def klines(n: int, price: float, tick: float, vol: float = 0.0003, seed: int = 11) -> pd.DataFrame:
+    """1m kline frame with tick-rounded closes: flat runs and exact SMA ties are frequent."""
+    rng = np.random.default_rng(seed)
+    close = np.round(price * np.exp(np.cumsum(rng.normal(0, vol, n))) / tick) * tick
+    t = 1_700_000_000_000 + 60_000 * np.arange(n, dtype=np.int64)
+    return pd.DataFrame({'open_time': t, 'open': close, 'high': close + tick, 'low': close - tick,
+                         'close': close, 'volume': 1.0, 'close_time': t + 59_999}, columns=list(KLINE_COLUMNS))
+
+
+@pytest.fixture(params=[(100.0, 0.01), (60000.0, 0.1)], ids=['alt', 'btc'])
+def df(request):
+    return klines(50_000, *request.param)
+
+
+@pytest.mark.parametrize('window', [1, 5, 60])
+def test_rolling_mean_is_bitwise_pandas(df, window):
+    rm = streaming.RollingMean(window)
+    got = np.array([np.nan if v is None else v for v in map(rm.update, df['close'].tolist())])
+    ref = df['close'].rolling(window, min_periods=window).mean().to_numpy()
+    np.testing.assert_array_equal(got, ref)
+
+
+@pytest.mark.parametrize('fast,slow', [(5, 20), (10, 50), (20, 60), (30, 20)])
+def test_update_matches_generate_signals(df, fast, slow):
+    strat = SmaCross({'fast': fast, 'slow': slow})
+    ref = strat.generate_signals(df).to_numpy()
+    assert (ref != 0).sum() > 100
+    np.testing.assert_array_equal(strat.update_many(df), ref)
+
+    # fed in pieces, as the runner does (prime on history, then one closed bar at a time)
+    strat.reset()
+    head = 1000
+    assert strat.feed(df.iloc[:head]) == ref[head - 1]
+    rows = df.iloc[head:head + 2000]
+    got = [strat.update(b) for b in (Bar(*r) for r in rows.itertuples(index=False))]
+    np.testing.assert_array_equal(got, ref[head:head + 2000])
+
+
+def test_update_short_history_and_reset():
+    df = klines(30, 100.0, 0.01)
+    strat = SmaCross({'fast': 5, 'slow': 60})
+    assert not strat.update_many(df).any()
+    assert strat.feed(df.iloc[:0]) == 0
+    strat.reset()
+    np.testing.assert_array_equal(strat.update_many(df), strat.generate_signals(df).to_numpy())
+
+
+
+def test_live_poll_without_closed_bars_does_not_page_from_epoch(tmp_path, monkeypatch):
+    import argparse
+    from binance_trader import cli
+    from binance_trader.tools.stub_server import StubRestServer
+
+    starts = []
+
+    def route(path, params):
+        if path == '/fapi/v1/klines':
+            starts.append(int(params['startTime']))
+            return []
+        return {}
+
+    class Stop(Exception):
+        pass
+
+    sleeps = []
+
+    def sleep(s):
+        sleeps.append(s)
+        if len(sleeps) > 1:
+            raise Stop
+
+    with StubRestServer(route) as srv:
+        settings = {**cli.load_settings(), 'testnet': False, 'base_url_mainnet': srv.url, 'data_dir': str(tmp_path)}
+        monkeypatch.setattr(cli.time, 'sleep', sleep)
+        with pytest.raises(Stop):
+            cli.cmd_live(argparse.Namespace(symbol='NEWUSDT', interval='1m', fast=5, slow=20, qty='1'), settings)
+    assert len(starts) == 2
+    assert starts[1] == starts[0]  # second poll resumes at the lookback start
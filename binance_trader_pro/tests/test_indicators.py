@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from binance_trader.indicators import batch, streaming
+
+
+def ohlc(n: int, price: float, tick: float, seed: int = 7) -> pd.DataFrame:
+    """Tick-rounded 1m-like bars (flat runs included) at a given price scale."""
+    rng = np.random.default_rng(seed)
+    close = np.round(price * np.exp(np.cumsum(rng.normal(0, 0.0005, n))) / tick) * tick
+    wick = np.round(rng.random((2, n)) * price * 0.001 / tick) * tick
+    return pd.DataFrame({'high': close + wick[0], 'low': close - wick[1], 'close': close})
+
+
+# pandas expressions as written in the freqtrade strategies
+def pd_atr(df, n):
+    tr = np.maximum(df['high'] - df['low'], np.maximum(abs(df['high'] - df['close'].shift(1)),
+                                                       abs(df['low'] - df['close'].shift(1))))
+    return tr.rolling(n).mean()
+
+
+def pd_rsi(df, n):
+    delta = df['close'].diff()
+    gain = delta.clip(lower=0).rolling(n).mean()
+    loss = (-delta.clip(upper=0)).rolling(n).mean().abs()
+    return 100 - (100 / (1 + gain / (loss.replace(0, 1e-9))))
+
+
+def stream(ind, *cols):
+    return np.array([np.nan if v is None else v for v in map(ind.update, *(c.tolist() for c in cols))])
+
+
+@pytest.fixture(scope='module', params=[(100.0, 0.01), (60000.0, 0.1)], ids=['alt', 'btc'])
+def df(request):
+    return ohlc(200_000, *request.param)
+
+
+@pytest.mark.parametrize('n', [1, 14, 50])
+def test_batch_matches_pandas(df, n):
+    h, l, c = (df[k].to_numpy() for k in ('high', 'low', 'close'))
+    np.testing.assert_array_equal(batch.sma(c, n), df['close'].rolling(n).mean().to_numpy())
+    np.testing.assert_array_equal(batch.rolling_max(h, n), df['high'].rolling(n).max().to_numpy())
+    np.testing.assert_array_equal(batch.rolling_min(l, n), df['low'].rolling(n).min().to_numpy())
+    np.testing.assert_array_equal(batch.atr(h, l, c, n), pd_atr(df, n).to_numpy())
+    np.testing.assert_array_equal(batch.rsi(c, n), pd_rsi(df, n).to_numpy())
+
+
+@pytest.mark.parametrize('n', [14, 50])
+def test_streaming_matches_batch(df, n):
+    part = df.iloc[:50_000]
+    h, l, c = (part[k].to_numpy() for k in ('high', 'low', 'close'))
+    np.testing.assert_array_equal(stream(streaming.RollingMean(n), c), batch.sma(c, n))
+    np.testing.assert_array_equal(stream(streaming.RollingMax(n), h), batch.rolling_max(h, n))
+    np.testing.assert_array_equal(stream(streaming.RollingMin(n), l), batch.rolling_min(l, n))
+    np.testing.assert_array_equal(stream(streaming.ATR(n), h, l, c), batch.atr(h, l, c, n))
+    np.testing.assert_array_equal(stream(streaming.RSI(n), c), batch.rsi(c, n))
+
+
+def test_nan_and_short_inputs():
+    x = np.array([1.0, 2.0, np.nan, 4.0, 5.0, 6.0, 7.0])
+    s = pd.Series(x)
+    for fn, ref in ((batch.sma, s.rolling(3).mean()), (batch.rolling_max, s.rolling(3).max()),
+                    (batch.rolling_min, s.rolling(3).min())):
+        np.testing.assert_array_equal(fn(x, 3), ref.to_numpy())
+        assert np.isnan(fn(x[:2], 3)).all()
@@ -0,0 +1,115 @@
+import asyncio
+import re
+
+import numpy as np
+import pytest
+
+from binance_trader.core.instrument import Histogram, Instrumentation, MetricsServer
+
+
+def samples(n: int = 200_000, seed: int = 1) -> np.ndarray:
+    """Latency-like seconds: lognormal around 2ms, spread over ~6 decades."""
+    return np.random.default_rng(seed).lognormal(np.log(2e-3), 2.0, n)
+
+
+def filled(values, sub_bits: int = 7) -> Histogram:
+    h = Histogram(sub_bits)
+    for v in values:
+        h.record(float(v))
+    return h
+
+
+def test_bucket_counts_add_up_to_count():
+    h = filled(np.concatenate([samples(50_000), [-1.0, 0.0, 5e-7]]))
+    assert sum(h._counts) == h.count == 50_003
+    cum = [n for _, n in h.buckets()]
+    assert (np.diff(cum) >= 0).all() and cum[-1] == h.count
+    assert filled([-1.0, 0.0, 5e-7, 1e-6]).buckets()[0] == (1e-6, 3)  # negative and sub-microsecond: bucket 0
+    h.reset()
+    assert h.count == 0 and not any(h._counts) and h.percentile(50) == 0.0
+
+
+@pytest.mark.parametrize('sub_bits', [4, 7])
+def test_percentiles_within_relative_error(sub_bits):
+    x = samples()
+    h = filled(x, sub_bits)
+    ranked = np.sort(x)
+    rel = 2.0 ** -(sub_bits - 1)
+    for q in (1, 10, 50, 90, 99, 99.9, 100):
+        ref = ranked[max(1, int(round(q / 100 * len(x)))) - 1]
+        got = h.percentile(q)
+        assert ref - 1e-6 <= got <= ref * (1 + rel) + 1e-6, q
+    assert h.percentile(100) == h.max == x.max()
+    assert h.total == pytest.approx(x.sum())
+
+
+def test_buckets_are_exact_at_powers_of_two():
+    x = samples(20_000)
+    h = filled(x)
+    us = (x * 1e6).astype(np.int64)
+    for le, n in h.buckets():
+        assert n == (us < round(le * 1e6)).sum()
+
+
+LINE = re.compile(r'^[a-zA-Z_:][a-zA-Z0-9_:]*(\{[a-z_]+="[^"]*"(,[a-z_]+="[^"]*")*\})? \S+$')
+
+
+def parse(text: str):
+    """{(name, labels): value} for the sample lines of a Prometheus text exposition, checking the syntax."""
+    assert text.endswith('\n')
+    out, types = {}, {}
+    for line in text.splitlines():
+        if line.startswith('# TYPE'):
+            _, _, name, kind = line.split()
+            types[name] = kind
+            continue
+        if line.startswith('#'):
+            continue
+        assert LINE.match(line), line
+        key, value = line.rsplit(' ', 1)
+        name, _, labels = key.partition('{')
+        out[name, tuple(re.findall(r'([a-z_]+)="([^"]*)"', labels))] = float(value)
+    return out, types
+
+
+def test_prometheus_histograms_are_cumulative():
+    instr = Instrumentation()
+    for v in samples(10_000):
+        instr.record('signal', float(v))
+    instr.record('order_rtt', 0.05)
+    values, types = parse(instr.prometheus(gauges={'backlog': 3}))
+    name = 'binance_trader_stage_latency_seconds'
+    assert types == {name: 'histogram', 'binance_trader_backlog': 'gauge'}
+    assert values['binance_trader_backlog', ()] == 3
+    for stage, h in instr.hist.items():
+        buckets = [(float(dict(lab)['le']), v) for (n, lab), v in values.items()
+                   if n == name + '_bucket' and dict(lab)['stage'] == stage]
+        les = [le for le, _ in buckets]
+        assert les == sorted(les) and les[-1] == float('inf')
+        counts = [v for _, v in buckets]
+        assert (np.diff(counts) >= 0).all()
+        assert counts[-1] == values[name + '_count', (('stage', stage),)] == h.count
+        assert values[name + '_sum', (('stage', stage),)] == pytest.approx(h.total, abs=1e-9)
+    assert values[name + '_count', (('stage', 'signal'),)] == 10_000
+
+
+def test_metrics_endpoint_serves_the_exposition():
+    import aiohttp
+    instr = Instrumentation()
+    instr.record('queue', 0.001)
+
+    async def main():
+        server = MetricsServer(instr.prometheus, port=0)
+        host, port = await server.start()
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(f"http://{host}:{port}/metrics") as resp:
+                    return resp.status, resp.headers['Content-Type'], await resp.text()
+        finally:
+            await server.close()
+
+    status, ctype, body = asyncio.run(main())
+    assert status == 200 and ctype.startswith('text/plain')
+    assert body == instr.prometheus()
+    values, _ = parse(body)
+    assert values['binance_trader_stage_latency_seconds_count', (('stage', 'queue'),)] == 1
@@ -0,0 +1,113 @@
+import asyncio
+import time
+from collections import Counter
+from urllib.parse import parse_qs, urlparse
+
+from binance_trader.exchange.binance_ws import BinanceMarketWS
+from binance_trader.tools.stub_server import StubWSServer
+
+SYMBOLS = [f"S{i:02d}USDT" for i in range(25)]
+
+
+def market_ws(srv, **kw):
+    settings = {'testnet': True, 'wss_market_testnet': srv.url}
+    return BinanceMarketWS(settings, SYMBOLS, '1m', streams_per_conn=10, stagger_s=0.0, **kw)
+
+
+async def run_until(ws, handler, done, timeout: float = 10.0):
+    """Run ws with handler until done() holds (checked after every record), then cancel it."""
+    stop = asyncio.Event()
+
+    async def wrapped(rec):
+        await handler(rec)
+        if done():
+            stop.set()
+
+    task = asyncio.create_task(ws.run(wrapped, backoff=0.01, max_backoff=0.05))
+    try:
+        await asyncio.wait_for(stop.wait(), timeout)
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+
+def streams_of(path: str):
+    return parse_qs(urlparse(path).query)['streams'][0].split('/')
+
+
+def test_symbols_are_sharded_over_connections():
+    with StubWSServer(updates_per_bar=5) as srv:
+        ws = market_ws(srv)
+        assert [len(sh.symbols) for sh in ws.shards] == [10, 10, 5]
+        seen = Counter()
+
+        async def handler(rec):
+            seen[rec.symbol] += 1
+
+        asyncio.run(run_until(ws, handler, lambda: len(seen) == len(SYMBOLS) and min(seen.values()) >= 20))
+        paths = list(srv.paths)
+        # cancelling run() closes every connection cleanly (the server sees them go away)
+        t0 = time.perf_counter()
+    assert time.perf_counter() - t0 < 2.0
+
+    assert srv.connections == 3
+    by_conn = [streams_of(p) for p in paths]
+    assert sorted(len(s) for s in by_conn) == [5, 10, 10]
+    flat = [s for streams in by_conn for s in streams]
+    assert sorted(flat) == sorted(f"{s.lower()}@kline_1m" for s in SYMBOLS)  # each stream on exactly one socket
+    assert sum(sh.received for sh in ws.shards) >= sum(seen.values())
+    assert all(st['reconnects'] == 0 for st in ws.stats())
+
+
+def test_dropped_connections_reconnect_and_keep_delivering():
+    with StubWSServer(updates_per_bar=2, max_messages=45) as srv:
+        ws = market_ws(srv)
+        closed = Counter()
+
+        async def handler(rec):
+            if rec.closed:
+                closed[rec.symbol] += 1
+
+        # a 10-stream shard gets 45 messages (two bars) per connection, so closes need many connections
+        asyncio.run(run_until(ws, handler, lambda: len(closed) == len(SYMBOLS) and min(closed.values()) >= 6))
+        connections = srv.connections
+
+    stats = ws.stats()
+    assert all(st['reconnects'] >= 1 for st in stats)
+    assert connections >= 3 + sum(st['reconnects'] for st in stats) - len(stats)
+    assert set(closed) == set(SYMBOLS)
+
+
+def test_slow_consumer_backpressures_its_own_shard_only():
+    with StubWSServer(updates_per_bar=5) as srv:
+        ws = market_ws(srv, queue_size=8)
+        slow = set(ws.shards[0].symbols)
+        per_shard = Counter()
+        shard_of = {s.upper(): sh.index for sh in ws.shards for s in sh.symbols}
+
+        async def handler(rec):
+            per_shard[shard_of[rec.symbol]] += 1
+            if rec.symbol.lower() in slow:
+                await asyncio.sleep(0.002)
+
+        asyncio.run(run_until(ws, handler, lambda: per_shard[1] >= 3000 and per_shard[2] >= 3000))
+
+    s0, s1, s2 = ws.stats()
+    assert s0['full_waits'] > 0 and s0['max_depth'] <= 8
+    assert per_shard[0] < per_shard[1] / 2  # the fast shards kept flowing while shard 0 was blocked
+    assert s0['reconnects'] == 0
+
+
+def test_bad_url_reconnects_with_backoff():
+    ws = BinanceMarketWS({'testnet': True, 'wss_market_testnet': 'ws://127.0.0.1:1'}, SYMBOLS[:3], '1m',
+                         stagger_s=0.0)
+
+    async def main():
+        task = asyncio.create_task(ws.run(lambda rec: None, backoff=0.01, max_backoff=0.02))
+        await asyncio.sleep(0.3)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(main())
+    st, = ws.stats()
+    assert not st['connected'] and st['reconnects'] >= 3
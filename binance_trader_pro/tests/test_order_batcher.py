@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from binance_trader.execution.order_batcher import OrderBatcher
+
+
+class SlowClient:
+    """Async client stub: every request takes `delay` seconds; symbols in `reject` are rejected."""
+    def __init__(self, delay: float = 0.01, reject=()):
+        self.delay = delay
+        self.reject = set(reject)
+        self.batches = []
+        self.singles = []
+        self.done = 0
+        self._ids = iter(range(1, 10_000))
+
+    def _answer(self, p):
+        if p['symbol'] in self.reject:
+            return {'code': -2019, 'msg': 'Margin is insufficient.'}
+        return {'orderId': next(self._ids), 'symbol': p['symbol'], 'status': 'FILLED'}
+
+    async def batch_orders(self, orders):
+        self.batches.append([o['symbol'] for o in orders])
+        await asyncio.sleep(self.delay)
+        self.done += 1
+        return [self._answer(o) for o in orders]
+
+    async def new_order(self, symbol, side, type_, qty, **kw):
+        self.singles.append(symbol)
+        await asyncio.sleep(self.delay)
+        self.done += 1
+        return self._answer({'symbol': symbol})
+
+
+def test_orders_in_one_tick_are_batched_and_mapped_back():
+    client = SlowClient(reject={'S3USDT'})
+    batcher = OrderBatcher(client, window_ms=0, max_batch=5)
+
+    async def main():
+        res = await asyncio.gather(*(batcher.new_order(f"S{i}USDT", 'BUY', 'MARKET', 1.0) for i in range(7)),
+                                   return_exceptions=True)
+        await batcher.close()
+        return res
+
+    res = asyncio.run(main())
+    assert sorted(map(len, client.batches)) == [2, 5]
+    assert [r['symbol'] for i, r in enumerate(res) if i != 3] == [f"S{i}USDT" for i in range(7) if i != 3]
+    assert isinstance(res[3], RuntimeError) and '-2019' in str(res[3])
+    assert batcher.stats()['failed'] == 1 and batcher.stats()['in_flight'] == 0
+
+
+def test_lone_order_uses_new_order():
+    client = SlowClient()
+    batcher = OrderBatcher(client, window_ms=5)
+    res = asyncio.run(batcher.new_order('BTCUSDT', 'SELL', 'MARKET', 0.01))
+    assert res['symbol'] == 'BTCUSDT' and client.singles == ['BTCUSDT'] and not client.batches
+
+
+def test_close_waits_for_in_flight_requests():
+    client = SlowClient(delay=0.05)
+    batcher = OrderBatcher(client, window_ms=0)
+
+    async def main():
+        callers = [asyncio.ensure_future(batcher.new_order(f"S{i}USDT", 'BUY', 'MARKET', 1.0)) for i in range(8)]
+        await asyncio.sleep(0.01)  # flushed, requests in flight
+        assert batcher.stats()['in_flight'] == 1 and client.done == 0
+        for c in callers:  # callers going away (shutdown) must not drop the requests already sent
+            c.cancel()
+        await batcher.close()
+        assert client.done == 2 and batcher.stats()['in_flight'] == 0
+
+    asyncio.run(main())
+
+
+def test_close_sends_pending_orders():
+    client = SlowClient()
+    batcher = OrderBatcher(client, window_ms=10_000)
+
+    async def main():
+        caller = asyncio.ensure_future(batcher.new_order('ETHUSDT', 'BUY', 'MARKET', 1.0))
+        await asyncio.sleep(0)
+        assert batcher.stats()['pending'] == 1
+        await batcher.close()
+        return await caller
+
+    assert asyncio.run(main())['symbol'] == 'ETHUSDT'
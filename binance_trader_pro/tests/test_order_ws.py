@@ -0,0 +1,135 @@
+import asyncio
+
+import pytest
+
+from binance_trader.exchange.binance_http import BinanceConfig
+from binance_trader.exchange.binance_http_async import AsyncBinanceUMClient
+from binance_trader.exchange.binance_ws_api import BinanceWSOrderGateway, OrderNotSent
+from binance_trader.exchange.rate_limit import RateGovernor
+from binance_trader.tools.stub_server import StubOrderWSServer, StubRestServer
+
+
+class ReversedOrderWS(StubOrderWSServer):
+    """Answers larger quantities sooner, so responses arrive in the reverse of request order."""
+    async def _answer(self, ws, req):
+        await asyncio.sleep(0.2 / float(req['params']['quantity']))
+        await super()._answer(ws, req)
+
+
+class RestOrders:
+    """REST side of the stub: records order requests and fills them."""
+    def __init__(self):
+        self.orders = []
+
+    def __call__(self, path, params):
+        if path == '/fapi/v1/order':
+            self.orders.append(params)
+            return {'orderId': len(self.orders), 'symbol': params['symbol'], 'status': 'FILLED',
+                    'executedQty': params['quantity']}
+        return {}
+
+
+def run(gw_factory, body, rest=None):
+    """Run body(gateway) with a gateway whose REST fallback is an async client on a stub server."""
+    rest = rest or RestOrders()
+
+    async def main(url):
+        gov = RateGovernor()
+        client = AsyncBinanceUMClient(BinanceConfig('k', 's', url), governor=gov)
+        gw = gw_factory(client, gov)
+        try:
+            return await body(gw), gw, gov
+        finally:
+            await gw.close()
+            await client.close()
+
+    with StubRestServer(rest) as srv:
+        return asyncio.run(main(srv.url))
+
+
+def test_responses_are_matched_by_request_id():
+    with ReversedOrderWS() as ws:
+        async def body(gw):
+            await gw.start()
+            return await asyncio.gather(*(gw.new_order('BTCUSDT', 'BUY', 'MARKET', q) for q in (1, 2, 4, 8)))
+
+        res, gw, gov = run(lambda c, g: BinanceWSOrderGateway({}, 'k', 's', fallback=c, url=ws.url, governor=g), body)
+    assert [r['executedQty'] for r in res] == ['1', '2', '4', '8']
+    assert gw.sent == 4 and gw.fallbacks == 0 and gw.stats()['in_flight'] == 0
+    assert gov.orders_10s.used == 4
+    assert set(gw.latency.snapshot()) == {'order.place'}
+
+
+def test_requests_are_signed():
+    seen = []
+
+    class Recording(StubOrderWSServer):
+        async def _answer(self, ws, req):
+            seen.append(req)
+            await super()._answer(ws, req)
+
+    with Recording() as ws:
+        async def body(gw):
+            await gw.start()
+            return await gw.new_order('ETHUSDT', 'SELL', 'MARKET', 0.5, reduceOnly=True)
+
+        run(lambda c, g: BinanceWSOrderGateway({}, 'key', 'secret', url=ws.url, governor=g), body)
+    p = seen[0]['params']
+    assert seen[0]['method'] == 'order.place'
+    assert p['apiKey'] == 'key' and p['reduceOnly'] == 'true' and len(p['signature']) == 64
+    assert list(p)[:-1] == sorted(k for k in p if k != 'signature')
+
+
+def test_lost_response_times_out_without_fallback():
+    rest = RestOrders()
+    with StubOrderWSServer(delay_ms=1000) as ws:
+        async def body(gw):
+            await gw.start()
+            with pytest.raises(asyncio.TimeoutError):
+                await gw.new_order('BTCUSDT', 'BUY', 'MARKET', 1)
+
+        _, gw, _ = run(lambda c, g: BinanceWSOrderGateway({}, 'k', 's', fallback=c, url=ws.url, timeout=0.1,
+                                                          governor=g), body, rest)
+    assert gw.sent == 1 and gw.fallbacks == 0 and not rest.orders  # may have been placed: not re-sent
+    assert gw.stats()['in_flight'] == 0
+
+
+def test_disconnected_gateway_falls_back_to_rest_and_counts_once():
+    rest = RestOrders()
+
+    async def body(gw):
+        return await gw.new_order('BTCUSDT', 'BUY', 'MARKET', 3)
+
+    res, gw, gov = run(lambda c, g: BinanceWSOrderGateway({}, 'k', 's', fallback=c, url='ws://127.0.0.1:9',
+                                                          governor=g), body, rest)
+    assert res['status'] == 'FILLED' and len(rest.orders) == 1
+    assert gw.fallbacks == 1 and gw.sent == 0
+    assert gov.orders_10s.used == 1 and gov.orders_1m.used == 1
+
+
+def test_failed_send_falls_back_and_refunds_the_ws_charge():
+    rest = RestOrders()
+
+    class BrokenSocket:
+        async def send(self, msg):
+            raise ConnectionResetError("socket closed")
+
+    with StubOrderWSServer() as ws:
+        async def body(gw):
+            await gw.start()
+            gw._ws = BrokenSocket()  # connected as far as the gateway knows; the send itself fails
+            return await gw.new_order('BTCUSDT', 'BUY', 'MARKET', 2)
+
+        res, gw, gov = run(lambda c, g: BinanceWSOrderGateway({}, 'k', 's', fallback=c, url=ws.url, governor=g),
+                           body, rest)
+    assert res['executedQty'] == '2' and len(rest.orders) == 1 and gw.fallbacks == 1
+    assert gov.orders_10s.used == 1 and gov.orders_1m.used == 1
+
+
+def test_without_fallback_order_not_sent_is_raised():
+    async def body(gw):
+        with pytest.raises(OrderNotSent):
+            await gw.new_order('BTCUSDT', 'BUY', 'MARKET', 1)
+
+    _, gw, gov = run(lambda c, g: BinanceWSOrderGateway({}, 'k', 's', url='ws://127.0.0.1:9', governor=g), body)
+    assert gov.orders_10s.used == 0
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from binance_trader.backtest.engine import backtest_symmetric
+from binance_trader.backtest.portfolio import PortfolioBacktest
+from binance_trader.data.store import KlineStore
+from binance_trader.strategy.sma_cross import SmaCross
+
+T0 = 28_333_333 * 60_000  # on the 1m grid
+STEP = 60_000
+
+
+def put(store, symbol, bars, seed):
+    """Store tick-rounded closes at the given bar numbers (gaps where bars are missing)."""
+    rng = np.random.default_rng(seed)
+    c = np.round(100 * np.exp(np.cumsum(rng.normal(0, 0.002, len(bars)))), 2)
+    t = T0 + STEP * np.asarray(bars, dtype=np.int64)
+    store.append(symbol, '1m', pd.DataFrame({'open_time': t, 'open': c, 'high': c, 'low': c, 'close': c,
+                                             'volume': 1.0, 'close_time': t + STEP - 1}))
+    return pd.Series(c, index=t)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return KlineStore(str(tmp_path))
+
+
+@pytest.mark.parametrize('memory_mb', [512, 0.001], ids=['one-chunk', 'chunked'])
+def test_single_symbol_matches_backtest(store, memory_mb):
+    close = put(store, 'AAA', range(3000), 1)
+    bt = PortfolioBacktest(5, 20, risk_per_trade=1.0, max_leverage=1, max_position_notional_pct=1.0,
+                           memory_mb=memory_mb)
+    eq, pnl, stats, per = bt.run(store, ['AAA'], '1m')
+    df = pd.DataFrame({'close': close.to_numpy()})
+    _, pnl_ref, ref = backtest_symmetric(df, SmaCross({'fast': 5, 'slow': 20}).generate_signals(df))
+    assert pnl.index.tolist() == close.index.tolist()
+    np.testing.assert_allclose(pnl.to_numpy(), pnl_ref.to_numpy(), rtol=0, atol=1e-15)
+    assert stats['Trades'] == ref['Trades'] == per['trades'].iat[0]
+
+
+def test_gaps_carry_the_last_close(store):
+    bars = [i for i in range(2000) if not 500 <= i < 530 and i % 97]
+    close = put(store, 'AAA', bars, 2)
+    bt = PortfolioBacktest(5, 20, risk_per_trade=1.0, max_leverage=1, max_position_notional_pct=1.0, memory_mb=0.001)
+    _, pnl, stats, _ = bt.run(store, ['AAA'], '1m')
+    grid = T0 + STEP * np.arange(bars[0], bars[-1] + 1)
+    df = pd.DataFrame({'close': close.reindex(grid).ffill().to_numpy()})
+    _, pnl_ref, ref = backtest_symmetric(df, SmaCross({'fast': 5, 'slow': 20}).generate_signals(df))
+    assert pnl.index.tolist() == grid.tolist()
+    np.testing.assert_allclose(pnl.to_numpy(), pnl_ref.to_numpy(), rtol=0, atol=1e-15)
+    assert stats['Trades'] == ref['Trades']
+
+
+@pytest.mark.parametrize('start,end', [(100, 900), (100.5, 900.25), (99.99, 900.0001), (None, 700.5)])
+def test_range_bounds_off_the_grid(store, start, end):
+    put(store, 'AAA', range(1000), 3)
+    put(store, 'BBB', range(300, 1200), 4)
+    bt = PortfolioBacktest(5, 20, memory_mb=0.001)
+    s_ms = None if start is None else int(T0 + start * STEP)
+    e_ms = int(T0 + end * STEP)
+    eq, pnl, _, per = bt.run(store, ['AAA', 'BBB'], '1m', s_ms, e_ms)
+    lo = 0 if start is None else int(np.ceil(start))
+    expect = T0 + STEP * np.arange(lo, int(np.ceil(end)))
+    assert eq.index.tolist() == pnl.index.tolist() == expect.tolist()  # open_time in [start, end)
+    assert len(per) == 2
+
+
+def test_empty_range(store):
+    put(store, 'AAA', range(100), 5)
+    with pytest.raises(ValueError):
+        PortfolioBacktest(5, 20).run(store, ['AAA'], '1m', T0 + 50 * STEP + 1, T0 + 50 * STEP + 2)
@@ -0,0 +1,120 @@
+import threading
+import time
+
+import pytest
+
+from binance_trader.exchange.rate_limit import RateGovernor
+
+ORDER = ('POST', '/fapi/v1/order')
+CANCEL = ('DELETE', '/fapi/v1/order')            # weight 1, order priority
+ACCOUNT = ('GET', '/fapi/v2/account')            # weight 5
+KLINES = ('GET', '/fapi/v1/klines', {'limit': 1500})  # weight 10, bulk
+
+
+class FakeClock:
+    """Simulated monotonic clock; sleep() advances it instead of blocking."""
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self) -> float:
+        return self.t
+
+    def sleep(self, s: float):
+        self.t += s
+
+
+def governor(clock, **kw):
+    kw.setdefault('safety', 1.0)
+    return RateGovernor(clock=clock, sleep=clock.sleep, **kw)
+
+
+def test_order_count_windows_wait_until_the_oldest_order_expires():
+    clock = FakeClock()
+    gov = governor(clock, order_limit_10s=5, order_limit_1m=8)
+    for _ in range(5):
+        gov.acquire(*ORDER)
+    assert clock.t == 0
+    gov.acquire(*ORDER)           # 10s window full: waits until the first order leaves it
+    assert clock.t == pytest.approx(10.0)
+    gov.acquire(*ORDER)
+    gov.acquire(*ORDER)           # 8 orders in the minute
+    assert clock.t == pytest.approx(10.0)
+    gov.acquire(*ORDER)           # 1m window full: waits for t = 60
+    assert clock.t == pytest.approx(60.0)
+    assert gov.stats()['waits']['order'] == 2
+
+
+def test_weight_window_waits_a_minute():
+    clock = FakeClock()
+    gov = governor(clock, weight_limit=20)
+    for _ in range(4):
+        gov.acquire(*ACCOUNT)
+    clock.t = 30.0
+    gov.acquire(*ACCOUNT)
+    assert clock.t == pytest.approx(60.0)
+    assert gov.stats()['weight_1m'] == 5  # the first four expired together
+
+
+def test_bulk_calls_leave_headroom_for_others():
+    clock = FakeClock()
+    gov = governor(clock, weight_limit=100, bulk_share=0.7)
+    for _ in range(7):
+        gov.acquire(*KLINES)      # 70 = the bulk share
+    assert clock.t == 0
+    gov.acquire(*ACCOUNT)         # other priorities still fit under the full limit
+    gov.acquire(*CANCEL)
+    assert clock.t == 0
+    gov.acquire(*KLINES)          # bulk waits for its share to free up
+    assert clock.t == pytest.approx(60.0)
+
+
+def test_waiting_order_goes_before_bulk():
+    clock = FakeClock()
+    gov = RateGovernor(weight_limit=20, safety=1.0, bulk_share=1.0, clock=clock, sleep=lambda s: time.sleep(0.001))
+    for _ in range(4):
+        gov.acquire(*ACCOUNT)     # weight window full
+    order = threading.Thread(target=gov.acquire, args=CANCEL)
+    order.start()
+    while gov.stats()['waiting'] == 0:
+        time.sleep(0.001)
+    bulk = threading.Thread(target=gov.acquire, args=KLINES)
+    bulk.start()
+    time.sleep(0.05)
+    clock.t = 60.0                # window expires: both fit, the order must be admitted first
+    order.join(5)
+    bulk.join(5)
+    assert [c for _, c in gov.weight._q] == [1, 10]
+
+
+def test_server_reported_usage_is_merged():
+    clock = FakeClock()
+    gov = governor(clock, weight_limit=100, order_limit_10s=5)
+    gov.acquire(*ACCOUNT)
+    gov.observe({'X-MBX-USED-WEIGHT-1M': '95', 'X-MBX-ORDER-COUNT-10S': '5'})
+    assert gov.weight.used == 95 and gov.orders_10s.used == 5
+    gov.observe({'X-MBX-USED-WEIGHT-1M': '10'})  # lower than counted here: nothing is taken back
+    assert gov.weight.used == 95
+    gov.acquire(*ORDER)                          # order count synced to its limit: waits 10s
+    assert clock.t == pytest.approx(10.0)
+    gov.acquire(*KLINES)                         # 95 + 10 > 100 until the synced weight expires
+    assert clock.t == pytest.approx(60.0)
+
+
+@pytest.mark.parametrize('status,headers,blocked', [(429, {'Retry-After': '30'}, 30.0), (418, {}, 60.0)])
+def test_retry_after_blocks_every_call(status, headers, blocked):
+    clock = FakeClock()
+    gov = governor(clock)
+    gov.observe(headers, status)
+    assert gov.stats()['blocked_s'] == pytest.approx(blocked)
+    gov.acquire(*ORDER)
+    assert clock.t == pytest.approx(blocked)
+    assert gov.throttled == 1
+
+
+def test_release_takes_back_an_unsent_call():
+    clock = FakeClock()
+    gov = governor(clock, order_limit_10s=1)
+    gov.acquire(*ORDER)
+    gov.release(*ORDER)
+    gov.acquire(*ORDER)
+    assert clock.t == 0 and gov.orders_10s.used == 1 and gov.orders_1m.used == 1
@@ -0,0 +1,106 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from binance_trader.backtest.replay import ReplayEngine
+from binance_trader.cli import load_settings
+from binance_trader.data.store import KlineStore
+
+T0 = 1_700_000_000_000
+PARAMS = {'fast': 5, 'slow': 20}
+
+
+def symbol(i: int) -> str:
+    return f"S{i}USDT"
+
+
+def make_store(root, n_symbols: int, n_bars: int) -> KlineStore:
+    """Closes at alt and BTC price scales, left unrounded: an exact tie between the two SMAs is resolved by
+    each evaluation path's own rounding, so parity is checked on series without ties."""
+    store = KlineStore(str(root))
+    t = T0 + 60_000 * np.arange(n_bars, dtype=np.int64)
+    for i in range(n_symbols):
+        rng = np.random.default_rng(i)
+        price = 60000.0 if i % 2 else 100.0
+        c = price * np.exp(np.cumsum(rng.normal(0, 0.0005, n_bars)))
+        store.append(symbol(i), '1m', pd.DataFrame({'open_time': t, 'open': c, 'high': c, 'low': c, 'close': c,
+                                                      'volume': 1.0, 'close_time': t + 59_999}))
+    return store
+
+
+def replay(store, n_symbols: int, fixed_qty=None, params=PARAMS, **kw):
+    engine = ReplayEngine(load_settings(), store, [symbol(i) for i in range(n_symbols)], '1m', 'sma_cross',
+                          dict(params), lookback=100, fixed_qty=fixed_qty, **kw)
+    res = asyncio.run(engine.run())
+    fills = [(f['symbol'], f['side'], f['executedQty'], f['avgPrice']) for f in engine.exchange.fills]
+    return fills, res
+
+
+@pytest.fixture(scope='module')
+def store8(tmp_path_factory):
+    return make_store(tmp_path_factory.mktemp('store8'), 8, 3000)
+
+
+@pytest.mark.parametrize('fixed_qty', [1.0, None], ids=['fixed', 'equity'])
+def test_barrier_fills_match_inline(store8, fixed_qty):
+    ref, res_ref = replay(store8, 8, fixed_qty)
+    got, res = replay(store8, 8, fixed_qty, barrier=True)
+    assert len(ref) > 1000
+    assert got == ref
+    assert res.equity == res_ref.equity
+    assert res.metrics == res_ref.metrics
+
+
+@pytest.mark.parametrize('kind', ['thread', 'process'])
+@pytest.mark.parametrize('params', [PARAMS, {'fast': 2, 'slow': 5}], ids=['5-20', '2-5'])
+def test_pool_fills_match_inline(tmp_path, kind, params):
+    store = make_store(tmp_path, 4, 400)
+    ref, res_ref = replay(store, 4, params=params)
+    got, res = replay(store, 4, params=params, eval_pool=kind, eval_pool_workers=2)
+    assert len(ref) > 50
+    assert got == ref
+    assert res.equity == res_ref.equity
+
+
+@pytest.mark.parametrize('closed_only', [True, False])
+def test_events_count_what_reaches_the_dispatcher(tmp_path, closed_only):
+    store = make_store(tmp_path, 2, 300)
+    ref, _ = replay(store, 2, 1.0)
+    got, res = replay(store, 2, 1.0, updates_per_bar=5, closed_only=closed_only)
+    assert got == ref
+    assert res.bars == 600
+    assert res.events == (600 if closed_only else 3000)
+    d = res.dispatch
+    assert d['submitted'] == res.events
+    assert d['processed'] + d['conflated'] == res.events and d['errors'] == 0
+    assert d['event_to_decision']['count'] == 600
+
+
+class FlakyExchange:
+    """Wraps SimulatedExchange.new_order so that every third order is rejected before it fills."""
+    def __init__(self, exchange):
+        self.inner = exchange.new_order
+        self.calls = 0
+        exchange.new_order = self
+
+    async def __call__(self, symbol, side, type_, qty, **kw):
+        self.calls += 1
+        if self.calls % 3 == 0:
+            raise RuntimeError("rejected: -2019 Margin is insufficient.")
+        return await self.inner(symbol, side, type_, qty, **kw)
+
+
+@pytest.mark.parametrize('mode', [{}, {'barrier': True}], ids=['inline', 'barrier'])
+def test_failed_orders_do_not_move_last_signal(tmp_path, mode):
+    store = make_store(tmp_path, 4, 600)
+    engine = ReplayEngine(load_settings(), store, [symbol(i) for i in range(4)], '1m', 'sma_cross', dict(PARAMS),
+                          lookback=100, fixed_qty=1.0, **mode)
+    flaky = FlakyExchange(engine.exchange)
+    asyncio.run(engine.run())
+    assert flaky.calls > 30 and len(engine.exchange.fills) < flaky.calls
+    last_fill = {}
+    for f in engine.exchange.fills:
+        last_fill[f['symbol']] = 1 if f['side'] == 'BUY' else -1
+    assert engine.runner.last_signal == {symbol(i): last_fill.get(symbol(i), 0) for i in range(4)}
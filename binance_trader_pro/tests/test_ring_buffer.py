@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from binance_trader.core.ring_buffer import BarRingBuffer
+from binance_trader.core.types import KLINE_COLUMNS
+
+T0 = 1_700_000_000_000
+
+
+def bar(i: int, close: float = None) -> list:
+    t = T0 + 60_000 * i
+    c = float(i) if close is None else close
+    return [t, c, c + 1, c - 1, c, 1.0, t + 59_999]
+
+
+def assert_contiguous(rb: BarRingBuffer, ref: list):
+    v = rb.view()
+    assert len(rb) == len(v) == len(ref)
+    np.testing.assert_array_equal(v, np.array(ref, dtype=np.float64).reshape(len(ref), len(KLINE_COLUMNS)))
+    assert v.base is rb._buf and v.flags['C_CONTIGUOUS']  # one zero-copy slice, even across the wrap
+    assert (np.diff(v[:, 0]) > 0).all()  # oldest -> newest
+
+
+@pytest.mark.parametrize('n', [0, 1, 4, 5, 6, 9, 10, 23])
+def test_appends_wrap_and_view_stays_ordered(n):
+    rb = BarRingBuffer(5)
+    for i in range(n):
+        rb.append(bar(i))
+    assert_contiguous(rb, [bar(i) for i in range(max(0, n - 5), n)])
+    if n:
+        assert rb.last('close') == n - 1
+        np.testing.assert_array_equal(rb.column('open_time'), [bar(i)[0] for i in range(max(0, n - 5), n)])
+
+
+def test_upsert_updates_the_open_bar_in_place():
+    rb = BarRingBuffer(4)
+    ref = []
+    for i in range(11):
+        assert rb.upsert(bar(i, 100.0)) is True
+        ref.append(bar(i, 100.0))
+        for tick in range(3):  # in-bar updates: same open_time, new prices
+            assert rb.upsert(bar(i, 100.0 + tick)) is False
+            ref[-1] = bar(i, 100.0 + tick)
+            assert_contiguous(rb, ref[-4:])
+    assert rb.upsert(bar(8)) is False  # older than the last bar: ignored
+    assert_contiguous(rb, ref[-4:])
+    assert rb.last('close') == 102.0
+
+
+def test_both_copies_are_written_after_a_wrap():
+    cap = 3
+    rb = BarRingBuffer(cap)
+    for i in range(7):
+        rb.append(bar(i))
+        rb.update_last(bar(i, -float(i)))
+        np.testing.assert_array_equal(rb._buf[:cap][~np.isnan(rb._buf[:cap, 0])],
+                                      rb._buf[cap:][~np.isnan(rb._buf[cap:, 0])])
+        h, length = rb.cursor
+        assert (h, length) == ((i + 1) % cap, min(i + 1, cap))
+    assert_contiguous(rb, [bar(i, -float(i)) for i in range(4, 7)])
+
+
+def test_extend_keeps_the_newest_rows():
+    rb = BarRingBuffer(5)
+    rb.append(bar(0))
+    rb.extend(np.array([bar(i) for i in range(1, 13)]))
+    assert_contiguous(rb, [bar(i) for i in range(8, 13)])
+    frame = rb.frame()
+    assert list(frame.columns) == list(KLINE_COLUMNS) and np.shares_memory(frame.to_numpy(), rb._buf)
+
+
+def test_seek_shares_a_buffer_and_shape_is_checked():
+    writer = BarRingBuffer(4)
+    for i in range(6):
+        writer.append(bar(i))
+    reader = BarRingBuffer(4, buf=writer._buf)
+    assert len(reader) == 0
+    reader.seek(*writer.cursor)
+    assert_contiguous(reader, [bar(i) for i in range(2, 6)])
+    with pytest.raises(ValueError):
+        BarRingBuffer(4, buf=np.zeros((4, len(KLINE_COLUMNS))))
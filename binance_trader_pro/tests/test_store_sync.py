@@ -0,0 +1,239 @@
+import numpy as np
+import pytest
+
+from binance_trader.data.downloader import PAGE_LIMIT, KlineDownloader
+from binance_trader.data.store import KlineStore
+from binance_trader.exchange.binance_http import BinanceConfig, BinanceUMClient
+from binance_trader.exchange.rate_limit import RateGovernor
+from binance_trader.tools.stub_server import DROP, Reply, StubRestServer
+
+STEP = 60_000
+T0 = 1_600_000_020_000 - 1_600_000_020_000 % STEP   # first listed bar
+LISTED = 10_000                                      # bars the fake exchange has
+
+
+class FakeKlines:
+    """GET /fapi/v1/klines over a synthetic 1m history; records every (symbol, startTime, endTime)."""
+    def __init__(self):
+        self.requests = []
+
+    def close(self, t: int) -> float:
+        return 100.0 + (t - T0) // STEP * 0.01
+
+    def __call__(self, path, params):
+        if path != '/fapi/v1/klines':
+            return {}
+        lo, hi = int(params['startTime']), int(params['endTime'])
+        self.requests.append((params['symbol'], lo, hi))
+        t = max(T0, -(-lo // STEP) * STEP)
+        out = []
+        while t <= hi and t < T0 + LISTED * STEP and len(out) < int(params.get('limit', 500)):
+            c = f"{self.close(t):.2f}"
+            out.append([t, c, c, c, c, "1.0", t + STEP - 1, "1.0", 1, "0.5", "0.5", "0"])
+            t += STEP
+        return out
+
+
+@pytest.fixture
+def exchange():
+    fake = FakeKlines()
+    with StubRestServer(fake) as srv:
+        client = BinanceUMClient(BinanceConfig('k', 's', srv.url), governor=RateGovernor.unlimited())
+        yield fake, client
+        client.close()
+
+
+@pytest.fixture
+def store(tmp_path):
+    return KlineStore(str(tmp_path))
+
+
+def bar(i: int) -> int:
+    return T0 + i * STEP
+
+
+def assert_contiguous(store, symbol, lo_bar, hi_bar):
+    """Bars lo_bar..hi_bar-1 are all stored, in order, with the exchange's values."""
+    df = store.frame(symbol, '1m', bar(lo_bar), bar(hi_bar))
+    assert len(df) == hi_bar - lo_bar
+    np.testing.assert_array_equal(df['open_time'].to_numpy(), np.arange(bar(lo_bar), bar(hi_bar), STEP))
+    np.testing.assert_allclose(df['close'].to_numpy(), 100.0 + np.arange(lo_bar, hi_bar) * 0.01)
+
+
+def test_downloader_pages_concurrently_and_stitches_in_order(exchange):
+    fake, client = exchange
+    dl = KlineDownloader.from_client(client, max_workers=4)
+    out = dl.fetch_many(['AAA', 'BBB'], '1m', bar(0), bar(4000) - 1)
+    for s in ('AAA', 'BBB'):
+        df = out[s]
+        assert len(df) == 4000 and df['open_time'].is_monotonic_increasing and df['open_time'].is_unique
+        assert df['open_time'].iat[0] == bar(0) and df['open_time'].iat[-1] == bar(3999)
+    assert len(fake.requests) == 2 * -(-4000 // PAGE_LIMIT)
+    # pages are aligned to the interval grid and never overlap
+    for lo, hi in dl.pages('1m', bar(0) + 5, bar(3000)):
+        assert hi - lo < PAGE_LIMIT * STEP
+
+
+
+class Flaky(FakeKlines):
+    """FakeKlines that answers the first `fail` requests with `failure` (a Reply or DROP)."""
+    def __init__(self, failure, fail: int):
+        super().__init__()
+        self.failure, self.fail = failure, fail
+        self.calls = 0
+
+    def __call__(self, path, params):
+        self.calls += 1
+        return self.failure if self.calls <= self.fail else super().__call__(path, params)
+
+
+def flaky_downloader(failure, fail: int, **kw):
+    fake = Flaky(failure, fail)
+    srv = StubRestServer(fake).start()
+    gov = RateGovernor.unlimited()
+    return fake, srv, gov, KlineDownloader(srv.url, max_workers=1, governor=gov, backoff_s=0.0, **kw)
+
+
+@pytest.mark.parametrize('failure', [Reply({'code': -1003}, 429, {'Retry-After': '0'}), DROP,
+                                     Reply({'code': -1001}, 503)], ids=['429', 'dropped', '503'])
+def test_transient_failures_are_retried(failure):
+    fake, srv, gov, dl = flaky_downloader(failure, 2, max_attempts=3)
+    try:
+        df = dl.fetch('AAA', '1m', bar(0), bar(100) - 1)
+    finally:
+        srv.stop()
+    assert len(df) == 100 and fake.calls == 3
+    assert gov.throttled == (2 if failure is not DROP and failure.status == 429 else 0)
+
+
+def test_persistent_ban_gives_up_with_a_clear_error():
+    fake, srv, gov, dl = flaky_downloader(Reply({'code': -1003}, 418, {'Retry-After': '0'}), 10 ** 9, max_attempts=4)
+    try:
+        with pytest.raises(RuntimeError, match='failed after 4 attempts: HTTP 418'):
+            dl.fetch('AAA', '1m', bar(0), bar(100) - 1)
+    finally:
+        srv.stop()
+    assert fake.calls == 4
+
+
+def test_client_errors_are_not_retried():
+    fake, srv, gov, dl = flaky_downloader(Reply({'code': -1121, 'msg': 'Invalid symbol.'}, 400), 10 ** 9)
+    try:
+        with pytest.raises(RuntimeError, match='HTTP 400'):
+            dl.fetch('AAA', '1m', bar(0), bar(100) - 1)
+    finally:
+        srv.stop()
+    assert fake.calls == 1
+
+
+def test_dropped_page_does_not_abort_the_pool():
+    fake = Flaky(DROP, 1)
+    with StubRestServer(fake) as srv:
+        dl = KlineDownloader(srv.url, max_workers=4, governor=RateGovernor.unlimited(), backoff_s=0.0)
+        df = dl.fetch('AAA', '1m', bar(0), bar(6000) - 1)
+    assert len(df) == 6000 and df['open_time'].is_unique
+
+
+def test_incremental_sync_fetches_only_the_missing_tail(exchange, store):
+    fake, client = exchange
+    assert store.sync(client, 'AAA', '1m', bar(0), bar(500)) == 500
+    n = len(fake.requests)
+    assert store.sync(client, 'AAA', '1m', bar(0), bar(500)) == 0
+    assert len(fake.requests) == n  # fully covered: no request
+    assert store.sync(client, 'AAA', '1m', bar(0), bar(800)) == 300
+    assert [r[1] for r in fake.requests[n:]] == [bar(500)]
+    assert_contiguous(store, 'AAA', 0, 800)
+
+
+def test_sync_past_the_tail_leaves_no_hole(exchange, store):
+    fake, client = exchange
+    store.sync(client, 'AAA', '1m', bar(0), bar(100))
+    store.sync(client, 'AAA', '1m', bar(300), bar(400))  # leaves bars 100..299 unsynced
+    assert store.missing('AAA', '1m', bar(0), bar(400)) == [(bar(100), bar(300) - 1)]
+    assert store.sync(client, 'AAA', '1m', bar(0), bar(400)) == 200
+    assert_contiguous(store, 'AAA', 0, 400)
+    assert store.missing('AAA', '1m', bar(0), bar(400)) == []
+
+
+def test_sync_before_the_head_backfills(exchange, store):
+    fake, client = exchange
+    store.sync(client, 'AAA', '1m', bar(1000), bar(1200))
+    assert store.sync(client, 'AAA', '1m', bar(900), bar(1200)) == 100
+    assert_contiguous(store, 'AAA', 900, 1200)
+
+
+def test_range_without_bars_is_not_refetched(exchange, store):
+    fake, client = exchange
+    assert store.sync(client, 'AAA', '1m', bar(-50), bar(10)) == 10  # symbol listed at bar 0
+    n = len(fake.requests)
+    assert store.sync(client, 'AAA', '1m', bar(-50), bar(10)) == 0
+    assert len(fake.requests) == n
+
+
+def test_sync_many_symbols(exchange, store):
+    fake, client = exchange
+    added = store.sync_many(client, ['AAA', 'BBB', 'CCC'], '1m', bar(0), bar(2000))
+    assert added == {'AAA': 2000, 'BBB': 2000, 'CCC': 2000}
+    for s in added:
+        assert_contiguous(store, s, 0, 2000)
+
+
+def test_legacy_store_without_coverage_reports_holes(exchange, store):
+    """Rows appended without a recorded sync: coverage falls back to the runs of consecutive bars."""
+    fake, client = exchange
+    full = KlineDownloader.from_client(client).fetch('AAA', '1m', bar(0), bar(300) - 1)
+    store.append('AAA', '1m', full[full['open_time'] < bar(100)])
+    store.append('AAA', '1m', full[full['open_time'] >= bar(200)])
+    assert store.missing('AAA', '1m', bar(0), bar(300)) == [(bar(100), bar(200) - 1)]
+    assert store.sync(client, 'AAA', '1m', bar(0), bar(300)) == 100
+    assert_contiguous(store, 'AAA', 0, 300)
+
+
+
+def test_backfill_leaves_mapped_views_intact(exchange, store):
+    fake, client = exchange
+    store.sync(client, 'AAA', '1m', bar(1000), bar(1200))
+    view = store.columns('AAA', '1m')['close']
+    before = np.array(view)
+    assert store.sync(client, 'AAA', '1m', bar(900), bar(1200)) == 100
+    np.testing.assert_array_equal(view, before)  # the old mapping still sees the old, complete series
+    assert_contiguous(store, 'AAA', 900, 1200)
+
+
+def test_rewrite_interrupted_after_commit_is_finished_on_open(exchange, store, monkeypatch):
+    fake, client = exchange
+    store.sync(client, 'AAA', '1m', bar(1000), bar(1200))
+
+    def crash(d):
+        raise OSError("killed before the swap")
+
+    monkeypatch.setattr(KlineStore, '_finish_rewrite', staticmethod(crash))
+    with pytest.raises(OSError):
+        store.sync(client, 'AAA', '1m', bar(900), bar(1200))
+    monkeypatch.undo()
+    reopened = KlineStore(store.root)
+    assert reopened.rows('AAA', '1m') == 300
+    assert_contiguous(reopened, 'AAA', 900, 1200)
+    assert reopened.missing('AAA', '1m', bar(900), bar(1200)) == []
+
+
+def test_rewrite_interrupted_before_commit_keeps_the_old_series(exchange, store, monkeypatch):
+    from binance_trader.data import store as store_mod
+    fake, client = exchange
+    store.sync(client, 'AAA', '1m', bar(1000), bar(1200))
+    write_json = store_mod._write_json
+
+    def crash(path, obj):
+        if path.endswith('meta.json.next'):
+            raise OSError("killed before the commit")
+        write_json(path, obj)
+
+    monkeypatch.setattr(store_mod, '_write_json', crash)
+    with pytest.raises(OSError):
+        store.sync(client, 'AAA', '1m', bar(900), bar(1200))
+    monkeypatch.undo()
+    reopened = KlineStore(store.root)
+    assert reopened.rows('AAA', '1m') == 200
+    assert_contiguous(reopened, 'AAA', 1000, 1200)
+    assert reopened.sync(client, 'AAA', '1m', bar(900), bar(1200)) == 100
+    assert_contiguous(reopened, 'AAA', 900, 1200)
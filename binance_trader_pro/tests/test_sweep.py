@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from binance_trader.backtest.engine import backtest_symmetric
+from binance_trader.backtest.sweep import param_grid, parse_range, run_sweep
+from binance_trader.cli import load_settings
+from binance_trader.strategy.sma_cross import PrefixSum, SmaCross, grid_signals, iter_grid_signals
+
+COMBOS = [(5, 20), (10, 50), (20, 60)]
+
+
+def tick_series(n: int, price: float, tick: float, seed: int = 3):
+    """Tick-rounded random walk: (close as float, close in integer ticks)."""
+    rng = np.random.default_rng(seed)
+    ticks = np.round(price * np.exp(np.cumsum(rng.normal(0, 0.0005, n))) / tick).astype(np.int64)
+    return ticks * tick, ticks
+
+
+def exact_state(ticks: np.ndarray, fast: int, slow: int) -> np.ndarray:
+    """Fast vs slow SMA in exact integer arithmetic (slow*sum_fast vs fast*sum_slow), 0 during warm-up."""
+    cs = np.concatenate([[0], np.cumsum(ticks)])
+    state = np.zeros(len(ticks), dtype=np.int64)
+    t = np.arange(slow - 1, len(ticks))
+    state[slow - 1:] = np.sign(slow * (cs[t + 1] - cs[t + 1 - fast]) - fast * (cs[t + 1] - cs[t + 1 - slow]))
+    return state
+
+
+def exact_signals(ticks: np.ndarray, fast: int, slow: int) -> np.ndarray:
+    sig = np.zeros(len(ticks), dtype=np.int64)
+    sig[1:] = np.clip(np.diff(exact_state(ticks, fast, slow)), -1, 1)
+    return sig
+
+
+@pytest.fixture(params=[(100.0, 0.01), (60000.0, 0.1)], ids=['alt', 'btc'])
+def series(request):
+    return tick_series(100_000, *request.param)
+
+
+def test_grid_signals_are_exact_on_tick_prices(series):
+    close, ticks = series
+    slows = sorted({s for _, s in COMBOS})
+    grid = grid_signals(close, [f for f, _ in COMBOS], slows)
+    for i, (fast, slow) in enumerate(COMBOS):
+        ref = exact_signals(ticks, fast, slow)
+        assert (ref != 0).sum() > 100
+        np.testing.assert_array_equal(grid[i, slows.index(slow)], ref)
+    for fast, sig in iter_grid_signals(close, [5], slows):
+        np.testing.assert_array_equal(sig[slows.index(20)], exact_signals(ticks, 5, 20))
+
+
+def test_generate_signals_differs_from_exact_only_at_ties(series):
+    close, ticks = series
+    df = pd.DataFrame({'close': close})
+    for fast, slow in COMBOS:
+        state = exact_state(ticks, fast, slow)
+        sig = SmaCross({'fast': fast, 'slow': slow}).generate_signals(df).to_numpy()
+        diff = np.flatnonzero(sig != exact_signals(ticks, fast, slow))
+        # pandas' rolling mean rounds, so an exact tie may compare either way; everywhere else it agrees
+        assert ((state[diff] == 0) | (state[diff - 1] == 0)).all()
+
+
+def test_off_grid_prices_use_the_tie_tolerance():
+    rng = np.random.default_rng(5)
+    close = 100.0 * np.exp(np.cumsum(rng.normal(0, 0.0005, 50_000))) + rng.random(50_000) * 1e-7
+    prefix = PrefixSum(close)
+    assert prefix.tie_tol > 0
+    ref = pd.Series(close).rolling(20).mean().to_numpy()
+    np.testing.assert_allclose(prefix.sma([20])[0], ref, rtol=0, atol=prefix.tie_tol)
+    df = pd.DataFrame({'close': close})
+    for fast, slow in COMBOS:
+        np.testing.assert_array_equal(grid_signals(close, [fast], [slow])[0, 0],
+                                      SmaCross({'fast': fast, 'slow': slow}).generate_signals(df).to_numpy())
+
+
+def test_sweep_rows_match_single_backtests(series):
+    close, ticks = series
+    df = pd.DataFrame({'close': close})
+    res = run_sweep(close, COMBOS, fee=0.0004, slippage_bps=1.0, workers=1).set_index(['fast', 'slow'])
+    for fast, slow in COMBOS:
+        sig = pd.Series(exact_signals(ticks, fast, slow), index=df.index)
+        _, _, stats = backtest_symmetric(df, sig, fee=0.0004, slippage_bps=1.0)
+        assert res.loc[(fast, slow)].to_dict() == stats
+
+
+def test_sweep_ranks_like_backtest_when_equity_goes_negative():
+    close, ticks = tick_series(2_000, 100.0, 0.01)
+    df = pd.DataFrame({'close': close})
+    res = run_sweep(close, [(2, 5)], fee=0.6, slippage_bps=0.0, workers=1, rank_by='CAGR%')
+    _, _, stats = backtest_symmetric(df, pd.Series(exact_signals(ticks, 2, 5)), fee=0.6, slippage_bps=0.0)
+    assert res.iloc[0]['CAGR%'] == stats['CAGR%'] == -100.0
+
+
+def test_sweep_process_pool_matches_serial():
+    close, _ = tick_series(20_000, 100.0, 0.01)
+    combos = param_grid(parse_range('5..15:5'), parse_range('20,40'))
+    serial = run_sweep(close, combos, workers=1)
+    pooled = run_sweep(close, combos, workers=2, chunksize=2)
+    pd.testing.assert_frame_equal(serial, pooled)
+
+
+def test_parse_range_and_grid():
+    assert parse_range('5..20:5') == [5, 10, 15, 20]
+    assert parse_range('3,7') == [3, 7]
+    assert param_grid([5, 30], [20, 30]) == [(5, 20), (5, 30)]
+
+
+@pytest.mark.parametrize('rank_by', ['Sharpe', 'Return%', 'MaxDD%'])
+def test_ranking_puts_the_best_first(rank_by):
+    close, _ = tick_series(20_000, 100.0, 0.01)
+    res = run_sweep(close, param_grid([5, 10, 15], [20, 40, 60]), workers=1, rank_by=rank_by)
+    col = res[rank_by].to_numpy()
+    if rank_by == 'MaxDD%':
+        assert (np.diff(col) >= 0).all() and col[0] == col.min()
+    else:
+        assert (np.diff(col) <= 0).all() and col[0] == col.max()
+
+
+def test_cli_rejects_other_strategies():
+    from binance_trader.cli import main
+    with pytest.raises(SystemExit):
+        main(['sweep', '--symbol', 'BTCUSDT', '--interval', '1m', '--strategy', 'rsi'])
+
+
+def test_cli_sweep_on_empty_store_says_fetch_first(tmp_path, monkeypatch):
+    from binance_trader import cli
+    monkeypatch.setattr(cli, 'load_settings', lambda: {**load_settings(), 'data_dir': str(tmp_path)})
+    with pytest.raises(SystemExit, match='run `binance-trader fetch` first'):
+        cli.main(['sweep', '--symbol', 'BTCUSDT', '--interval', '1m', '--workers', '1'])
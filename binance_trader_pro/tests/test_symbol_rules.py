@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+from binance_trader.exchange.symbol_rules import OrderRuleError, SymbolRules, load_symbol_rules
+
+EXCHANGE_INFO = {'symbols': [
+    {'symbol': 'BTCUSDT', 'status': 'TRADING', 'filters': [
+        {'filterType': 'PRICE_FILTER', 'tickSize': '0.10', 'minPrice': '261.10', 'maxPrice': '809484'},
+        {'filterType': 'LOT_SIZE', 'stepSize': '0.001', 'minQty': '0.001', 'maxQty': '1000'},
+        {'filterType': 'MARKET_LOT_SIZE', 'stepSize': '0.001', 'minQty': '0.001', 'maxQty': '120'},
+        {'filterType': 'MIN_NOTIONAL', 'notional': '100'}]},
+    {'symbol': 'DOGEUSDT', 'status': 'TRADING', 'filters': [
+        {'filterType': 'PRICE_FILTER', 'tickSize': '0.000010', 'minPrice': '0.002440', 'maxPrice': '30'},
+        {'filterType': 'LOT_SIZE', 'stepSize': '1', 'minQty': '1', 'maxQty': '50000000'},
+        {'filterType': 'MIN_NOTIONAL', 'notional': '5'}]},
+    {'symbol': 'OLDUSDT', 'status': 'SETTLING', 'filters': []},
+]}
+
+
+@pytest.fixture
+def rules():
+    return SymbolRules.from_exchange_info(EXCHANGE_INFO)
+
+
+def test_round_qty_and_price(rules):
+    assert rules.round_qty('BTCUSDT', 0.0019) == 0.001
+    assert rules.round_qty('BTCUSDT', 0.1 + 0.2) == 0.3
+    assert rules.round_price('BTCUSDT', 60000.06) == 60000.1
+    assert rules.round_price('DOGEUSDT', 0.123456) == 0.12346
+    assert rules.round_qty('UNKNOWN', 1.23456) == 1.23456
+
+
+def test_whole_steps_round_to_ints(rules):
+    qty = rules.round_qty('DOGEUSDT', 1234.9)
+    assert qty == 1234 and isinstance(qty, int) and str(qty) == '1234'
+    info = {'symbols': [{'symbol': 'XUSDT', 'filters': [{'filterType': 'PRICE_FILTER', 'tickSize': '1'}]}]}
+    assert str(SymbolRules.from_exchange_info(info).round_price('XUSDT', 101.6)) == '102'
+
+
+def test_market_orders_use_market_lot_size_with_lot_size_fallback(rules):
+    with pytest.raises(OrderRuleError, match='> max 120'):
+        rules.validate('BTCUSDT', 200, 60000.0, market=True)
+    assert rules.validate('BTCUSDT', 200, 60000.0, market=False) == (200.0, 60000.0)
+    doge = rules.get('DOGEUSDT')
+    assert (doge.market_step_size, doge.market_min_qty, doge.market_max_qty) == (1.0, 1.0, 50_000_000.0)
+    assert rules.validate('DOGEUSDT', 100.7, 0.1) == (100, 0.1)
+
+
+def test_min_notional_is_skipped_for_reduce_only(rules):
+    with pytest.raises(OrderRuleError, match='notional'):
+        rules.validate('BTCUSDT', 0.001, 60000.0)
+    assert rules.validate('BTCUSDT', 0.001, 60000.0, reduce_only=True) == (0.001, 60000.0)
+
+
+@pytest.mark.parametrize('symbol,qty,price,market,reason', [
+    ('BTCUSDT', 0.0004, 60000.0, True, 'qty 0.0 < min 0.001'),
+    ('BTCUSDT', 0.01, 100.0, False, 'price 100.0 outside'),
+    ('OLDUSDT', 1.0, None, True, 'status SETTLING'),
+])
+def test_validate_errors(rules, symbol, qty, price, market, reason):
+    with pytest.raises(OrderRuleError, match=f"\\[{symbol}\\] order rejected locally: {reason}"):
+        rules.validate(symbol, qty, price, market=market)
+
+
+def test_validate_rounds_and_passes_unknown_symbols(rules):
+    assert rules.validate('BTCUSDT', 0.0129, 60000.04, market=False) == (0.012, 60000.0)
+    assert rules.validate('UNKNOWN', 0.123, 1.0) == (0.123, 1.0)
+
+
+class InfoClient:
+    def __init__(self):
+        self.calls = 0
+
+    def exchange_info(self):
+        self.calls += 1
+        return EXCHANGE_INFO
+
+
+def test_load_symbol_rules_caches_until_the_ttl(tmp_path):
+    path = str(tmp_path / 'rules' / 'symbol_rules_mainnet.json')
+    client = InfoClient()
+    first = load_symbol_rules(client, path, ttl_s=3600)
+    again = load_symbol_rules(client, path, ttl_s=3600)
+    assert client.calls == 1
+    assert again.rules == first.rules and again.fetched_at == first.fetched_at
+
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    data['fetched_at'] -= 7200
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    assert load_symbol_rules(client, path, ttl_s=3600).age() < 60
+    assert client.calls == 2
+    load_symbol_rules(client, path, ttl_s=3600, refresh=True)
+    assert client.calls == 3
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('{not json')
+    assert len(load_symbol_rules(client, path, ttl_s=3600)) == 3
+    assert client.calls == 4